@@ -0,0 +1,132 @@
+"""Cross-table analytics over students and quizzes.
+
+Both tables describe class groups by (grade, class, region). JoinIndex
+factorizes those keys across the two tables once per data version into a
+shared integer group code, so joins between them are hash joins on a single
+int column, and scope filters are applied to the few group rows rather than
+to every student. Per-subject score totals are kept per group and rolled up
+for any admin, the same way Quick Stats are.
+
+A student's subject comes from the quiz they last took: the subject of the
+quizzes row with the same quiz_name, or the first word of the quiz name
+when the quiz is not in the quizzes table.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from roles import scope_values
+
+JOIN_KEYS = ['grade', 'class', 'region']
+
+# Window used by "pending homework before a quiz" when no day count is given
+DEFAULT_QUIZ_WINDOW_DAYS = 7
+
+def _shared_codes(left, right):
+    """Factorize two columns against one set of values, without object copies.
+
+    Codes are 1-based positions in values; 0 is a missing value, which no
+    scope allows (as in ScopeIndex).
+    """
+    left_codes, left_values = pd.factorize(left)
+    right_codes, right_values = pd.factorize(right)
+    values = pd.Index(left_values).append(pd.Index(right_values)).unique()
+    # factorize() codes a missing value -1, which picks the trailing 0
+    left_map = np.append(values.get_indexer(left_values) + 1, 0)
+    right_map = np.append(values.get_indexer(right_values) + 1, 0)
+    return left_map[left_codes], right_map[right_codes], values
+
+def _subjects(quiz_names, subject_by_quiz):
+    """Subject per student, resolved once per distinct quiz name"""
+    names = pd.Categorical(quiz_names)
+    subjects = [subject_by_quiz.get(name) or str(name).split()[0] for name in names.categories]
+    lookup, codes = np.unique(np.array(subjects + ['Unknown'], dtype=object), return_inverse=True)
+    # Missing names have code -1, which picks the trailing 'Unknown'
+    return pd.Categorical.from_codes(codes[names.codes], categories=lookup)
+
+class JoinIndex:
+    """Students and quizzes keyed on a shared (grade, class, region) code"""
+
+    def __init__(self, students, quizzes):
+        self.keys = [k for k in JOIN_KEYS if k in students.columns and k in quizzes.columns]
+        student_key = np.zeros(len(students), dtype=np.int64)
+        quiz_key = np.zeros(len(quizzes), dtype=np.int64)
+        key_values = []
+        for key in self.keys:
+            student_codes, quiz_codes, values = _shared_codes(students[key], quizzes[key])
+            student_key = student_key * (len(values) + 1) + student_codes
+            quiz_key = quiz_key * (len(values) + 1) + quiz_codes
+            key_values.append(values)
+        codes, combined = pd.factorize(np.concatenate([student_key, quiz_key]))
+
+        # Decode each group's combined key back into its column values
+        self.groups = pd.DataFrame(index=range(len(combined)))
+        for key, values in reversed(list(zip(self.keys, key_values))):
+            self.groups[key] = pd.Index([None], dtype=object).append(values.astype(object))[combined % (len(values) + 1)]
+            combined = combined // (len(values) + 1)
+        self.groups = self.groups[self.keys]
+
+        subject_by_quiz = dict(zip(quizzes['quiz_name'].astype(object), quizzes['subject'].astype(object)))
+        # Columns are kept in their loaded (Arrow/categorical) dtypes, not copied to objects
+        self.students = students[['name', 'grade', 'class', 'quiz_score']].reset_index(drop=True)
+        self.students.insert(0, 'group', codes[:len(students)])
+        self.students.insert(1, 'student', np.arange(len(students)))
+        self.students['quiz_score'] = self.students['quiz_score'].astype('float64')
+        self.students['pending'] = (students['homework_status'] == 'pending').to_numpy()
+        self.students['subject'] = _subjects(students['quiz_name'], subject_by_quiz)
+        self.quizzes = pd.DataFrame({
+            'group': codes[len(students):],
+            'quiz_name': quizzes['quiz_name'].to_numpy(),
+            'subject': quizzes['subject'].to_numpy(),
+            'scheduled_date': pd.to_datetime(quizzes['scheduled_date']).to_numpy()
+        })
+        self.subject_scores = None
+
+    def group_mask(self, constraints):
+        """Boolean per group code for a list of (column, value or values) constraints"""
+        mask = np.ones(len(self.groups), dtype=bool)
+        for column, value in constraints:
+            if column in self.groups.columns:
+                mask &= self.groups[column].isin(scope_values(value)).to_numpy()
+        return mask
+
+    def _subject_scores(self):
+        if self.subject_scores is None:
+            grouped = self.students.groupby(['group', 'subject'], sort=False, observed=True)
+            self.subject_scores = grouped.agg(
+                students=('quiz_score', 'size'),
+                score_sum=('quiz_score', 'sum'),
+                score_count=('quiz_score', 'count')
+            ).reset_index()
+        return self.subject_scores
+
+    def score_by_subject(self, constraints=()):
+        """Students and average score per subject within the constraints"""
+        totals = self._subject_scores()
+        totals = totals[self.group_mask(constraints)[totals['group'].to_numpy()]]
+        summary = totals.groupby('subject', sort=True, observed=True)[['students', 'score_sum', 'score_count']].sum()
+        summary['avg_score'] = (summary['score_sum'] / summary['score_count']).round(1)
+        return summary.reset_index()[['subject', 'students', 'avg_score']]
+
+    def pending_before_quiz(self, constraints=(), as_of=None, days=DEFAULT_QUIZ_WINDOW_DAYS):
+        """Students with pending homework whose class has a quiz within days of as_of.
+
+        One row per (student, quiz); the student column is the student's row
+        position, for counting students with the same name apart.
+        """
+        as_of = np.datetime64(as_of or date.today().isoformat(), 'ns')
+        until = as_of + np.timedelta64(timedelta(days=days))
+        allowed = self.group_mask(constraints)
+
+        dates = self.quizzes['scheduled_date'].to_numpy()
+        upcoming = self.quizzes[(dates >= as_of) & (dates <= until) & allowed[self.quizzes['group'].to_numpy()]]
+        pending = self.students[self.students['pending'].to_numpy() & allowed[self.students['group'].to_numpy()]]
+
+        joined = pending[['group', 'student', 'name', 'grade', 'class']].merge(
+            upcoming[['group', 'quiz_name', 'subject', 'scheduled_date']], on='group'
+        )
+        joined['days_until'] = ((joined['scheduled_date'] - as_of) // pd.Timedelta(days=1)).astype('int64')
+        joined['scheduled_date'] = joined['scheduled_date'].dt.strftime('%Y-%m-%d')
+        return joined.drop(columns='group').sort_values(['days_until', 'name'], kind='stable').reset_index(drop=True)
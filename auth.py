@@ -0,0 +1,200 @@
+"""Admin authentication: a hashed credential directory and signed session tokens.
+
+The directory (Data/admins.csv by default) lists one admin per row as
+email, role, password_hash and is indexed by email once per process.
+Passwords are stored as salted PBKDF2-SHA256 hashes whose iteration count
+is part of the stored hash, so the cost can be raised for new hashes
+without invalidating old ones. A successful login issues an HMAC-signed,
+expiring session token; reruns check the token instead of the password.
+
+    python auth.py hash                                # print a hash for a password
+    python auth.py add someone@school.com admin2       # add or replace an admin
+"""
+
+import argparse
+import base64
+import csv
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from functools import cached_property
+
+from roles import ADMIN_ROLES
+
+DEFAULT_DIRECTORY_PATH = os.path.join('Data', 'admins.csv')
+DIRECTORY_COLUMNS = ['email', 'role', 'password_hash']
+
+HASH_ALGORITHM = 'pbkdf2_sha256'
+# KDF cost for newly hashed passwords; stored hashes keep their own
+KDF_ITERATIONS = int(os.getenv("AUTH_KDF_ITERATIONS", "600000"))
+SALT_BYTES = 16
+
+DEFAULT_SESSION_HOURS = 8
+
+def normalize_email(email):
+    return email.strip().lower()
+
+def hash_password(password, iterations=KDF_ITERATIONS, salt=None):
+    """Encode a password as pbkdf2_sha256$iterations$salt$hash"""
+    salt = salt or secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return '$'.join([HASH_ALGORITHM, str(iterations), salt.hex(), digest.hex()])
+
+def check_password(password, encoded):
+    """Whether password matches an encoded hash, compared in constant time"""
+    try:
+        algorithm, iterations, salt, expected = encoded.split('$')
+        salt, expected, iterations = bytes.fromhex(salt), bytes.fromhex(expected), int(iterations)
+    except ValueError:
+        return False
+    if algorithm != HASH_ALGORITHM:
+        return False
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return hmac.compare_digest(digest, expected)
+
+class AdminDirectory:
+    """Admins indexed by email; a lookup is one dict access whatever the size"""
+
+    def __init__(self, entries=()):
+        self.entries = {}
+        for entry in entries:
+            role = entry['role'].strip()
+            if role not in ADMIN_ROLES:
+                raise ValueError(f"Unknown role {role!r} for {entry['email']}")
+            self.entries[normalize_email(entry['email'])] = {
+                'role': role,
+                'password_hash': entry['password_hash'].strip()
+            }
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_DIRECTORY_PATH):
+        with open(path, newline='') as f:
+            return cls(csv.DictReader(f))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def role(self, email):
+        entry = self.entries.get(normalize_email(email))
+        return entry['role'] if entry else None
+
+    @cached_property
+    def _decoy_hash(self):
+        return hash_password(secrets.token_hex(8))
+
+    def authenticate(self, email, password):
+        """Role of the admin if the password matches, else None.
+
+        Unknown emails are checked against a decoy hash so they cost as much
+        as a wrong password and do not reveal who has an account.
+        """
+        entry = self.entries.get(normalize_email(email))
+        if entry is None:
+            check_password(password, self._decoy_hash)
+            return None
+        return entry['role'] if check_password(password, entry['password_hash']) else None
+
+def verify_login(directory, email, password):
+    """Verify admin credentials against the directory"""
+    role = directory.authenticate(email, password)
+    return role is not None, role
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+class SessionSigner:
+    """Issues and checks HMAC-signed session tokens.
+
+    Without a configured secret a random one is drawn, so tokens are only
+    valid within the process that issued them.
+    """
+
+    def __init__(self, secret=None, ttl=DEFAULT_SESSION_HOURS * 3600):
+        secret = secret or secrets.token_bytes(32)
+        self.key = secret.encode() if isinstance(secret, str) else secret
+        self.ttl = ttl
+
+    def _sign(self, payload):
+        return hmac.new(self.key, payload.encode(), hashlib.sha256).digest()
+
+    def issue(self, email, role, now=None):
+        now = time.time() if now is None else now
+        claims = {'sub': normalize_email(email), 'role': role, 'exp': int(now + self.ttl)}
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+        return f"{payload}.{_b64encode(self._sign(payload))}"
+
+    def verify(self, token, now=None):
+        """Claims of a token with a valid signature that has not expired, else None"""
+        if not token:
+            return None
+        payload, _, signature = token.partition('.')
+        try:
+            if not hmac.compare_digest(_b64decode(signature), self._sign(payload)):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        now = time.time() if now is None else now
+        return claims if claims.get('exp', 0) > now else None
+
+def session_claims(signer, directory, token):
+    """Claims of a valid token whose admin is still listed with the same role"""
+    claims = signer.verify(token)
+    if claims is None or directory.role(claims['sub']) != claims['role']:
+        return None
+    return claims
+
+def directory_path_from_env():
+    """ADMIN_DIRECTORY_PATH, by default Data/admins.csv beside this module"""
+    default = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_DIRECTORY_PATH)
+    return os.getenv("ADMIN_DIRECTORY_PATH", default)
+
+def auth_from_env():
+    """The admin directory and session signer the dashboard pages share.
+
+    AUTH_SECRET keys the session tokens (without it they last one process)
+    and AUTH_SESSION_HOURS sets their lifetime.
+    """
+    hours = float(os.getenv("AUTH_SESSION_HOURS", DEFAULT_SESSION_HOURS))
+    signer = SessionSigner(os.getenv("AUTH_SECRET"), ttl=hours * 3600)
+    return AdminDirectory.from_csv(directory_path_from_env()), signer
+
+def add_admin(path, email, role, password):
+    """Add an admin to the directory file, replacing any entry for the email"""
+    rows = []
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            rows = [row for row in csv.DictReader(f) if normalize_email(row['email']) != normalize_email(email)]
+    rows.append({'email': normalize_email(email), 'role': role, 'password_hash': hash_password(password)})
+    AdminDirectory(rows)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=DIRECTORY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the admin credential directory")
+    parser.add_argument('--directory', default=directory_path_from_env())
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('hash', help="print the hash of a password")
+    add = commands.add_parser('add', help="add or replace an admin")
+    add.add_argument('email')
+    add.add_argument('role', choices=sorted(ADMIN_ROLES))
+    args = parser.parse_args()
+
+    password = getpass.getpass("Password: ")
+    if args.command == 'hash':
+        print(hash_password(password))
+    else:
+        add_admin(args.directory, args.email, args.role, password)
+        print(f"{normalize_email(args.email)} saved to {args.directory}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Cold-start time of the local backend: CSV parsing vs memory-mapped snapshots.
+
+For each roster size, writes the students table as CSV and as an Arrow
+snapshot into a temporary directory, then times loading it into a typed,
+keyed frame through LocalTable (best of --repeat runs), the way the
+dashboard's offline store does.
+
+    python benchmarks/bench_cold_start.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_students
+from data_layer import LocalTable
+from snapshot import csv_path, read_snapshot_table, snapshot_path, write_snapshot_table
+
+
+def best_time(load, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        table = LocalTable('students', load)
+        start = time.perf_counter()
+        table.sync()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'csv ms':>9} {'snapshot ms':>12} {'speedup':>8} {'csv MB':>7} {'snap MB':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as data_dir:
+            frame = generate_students(rows)
+            students_csv = csv_path(data_dir, 'students')
+            students_snapshot = snapshot_path(data_dir, 'students')
+            frame.to_csv(students_csv, index=False)
+            write_snapshot_table(frame, students_snapshot)
+            del frame
+
+            csv_seconds = best_time(lambda: pd.read_csv(students_csv), args.repeat)
+            snapshot_seconds = best_time(lambda: read_snapshot_table(students_snapshot), args.repeat)
+            print(f"{rows:>8} {csv_seconds * 1000:>9.1f} {snapshot_seconds * 1000:>12.1f} "
+                  f"{csv_seconds / snapshot_seconds:>7.1f}x "
+                  f"{os.path.getsize(students_csv) / 2**20:>7.1f} {os.path.getsize(students_snapshot) / 2**20:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
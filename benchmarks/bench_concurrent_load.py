@@ -0,0 +1,70 @@
+"""Cold dashboard load: tables synced one after another vs concurrently.
+
+A LocalBackend with a fixed per-request latency stands in for Supabase. The
+sequential path is two DataStore.get() calls on a cold store; the concurrent
+path calls DataStore.prefetch() first. The slowest single table's sync is
+reported as the lower bound.
+
+    python benchmarks/bench_concurrent_load.py --rows 20000 --latency 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_quizzes, generate_students
+from data_layer import DataStore
+from local_backend import LocalBackend
+
+TABLES = ('students', 'quizzes')
+
+# As in the dashboard, so get() right after a sync does not sync again
+SYNC_INTERVAL = 60
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def sequential(backend):
+    store = DataStore(backend, TABLES, min_interval=SYNC_INTERVAL)
+    for table_name in TABLES:
+        store.get(table_name, 'admin1')
+
+
+def concurrent(backend):
+    store = DataStore(backend, TABLES, min_interval=SYNC_INTERVAL)
+    store.prefetch()
+    for table_name in TABLES:
+        store.get(table_name, 'admin1')
+
+
+def slowest_single(backend):
+    return max(timed(lambda: DataStore(backend, (name,), min_interval=SYNC_INTERVAL).get(name, 'admin1')) for name in TABLES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per request")
+    args = parser.parse_args()
+
+    backend = LocalBackend({
+        'students': generate_students(args.rows),
+        'quizzes': generate_quizzes(max(1, args.rows // 2))
+    }, latency=args.latency)
+
+    print(f"{args.rows} students, {args.latency * 1000:.0f} ms per request")
+    print(f"{'path':<16} {'ms':>8}")
+    print(f"{'sequential':<16} {timed(lambda: sequential(backend)) * 1000:>8.1f}")
+    print(f"{'concurrent':<16} {timed(lambda: concurrent(backend)) * 1000:>8.1f}")
+    print(f"{'slowest table':<16} {slowest_single(backend) * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
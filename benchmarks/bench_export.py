@@ -0,0 +1,78 @@
+"""Export time and peak memory per format and result size.
+
+"eager csv" is the old download path: the whole result serialized with
+to_csv() into one string. The other rows go through exports.export_file(),
+which writes in chunks into a spooled temporary file. Peak memory counts
+Python allocations (tracemalloc) plus growth of the Arrow memory pool.
+
+    python benchmarks/bench_export.py --rows 10000 50000 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_students
+from data_layer import apply_column_types
+from exports import available_formats, export_file
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+RESULT_COLUMNS = ['name', 'grade', 'class', 'homework_status', 'quiz_score', 'attendance_rate']
+
+
+def eager_csv(dataframe):
+    return dataframe.to_csv(index=False).encode('utf-8')
+
+
+def output_size(output):
+    if hasattr(output, 'seek'):
+        output.seek(0, os.SEEK_END)
+        size = output.tell()
+        output.close()
+        return size
+    return len(output)
+
+
+def measure(func, *args):
+    # Timed and traced in separate runs; tracemalloc slows to_csv several-fold
+    start = time.perf_counter()
+    size = output_size(func(*args))
+    elapsed = time.perf_counter() - start
+
+    pool = pa.default_memory_pool() if pa is not None else None
+    arrow_floor = max(pool.max_memory(), pool.bytes_allocated()) if pool else 0
+    tracemalloc.start()
+    output = func(*args)
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    output_size(output)
+    # max_memory() never resets, so only growth past the earlier peak is visible
+    arrow_peak = max(0, pool.max_memory() - arrow_floor) if pool else 0
+    return elapsed, python_peak + arrow_peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'format':>12} {'time ms':>9} {'peak MB':>9} {'file MB':>9}")
+    for rows in args.rows:
+        result = apply_column_types(generate_students(rows))[RESULT_COLUMNS]
+        cases = [('eager csv', eager_csv, (result,))]
+        cases += [(fmt, export_file, (result, fmt)) for fmt in available_formats()]
+        for label, func, func_args in cases:
+            elapsed, peak, size = measure(func, *func_args)
+            print(f"{rows:>8} {label:>12} {elapsed * 1000:>9.1f} {peak / 2**20:>9.2f} {size / 2**20:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
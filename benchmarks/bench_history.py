@@ -0,0 +1,82 @@
+"""Session history memory over thousands of queries: full responses vs compact records.
+
+The legacy path appends every response dict, result frame included, to a
+list. The compact path keeps QueryHistory records and leaves frames to a
+byte-capped QueryResultCache. Held memory is the Python heap growth seen by
+tracemalloc plus the memory_usage() of the result frames kept alive.
+
+Also reports how much compact history memory grows between the --warmup
+checkpoint (history and cache both full) and the last; tests/test_history.py
+checks the bounds behind it.
+
+    python benchmarks/bench_history.py --queries 5000 --cache-mb 4
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import HISTORY_QUERIES, QUERIES_PER_VERSION, generate_students
+from data_layer import apply_column_types
+from history import DEFAULT_HISTORY_LIMIT, QueryHistory
+from query_engine import QueryResultCache, run_query, response_bytes
+
+
+def simulate(students, count, legacy, limit, cache_mb, checkpoints):
+    cache = QueryResultCache(maxsize=10**6, max_bytes=int(cache_mb * 2**20))
+    history = [] if legacy else QueryHistory(limit)
+    quizzes = students.iloc[0:0]
+    held = {}
+    tracemalloc.start()
+    for i in range(1, count + 1):
+        query = HISTORY_QUERIES[i % len(HISTORY_QUERIES)]
+        version = i // QUERIES_PER_VERSION
+        result = run_query(query, students, quizzes, scope='admin', data_version=version, cache=cache)
+        if legacy:
+            history.append({'query': query, 'result': result, 'admin': 'admin', 'timestamp': ''})
+        else:
+            history.record(query, result, 'admin', version, 'admin', '')
+        if i in checkpoints:
+            heap = tracemalloc.get_traced_memory()[0]
+            if legacy:
+                # Cache hits hand back the same frame; count each frame once
+                kept = {id(entry['result']['data']): entry['result'] for entry in history}
+                frames = sum(response_bytes(result) for result in kept.values())
+            else:
+                frames = cache.bytes
+            held[i] = heap + frames
+    tracemalloc.stop()
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=DEFAULT_HISTORY_LIMIT)
+    parser.add_argument('--cache-mb', type=float, default=4)
+    parser.add_argument('--warmup', type=int, default=1000)
+    args = parser.parse_args()
+
+    checkpoints = {c for c in (100, 500, 1000, 2000, 5000, 10000) if c <= args.queries}
+    checkpoints |= {args.warmup, args.queries}
+    students = apply_column_types(generate_students(args.rows))
+
+    legacy = simulate(students, args.queries, True, args.limit, args.cache_mb, checkpoints)
+    compact = simulate(students, args.queries, False, args.limit, args.cache_mb, checkpoints)
+
+    print(f"{args.rows} students, history limit {args.limit}, result cache {args.cache_mb} MB")
+    print(f"{'queries':>8} {'legacy MB':>10} {'compact MB':>11}")
+    for count in sorted(checkpoints):
+        print(f"{count:>8} {legacy[count] / 2**20:>10.2f} {compact[count] / 2**20:>11.2f}")
+
+    if args.queries > args.warmup:
+        growth = compact[args.queries] / compact[args.warmup] - 1
+        print(f"compact growth from {args.warmup} to {args.queries} queries: {growth:+.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Login throughput under concurrent sessions, and the per-rerun session check.
+
+A directory of --staff admins is written to a temporary CSV and indexed the
+way the dashboard does once per process. Each session then logs in
+repeatedly on its own thread: a login is a PBKDF2 verification, whose cost
+is set by the iteration count, and hashlib releases the GIL while it runs,
+so logins scale with cores rather than threads. A rerun of a logged-in
+session only checks its signed token, timed last. Every admin shares one
+password hash per iteration count so building the directory stays quick.
+tests/test_auth.py checks what logins and session checks accept.
+
+    python benchmarks/bench_login.py --staff 5000 --sessions 1 4 16 --iterations 100000 600000
+"""
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import DIRECTORY_COLUMNS, AdminDirectory, SessionSigner, hash_password, session_claims, verify_login
+from roles import ADMIN_ROLES
+
+PASSWORD = 'admin123'
+
+
+def write_directory(path, staff, iterations):
+    password_hash = hash_password(PASSWORD, iterations)
+    roles = list(ADMIN_ROLES)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=DIRECTORY_COLUMNS)
+        writer.writeheader()
+        for i in range(staff):
+            writer.writerow({'email': f"staff{i}@school.com", 'role': roles[i % len(roles)],
+                             'password_hash': password_hash})
+
+
+def log_in(directory, staff, count, seed):
+    """Milliseconds per login for one session"""
+    rng = random.Random(seed)
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        verify_login(directory, f"staff{rng.randrange(staff)}@school.com", PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--staff', type=int, default=5000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--iterations', type=int, nargs='+', default=[100000, 600000])
+    parser.add_argument('--logins', type=int, default=4, help="logins per session")
+    parser.add_argument('--reruns', type=int, default=100000, help="token checks timed")
+    args = parser.parse_args()
+
+    print(f"{args.staff} admins, {args.logins} logins per session, {os.cpu_count()} CPU(s)")
+    print(f"{'iterations':>10} {'sessions':>8} {'logins/s':>9} {'median ms':>10} {'p95 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'admins.csv')
+        for iterations in args.iterations:
+            write_directory(path, args.staff, iterations)
+            start = time.perf_counter()
+            directory = AdminDirectory.from_csv(path)
+            load_ms = (time.perf_counter() - start) * 1000
+            for sessions in args.sessions:
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=sessions) as pool:
+                    runs = pool.map(log_in, [directory] * sessions, [args.staff] * sessions,
+                                    [args.logins] * sessions, range(sessions))
+                    timings = [ms for run in runs for ms in run]
+                seconds = time.perf_counter() - start
+                p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+                print(f"{iterations:>10} {sessions:>8} {len(timings) / seconds:>9.1f} "
+                      f"{statistics.median(timings):>10.1f} {p95:>8.1f}")
+
+    signer = SessionSigner()
+    tokens = [signer.issue(f"staff{i}@school.com", list(ADMIN_ROLES)[i % len(ADMIN_ROLES)])
+              for i in range(min(args.staff, 1000))]
+    start = time.perf_counter()
+    for i in range(args.reruns):
+        session_claims(signer, directory, tokens[i % len(tokens)])
+    per_check = (time.perf_counter() - start) / args.reruns
+    print(f"\ndirectory load: {load_ms:.1f} ms for {len(directory)} admins")
+    print(f"rerun session check: {per_check * 1e6:.1f} us ({1 / per_check:,.0f}/s)")
+
+
+if __name__ == '__main__':
+    main()
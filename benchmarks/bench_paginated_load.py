@@ -0,0 +1,60 @@
+"""Compare one-shot select("*") loading against paginated columnar streaming.
+
+For each roster size, reports wall time and peak traced memory of building the
+students frame, plus the size of the resulting frame.
+
+    python benchmarks/bench_paginated_load.py --rows 10000 50000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_students
+from data_layer import fetch_table
+from local_backend import LocalBackend
+
+
+def one_shot(backend, page_size, prefetch):
+    response = backend.table('students').select("*").execute()
+    return pd.DataFrame(response.data)
+
+
+def paginated(backend, page_size, prefetch):
+    return fetch_table(backend, 'students', page_size=page_size, prefetch=prefetch)
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    frame = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return frame, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 100000])
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--prefetch', type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'path':<10} {'ms':>9} {'peak MB':>9} {'frame MB':>9}")
+    for rows in args.rows:
+        backend = LocalBackend({'students': generate_students(rows)})
+        for label, func in (('one-shot', one_shot), ('paginated', paginated)):
+            frame, elapsed, peak = measure(func, backend, args.page_size, args.prefetch)
+            size = frame.memory_usage(deep=True).sum()
+            print(f"{rows:>8} {label:<10} {elapsed * 1000:>9.1f} {peak / 2**20:>9.1f} {size / 2**20:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""First click on an example query: cold cache vs warmed by the Precomputer.
+
+A local store is loaded with a synthetic roster. Each example query is run
+once per admin against a cold result cache, then again after a Precomputer
+refresh has warmed a fresh cache in the background. Reports per-click
+latency and the cache's hit counts.
+
+    python benchmarks/bench_precompute.py --rows 200000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_quizzes, generate_students
+from data_layer import DataStore, data_version
+from precompute import Precomputer
+from query_engine import QueryResultCache, run_query
+from roles import ADMIN_ROLES
+
+EXAMPLE_QUERIES = [
+    "Which students haven't submitted their homework yet?",
+    "Show me performance data for Grade 8",
+    "List all upcoming quizzes",
+    "Who are the low-performing students?",
+    "Show me attendance data",
+    "List all students"
+]
+
+
+def clicks(store, cache):
+    """Milliseconds per example query per admin, as the dashboard runs them"""
+    timings = []
+    for admin_key in ADMIN_ROLES:
+        students, _ = store.get('students', admin_key)
+        quizzes, _ = store.get('quizzes', admin_key)
+        version = (data_version(students), data_version(quizzes))
+        for query in EXAMPLE_QUERIES:
+            start = time.perf_counter()
+            run_query(query, students, quizzes, scope=admin_key, data_version=version, cache=cache,
+                      join_index=store.join_index(), schedule=store.schedule_index(admin_key))
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    students = generate_students(args.rows)
+    quizzes = generate_quizzes(max(1, args.rows // 50))
+    store = DataStore.local({'students': lambda: students, 'quizzes': lambda: quizzes})
+    for table_name in ('students', 'quizzes'):
+        store.get(table_name, next(iter(ADMIN_ROLES)))
+
+    cold_cache = QueryResultCache()
+    cold = clicks(store, cold_cache)
+
+    warm_cache = QueryResultCache()
+    precomputer = Precomputer(EXAMPLE_QUERIES, cache=warm_cache, max_workers=args.workers)
+    start = time.perf_counter()
+    precomputer.refresh(store)
+    precomputer.executor.shutdown(wait=True)
+    warm_seconds = time.perf_counter() - start
+    warm = clicks(store, warm_cache)
+
+    print(f"{args.rows} students, {len(EXAMPLE_QUERIES)} queries x {len(ADMIN_ROLES)} admins")
+    print(f"background warm-up: {warm_seconds * 1000:.1f} ms on {args.workers} thread(s)")
+    print(f"{'cache':<8} {'median ms':>10} {'max ms':>8} {'hit rate':>9}")
+    for label, timings, cache in (('cold', cold, cold_cache), ('warmed', warm, warm_cache)):
+        stats = cache.stats()
+        print(f"{label:<8} {statistics.median(timings):>10.3f} {max(timings):>8.3f} {stats['hit_rate']:>9.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Compare the compiled intent router against the original keyword cascade.
+
+Generates a corpus of synthetic queries, checks that both classifiers agree on
+the intent, and reports per-query cost of each. The router parses each query
+text once, as the dashboard routes the same text on every rerun; the cost of
+a text seen for the first time (with its words already known) is reported
+separately.
+
+    python benchmarks/bench_query_router.py --queries 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import legacy_intent, make_corpus
+from query_engine import DATE_RANGES, PARSED_QUERIES, route_query
+
+
+def per_query_us(func, corpus):
+    start = time.perf_counter()
+    for query in corpus:
+        func(query)
+    return (time.perf_counter() - start) / len(corpus) * 1e6
+
+
+def route_new_text(query):
+    PARSED_QUERIES.clear()
+    DATE_RANGES.clear()
+    return route_query(query)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=100000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.queries)
+    # Queries using keywords added after the cascade ("performing", "scoring")
+    # are expected to differ; everything else must route identically.
+    mismatches = sum(
+        legacy_intent(q) != route_query(q)[0]
+        for q in corpus if 'performing' not in q.lower() and 'scoring' not in q.lower()
+    )
+    print(f"{len(corpus)} queries, intent mismatches: {mismatches}")
+    print(f"legacy cascade : {per_query_us(legacy_intent, corpus):6.2f} us/query (intent only)")
+    print(f"compiled router: {per_query_us(route_query, corpus):6.2f} us/query (intent + params)")
+    print(f"  first sight   : {per_query_us(route_new_text, corpus):6.2f} us/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Top-N queries: full sorts vs partial selection.
+
+For each roster size, the same ranking is computed by a stable full sort
+followed by head(n), by pandas nlargest/nsmallest, and by ranking.rank_rows
+(np.partition plus a sort of the selected rows). Group-wise ranking ("top 3
+per class") compares sort + groupby().head() with rank_rows(per=...).
+Results are checked to be identical before timing.
+
+    python benchmarks/bench_ranking.py --rows 100000 1000000 5000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_students
+from data_layer import apply_column_types
+from ranking import rank_rows
+
+# (label, metric, n, largest, per)
+CASES = [
+    ('top 10 by score', 'quiz_score', 10, True, None),
+    ('bottom 100 by attendance', 'attendance_rate', 100, False, None),
+    ('top 3 per class', 'quiz_score', 3, True, 'class'),
+    ('bottom 5 per grade', 'attendance_rate', 5, False, 'grade')
+]
+
+
+def full_sort(frame, metric, n, largest, per):
+    ordered = frame.sort_values(metric, ascending=not largest, kind='stable', na_position='last')
+    ordered = ordered[ordered[metric].notna()]
+    if per is None:
+        return ordered.head(n)
+    return ordered.groupby(per, sort=True, observed=True).head(n).sort_values(per, kind='stable')
+
+
+def pandas_nlargest(frame, metric, n, largest, per):
+    if per is not None:
+        return None
+    return frame.nlargest(n, metric) if largest else frame.nsmallest(n, metric)
+
+
+def best_ms(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'case':<26} {'full sort ms':>13} {'nlargest ms':>12} {'partial ms':>11}")
+    for rows in args.rows:
+        students = apply_column_types(generate_students(rows))
+        for label, metric, n, largest, per in CASES:
+            expected = full_sort(students, metric, n, largest, per)
+            ranked = rank_rows(students, metric, n, largest, per)
+            assert (ranked.index == expected.index).all(), label
+
+            sort_ms = best_ms(lambda: full_sort(students, metric, n, largest, per), args.repeat)
+            nlargest_ms = (best_ms(lambda: pandas_nlargest(students, metric, n, largest, per), args.repeat)
+                           if per is None else None)
+            partial_ms = best_ms(lambda: rank_rows(students, metric, n, largest, per), args.repeat)
+            nlargest_text = f"{nlargest_ms:>12.2f}" if nlargest_ms is not None else f"{'-':>12}"
+            print(f"{rows:>8} {label:<26} {sort_ms:>13.2f} {nlargest_text} {partial_ms:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
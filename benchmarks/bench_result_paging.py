@@ -0,0 +1,52 @@
+"""Per-rerun result payload: the whole result frame vs one page of it.
+
+A student_list result of each size is serialized the way st.dataframe ships
+it (an Arrow IPC stream) in full and as a single page, first unsorted and
+then sorted by quiz score (the first sorted page pays for the sort once;
+later pages reuse the cached order).
+
+    python benchmarks/bench_result_paging.py --rows 1000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_students
+from data_layer import apply_column_types
+from paging import DEFAULT_PAGE_SIZE, page_slice, payload_bytes
+
+RESULT_COLUMNS = ['name', 'grade', 'class', 'homework_status', 'quiz_score', 'attendance_rate']
+
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'view':<24} {'payload KB':>11} {'ms':>8}")
+    for rows in args.rows:
+        result = apply_column_types(generate_students(rows))[RESULT_COLUMNS]
+        views = [
+            ('full result', lambda: result),
+            ('page 1', lambda: page_slice(result, 0, args.page_size)),
+            ('sorted page 1 (cold)', lambda: page_slice(result, 0, args.page_size, 'quiz_score', False)),
+            ('sorted page 2', lambda: page_slice(result, 1, args.page_size, 'quiz_score', False))
+        ]
+        for label, view in views:
+            size, ms = timed(lambda: payload_bytes(view()))
+            print(f"{rows:>8} {label:<24} {size / 1024:>11.1f} {ms:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
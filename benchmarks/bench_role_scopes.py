@@ -0,0 +1,59 @@
+"""Resolving hundreds of multi-valued role scopes: isin() per role vs ScopeIndex.
+
+Random roles list one or more grades, classes and regions (or leave a column
+unrestricted, or name a value not in the roster). Each scope is resolved
+against the roster by direct isin() filtering and through a ScopeIndex built
+once for the data version: the scope's row positions alone, then the rows
+themselves (which costs mostly copying them). tests/test_roles.py checks that
+both ways return the same rows in the same order.
+
+    python benchmarks/bench_role_scopes.py --rows 1000000 --roles 300
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_quizzes, generate_students, random_scopes
+from data_layer import apply_column_types
+from roles import ScopeIndex, filter_by_scope
+
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - start) * 1000
+
+
+def compare(frame, index, scopes):
+    """Resolve every scope both ways; returns (naive ms, positions ms, indexed ms)"""
+    _, naive_ms = timed(lambda: [filter_by_scope(frame, scope) for scope in scopes])
+    _, positions_ms = timed(lambda: [index.positions(scope) for scope in scopes])
+    _, indexed_ms = timed(lambda: [index.resolve_scope(scope) for scope in scopes])
+    return naive_ms, positions_ms, indexed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--roles', type=int, default=300)
+    args = parser.parse_args()
+
+    tables = {
+        'students': apply_column_types(generate_students(args.rows)),
+        'quizzes': apply_column_types(generate_quizzes(max(1, args.rows // 50)))
+    }
+    scopes = random_scopes(args.roles)
+    print(f"{'table':<10} {'rows':>8} {'roles':>6} {'index ms':>9} {'isin ms':>9} {'positions ms':>13} {'rows ms':>9}")
+    for table_name, frame in tables.items():
+        index, build_ms = timed(lambda: ScopeIndex(frame))
+        naive_ms, positions_ms, indexed_ms = compare(frame, index, scopes)
+        print(f"{table_name:<10} {len(frame):>8} {len(scopes):>6} {build_ms:>9.1f} {naive_ms:>9.1f} "
+              f"{positions_ms:>13.1f} {indexed_ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Scaling benchmark of the portal's hot paths from 1k to 1M students.
+
+For each roster size (generated by benchmarks.fixtures) times and measures:
+
+- apply_role_based_filtering for every admin
+- process_natural_language_query for every intent, district-wide
+- the Quick Stats computation
+- CSV export of the full roster
+
+Time is the best of at least --repeat runs; peak memory is Python allocations
+(tracemalloc, on a separate run) plus growth of the Arrow memory pool.
+Results are compared with the stored baseline and the script exits non-zero
+when a case is slower or uses more memory than the tolerance allows.
+Baselines are machine-specific: refresh with --save-baseline after changing
+hardware or making an intended trade-off.
+
+    python benchmarks/bench_scaling.py
+    python benchmarks/bench_scaling.py --rows 1000 10000 --save-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_quizzes, generate_students
+from data_layer import apply_column_types
+from exports import export_file
+from query_engine import INTENT_HANDLERS, process_natural_language_query, route_query
+from roles import ADMIN_ROLES, apply_role_based_filtering
+from stats import quick_stats
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_scaling.json')
+
+# One query per intent the engine can route to
+INTENT_QUERIES = {
+    'homework_pending': "Which students haven't submitted their homework yet?",
+    'homework_status': "Show homework submission status",
+    'low_performance': "Who are the low-performing students?",
+    'performance': "Show me performance data",
+    'upcoming_quizzes': "List all upcoming quizzes scheduled for next week",
+    'low_attendance': "Students with low attendance",
+    'attendance': "Show me attendance data",
+    'student_list': "List all students",
+    'pending_before_quiz': "Students with pending homework who have a quiz in the next 3 days",
+    'score_by_subject': "Average score per subject",
+    'ranking': "Top 10 students by score",
+    'trend': "Quiz score trend over the last 30 days"
+}
+
+# Differences below these floors are treated as noise
+MIN_TIME_DELTA_MS = 25
+MIN_MEMORY_DELTA_MB = 1
+
+# Fast cases are re-run until this much time has been spent on them
+MIN_TIMING_SECONDS = 0.2
+MAX_RUNS = 100
+
+
+def make_cases(students, quizzes):
+    cases = {}
+    for admin_key in ADMIN_ROLES:
+        cases[f'role filter {admin_key}'] = lambda a=admin_key: apply_role_based_filtering(students, a)
+    for intent, query in INTENT_QUERIES.items():
+        cases[f'query {intent}'] = lambda q=query: process_natural_language_query(q, students, quizzes)
+    cases['quick stats'] = lambda: quick_stats(students, next(iter(ADMIN_ROLES)))
+    cases['csv export'] = lambda: export_file(students, 'csv').close()
+    return cases
+
+
+def best_ms(func, repeat):
+    """Best of at least repeat runs, repeating fast cases for MIN_TIMING_SECONDS"""
+    best = float('inf')
+    runs = 0
+    deadline = time.perf_counter() + MIN_TIMING_SECONDS
+    while runs < repeat or (time.perf_counter() < deadline and runs < MAX_RUNS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+        runs += 1
+    return best * 1000
+
+
+def peak_mb(func):
+    pool = pa.default_memory_pool() if pa is not None else None
+    arrow_floor = max(pool.max_memory(), pool.bytes_allocated()) if pool else 0
+    tracemalloc.start()
+    func()
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # max_memory() never resets, so only growth past the earlier peak is visible
+    arrow_peak = max(0, pool.max_memory() - arrow_floor) if pool else 0
+    return (python_peak + arrow_peak) / 2**20
+
+
+def check(result, baseline, time_tolerance, memory_tolerance):
+    """Regression notes for one case, empty when within tolerance"""
+    if baseline is None:
+        return []
+    notes = []
+    if (result['ms'] > baseline['ms'] * (1 + time_tolerance)
+            and result['ms'] - baseline['ms'] > MIN_TIME_DELTA_MS):
+        notes.append(f"time {baseline['ms']:.1f} -> {result['ms']:.1f} ms")
+    if (result['peak_mb'] > baseline['peak_mb'] * (1 + memory_tolerance)
+            and result['peak_mb'] - baseline['peak_mb'] > MIN_MEMORY_DELTA_MB):
+        notes.append(f"memory {baseline['peak_mb']:.2f} -> {result['peak_mb']:.2f} MB")
+    return notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--time-tolerance', type=float, default=1.0)
+    parser.add_argument('--memory-tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    for intent, query in INTENT_QUERIES.items():
+        assert route_query(query)[0] == intent, f"{query!r} no longer routes to {intent}"
+    assert set(INTENT_QUERIES) == set(INTENT_HANDLERS), "INTENT_QUERIES is missing an intent"
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'rows':>8} {'case':<28} {'ms':>9} {'peak MB':>8} {'vs baseline ms':>15}")
+    for rows in args.rows:
+        students = apply_column_types(generate_students(rows))
+        quizzes = apply_column_types(generate_quizzes(max(1, rows // 50)))
+        results[str(rows)] = {}
+        for name, func in make_cases(students, quizzes).items():
+            result = {'ms': round(best_ms(func, args.repeat), 3), 'peak_mb': round(peak_mb(func), 3)}
+            results[str(rows)][name] = result
+            previous = baseline.get(str(rows), {}).get(name)
+            ratio = f"{result['ms'] / previous['ms']:.2f}x" if previous and previous['ms'] else '-'
+            notes = check(result, previous, args.time_tolerance, args.memory_tolerance)
+            regressions += [f"{rows} rows, {name}: {note}" for note in notes]
+            flag = '  REGRESSION' if notes else ''
+            print(f"{rows:>8} {name:<28} {result['ms']:>9.2f} {result['peak_mb']:>8.2f} {ratio:>15}{flag}")
+
+    if args.save_baseline:
+        for rows, cases in results.items():
+            baseline.setdefault(rows, {}).update(cases)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Date-range quiz lookups: full-column scans vs the sorted ScheduleIndex.
+
+The quiz calendar spans --years of history. Each case resolves to a date
+range and is answered three ways: comparing the raw ISO date strings,
+comparing a parsed datetime column, and two binary searches on a
+ScheduleIndex (built once, as the store does per scope and data version).
+tests/test_schedule.py checks that the index finds the same rows as a scan.
+
+    python benchmarks/bench_schedule.py --quizzes 10000 100000 1000000 --years 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_quizzes
+from data_layer import apply_column_types
+from schedule import ScheduleIndex, resolve_date_range
+
+CASES = ("quizzes tomorrow", "quizzes next week", "quizzes in December", "upcoming quizzes after Jan 1")
+
+
+def best_us(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def string_scan(raw, start, end):
+    dates = raw['scheduled_date']
+    mask = (dates >= start.isoformat()) & (dates <= end.isoformat()) if end else dates >= start.isoformat()
+    return raw[mask]
+
+
+def typed_scan(typed, start, end):
+    dates = typed['scheduled_date']
+    mask = (dates >= str(start)) & (dates <= str(end)) if end else dates >= str(start)
+    return typed[mask]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quizzes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    today = date.today()
+    first_day = date(today.year - args.years + 1, 1, 1)
+    days = (date(today.year, 12, 31) - first_day).days + 1
+
+    print(f"{'quizzes':>8} {'case':<30} {'rows':>7} {'string us':>10} {'typed us':>9} {'index us':>9}")
+    for rows in args.quizzes:
+        raw = generate_quizzes(rows, start=first_day.isoformat(), days=days)
+        typed = apply_column_types(raw)
+        build_start = time.perf_counter()
+        schedule = ScheduleIndex(typed)
+        build_ms = (time.perf_counter() - build_start) * 1000
+        for query in CASES:
+            start, end = resolve_date_range(query, today)
+            found = len(schedule.between(start, end))
+            print(f"{rows:>8} {query:<30} {found:>7} "
+                  f"{best_us(lambda: string_scan(raw, start, end), args.repeat):>10.0f} "
+                  f"{best_us(lambda: typed_scan(typed, start, end), args.repeat):>9.0f} "
+                  f"{best_us(lambda: schedule.between(start, end), args.repeat):>9.0f}")
+        print(f"{rows:>8} {'(index build, once)':<30} {'':>7} {'':>10} {'':>9} {build_ms * 1000:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Memory held by N concurrent sessions: per-session copies vs the shared store.
+
+The per-session path mirrors the old loaders, where st.cache_data handed every
+session its own copy of the roster and each session then filtered it. The shared path hands every session the slice
+materialized once by DataStore.
+
+    python benchmarks/bench_shared_store.py --rows 50000 --sessions 1 50 200
+
+Bytes are counted with DataFrame.memory_usage(deep=True) (tracemalloc does not
+see Arrow-backed string buffers); view slices are counted once, through the
+table they point into.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import generate_students
+from data_layer import DataStore
+from local_backend import LocalBackend
+from roles import ADMIN_ROLES, apply_role_based_filtering
+
+
+def per_session(backend, sessions):
+    roster = backend.tables['students']
+    admins = list(ADMIN_ROLES)
+    # Every session's copies are identical, so size each kind once
+    roster_bytes = roster.memory_usage(deep=True).sum()
+    scoped_bytes = {k: apply_role_based_filtering(roster, k).memory_usage(deep=True).sum() for k in admins}
+    return sum(roster_bytes + scoped_bytes[admins[i % len(admins)]] for i in range(sessions))
+
+
+def shared(backend, sessions):
+    store = DataStore(backend, ('students',), min_interval=float('inf'))
+    admins = list(ADMIN_ROLES)
+    for i in range(sessions):
+        store.get('students', admins[i % len(admins)])
+    return store.total_bytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 50, 200])
+    args = parser.parse_args()
+
+    backend = LocalBackend({'students': generate_students(args.rows)})
+    print(f"students table: {args.rows} rows")
+    print(f"{'sessions':>8} {'per-session MB':>15} {'shared MB':>10}")
+    for sessions in args.sessions:
+        copies = per_session(backend, sessions)
+        store = shared(backend, sessions)
+        print(f"{sessions:>8} {copies / 2**20:>15.2f} {store / 2**20:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
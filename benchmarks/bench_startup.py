@@ -0,0 +1,89 @@
+"""Startup latency: time until the login page and the dashboard are rendered.
+
+Each run starts a fresh interpreter and drives main.py with Streamlit's
+AppTest against the local data (offline mode). It times the first script
+run, which renders the login page, then logging in, which verifies the
+password and renders the dashboard, then one more dashboard rerun.
+--eager first imports the data stack, as main.py did before those imports
+were moved below the login gate, to show what the login page saves.
+Reports which of HEAVY_MODULES (tests/conftest.py) the login page loaded;
+tests/test_startup.py requires none.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tests.conftest import HEAVY_MODULES, cold_start, log_in
+
+# What main.py imported at startup before it deferred them
+EAGER_MODULES = ('pandas', 'data_layer', 'snapshot', 'query_engine', 'history', 'stats',
+                 'exports', 'instrumentation', 'paging', 'precompute', 'trends')
+
+
+def child(eager):
+    """One cold start in this process; prints its timings as JSON"""
+    os.environ.setdefault('DATA_MODE', 'offline')
+    os.environ.setdefault('PRECOMPUTE_WORKERS', '0')
+    os.environ.setdefault('TREND_HISTORY_DIR', '')
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    start = time.perf_counter()
+    if eager:
+        for module in EAGER_MODULES:
+            __import__(module)
+    at = AppTest.from_file(os.path.join(ROOT, 'main.py'), default_timeout=120)
+    at.run()
+    timings['login page'] = time.perf_counter() - start
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    start = time.perf_counter()
+    at = log_in(at)
+    timings['log in to dashboard'] = time.perf_counter() - start
+    if not at.session_state['logged_in'] or at.exception:
+        raise SystemExit("Could not reach the dashboard with the demo credentials")
+
+    start = time.perf_counter()
+    at.run()
+    timings['dashboard rerun'] = time.perf_counter() - start
+    print(json.dumps({'timings': timings, 'loaded': loaded}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--eager', action='store_true', help="also time startup with the data stack imported up front")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.eager)
+
+    modes = [('deferred', False)] + ([('eager', True)] if args.eager else [])
+    loaded = set()
+    print(f"median of {args.runs} cold starts, offline mode")
+    print(f"{'imports':<10} {'stage':<22} {'median ms':>10} {'max ms':>8}")
+    for label, eager in modes:
+        runs = [cold_start(eager) for _ in range(args.runs)]
+        if not eager:
+            loaded.update(m for run in runs for m in run['loaded'])
+        for stage in runs[0]['timings']:
+            values = [run['timings'][stage] * 1000 for run in runs]
+            print(f"{label:<10} {stage:<22} {statistics.median(values):>10.1f} {max(values):>8.1f}")
+
+    if loaded:
+        print(f"\nThe login page loaded {', '.join(sorted(loaded))}")
+    else:
+        print(f"\nThe login page loaded none of {', '.join(HEAVY_MODULES)}")
+
+
+if __name__ == '__main__':
+    main()
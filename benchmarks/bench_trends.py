@@ -0,0 +1,77 @@
+"""Trend queries from per-group rollups vs scanning the raw history.
+
+A synthetic roster is recorded into a TrendStore once per simulated day,
+with attendance drifting daily and a new quiz every week. After each
+checkpoint the same trend question ("Grade 8 North attendance over the
+last 30 days") is answered from the rollups and by filtering and grouping
+the raw attendance history. tests/test_trends.py checks that both give the
+same answer.
+
+    python benchmarks/bench_trends.py --rows 50000 --days 7 30 90
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import TREND_SCOPE, generate_students, naive_trend
+from data_layer import apply_column_types
+from trends import TrendStore
+
+FIRST_DAY = date(2026, 1, 5)
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+    return value, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 90])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    students = apply_column_types(generate_students(args.rows))
+    store = TrendStore()
+    snapshots = []
+    record_ms = []
+    print(f"{args.rows} students")
+    print(f"{'days':>5} {'history rows':>13} {'rollup rows':>12} {'record ms':>10} {'rollup ms':>10} {'raw scan ms':>12}")
+    for day_index in range(max(args.days)):
+        today = FIRST_DAY + timedelta(days=day_index)
+        drift = rng.integers(-2, 3, len(students))
+        students = students.assign(attendance_rate=np.clip(students['attendance_rate'] + drift, 0, 100)
+                                   .astype(students['attendance_rate'].dtype))
+        if day_index % 7 == 0:
+            students = students.assign(quiz_date=today.isoformat())
+        _, ms = timed(lambda: store.record(students, today), repeat=1)
+        record_ms.append(ms)
+        snapshots.append(students[['grade', 'region', 'attendance_rate']].assign(recorded_on=today.isoformat()))
+
+        days = day_index + 1
+        if days not in args.days:
+            continue
+        start, end = today - timedelta(days=29), today
+        history = pd.concat(snapshots, ignore_index=True)
+        _, rollup_ms = timed(lambda: store.trend('attendance_rate', TREND_SCOPE, start, end, 'day'))
+        _, naive_ms = timed(lambda: naive_trend(history, start.isoformat(), end.isoformat()), repeat=1)
+        rollup_rows = store.stats()['rollup_rows']
+        print(f"{days:>5} {len(history):>13} {rollup_rows:>12} {np.median(record_ms):>10.1f} "
+              f"{rollup_ms:>10.2f} {naive_ms:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Shared synthetic tables for the benchmark scripts.
+
+generate_students() and generate_quizzes() build district-scale tables with
+the same columns as Data/*.csv. Scores vary by class group, attendance is
+skewed towards high rates, and students with poor attendance are more
+likely to have homework pending. Everything is vectorized, so a million
+rows take a couple of seconds.
+
+The test oracles at the end (random role scopes, a raw-history trend, the
+original keyword cascade and its query corpus, the history query mix) are
+shared by tests/ and the benchmarks that time against them.
+"""
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+GRADES = (6, 7, 8, 9, 10)
+CLASSES = ('A', 'B', 'C', 'D')
+REGIONS = ('North', 'South', 'East', 'West')
+SUBJECTS = ('Mathematics', 'Science', 'English', 'History', 'Geography',
+            'Physics', 'Chemistry', 'Biology', 'Computer Science')
+
+FIRST_NAMES = ('Rahul', 'Priya', 'Amit', 'Sneha', 'Vikram', 'Ananya', 'Rohan', 'Isha',
+               'Karan', 'Divya', 'Aditya', 'Kavya', 'Arjun', 'Meera', 'Siddharth', 'Pooja')
+LAST_NAMES = ('Sharma', 'Patel', 'Kumar', 'Reddy', 'Singh', 'Gupta', 'Verma', 'Nair',
+              'Mehta', 'Joshi', 'Rao', 'Iyer', 'Das', 'Menon', 'Chopra', 'Bose')
+
+
+def _choose(rng, values, rows, weights=None):
+    """Random positions into values, optionally weighted"""
+    p = None if weights is None else np.asarray(weights, dtype=float) / np.sum(weights)
+    return rng.choice(len(values), size=rows, p=p)
+
+
+def _pick(rng, values, rows, weights=None):
+    return np.asarray(values)[_choose(rng, values, rows, weights)]
+
+
+def generate_students(rows, seed=0, grades=GRADES, classes=CLASSES, regions=REGIONS,
+                      region_weights=None, score_mean=72, score_sd=14, class_sd=5,
+                      absence_scale=4, quiz_date='2024-11-28'):
+    """Students table: one row per student with a latest quiz and attendance"""
+    rng = np.random.default_rng(seed)
+    grade_at = _choose(rng, grades, rows)
+    class_at = _choose(rng, classes, rows)
+    region_at = _choose(rng, regions, rows, region_weights)
+
+    # Each (grade, class, region) group gets its own score offset
+    group = (grade_at * len(classes) + class_at) * len(regions) + region_at
+    offsets = rng.normal(0, class_sd, len(grades) * len(classes) * len(regions))
+    quiz_score = np.clip(np.rint(rng.normal(score_mean + offsets[group], score_sd)), 0, 100)
+
+    # Most students attend nearly every day; a long tail attends far less
+    attendance_rate = np.clip(np.rint(100 - rng.gamma(2.0, absence_scale, rows)), 40, 100)
+    pending_probability = np.clip(0.2 + (95 - attendance_rate) / 60, 0.05, 0.9)
+    homework_status = np.where(rng.random(rows) < pending_probability, 'pending', 'submitted')
+
+    subject = _pick(rng, SUBJECTS[:3], rows)
+    quiz_number = rng.integers(1, 4, rows).astype(str)
+    first = _pick(rng, FIRST_NAMES, rows).astype(object)
+    last = _pick(rng, LAST_NAMES, rows).astype(object)
+
+    return pd.DataFrame({
+        'student_id': np.arange(1, rows + 1),
+        'name': first + ' ' + last,
+        'grade': np.asarray(grades)[grade_at],
+        'class': np.asarray(classes)[class_at],
+        'region': np.asarray(regions)[region_at],
+        'homework_status': homework_status,
+        'quiz_score': quiz_score.astype(int),
+        'quiz_name': subject.astype(object) + ' Quiz ' + quiz_number.astype(object),
+        'quiz_date': quiz_date,
+        'attendance_rate': attendance_rate.astype(int),
+    })
+
+
+def generate_quizzes(rows, seed=0, grades=GRADES, classes=CLASSES, regions=REGIONS,
+                     start='2024-12-01', days=60):
+    """Quizzes table: quizzes scheduled for class groups over a date window"""
+    rng = np.random.default_rng(seed + 1)
+    subject = _pick(rng, SUBJECTS, rows).astype(object)
+    kind = _pick(rng, ('Quiz', 'Test'), rows).astype(object)
+    first_day = date.fromisoformat(start)
+    offsets = rng.integers(0, days, rows)
+    scheduled = [(first_day + timedelta(days=int(d))).isoformat() for d in range(days)]
+
+    return pd.DataFrame({
+        'quiz_id': np.arange(1, rows + 1),
+        'quiz_name': subject + ' ' + kind,
+        'grade': _pick(rng, grades, rows),
+        'class': _pick(rng, classes, rows),
+        'region': _pick(rng, regions, rows),
+        'scheduled_date': np.asarray(scheduled, dtype=object)[offsets],
+        'subject': subject,
+        'total_marks': _pick(rng, (50, 100), rows),
+    })
+
+
+# ==================== Test oracles ====================
+
+SCOPE_CHOICES = {'grade': GRADES + (12,), 'class': CLASSES + ('Z',), 'region': REGIONS}
+
+
+def random_scopes(count, seed=0):
+    """Random role scopes; columns may be unrestricted or name unknown values"""
+    rng = random.Random(seed)
+    scopes = []
+    for _ in range(count):
+        scope = {}
+        for column, choices in SCOPE_CHOICES.items():
+            if rng.random() < 0.8:
+                values = rng.sample(choices, rng.randint(1, 3))
+                scope[column] = values[0] if len(values) == 1 and rng.random() < 0.5 else values
+        scopes.append(scope)
+    return scopes
+
+
+# The scope naive_trend() filters to, as TrendStore.trend() takes it
+TREND_SCOPE = [('grade', (8,)), ('region', ('North',))]
+
+
+def naive_trend(history, start, end):
+    """Average attendance per day, filtering every recorded snapshot"""
+    rows = history[(history['grade'] == 8) & (history['region'] == 'North')
+                   & (history['recorded_on'] >= start) & (history['recorded_on'] <= end)]
+    return rows.groupby('recorded_on', sort=True)['attendance_rate'].mean().round(1)
+
+
+TEMPLATES = [
+    "Which students haven't submitted their homework yet?",
+    "Show me all students' homework status",
+    "List students with pending assignments",
+    "Show me performance data for Grade {grade}",
+    "Who are the low-performing students?",
+    "Show me quiz scores for all students in grade {grade}",
+    "List all upcoming quizzes scheduled for next week",
+    "Any future quiz for class {cls}?",
+    "Show me attendance data",
+    "Who has low attendance?",
+    "List all students",
+    "Display complete student list",
+    "What is the weather like in the {region}?",
+    "struggling kids with poor marks in grade {grade}",
+]
+
+FILLER = ["please", "quickly", "for my report", "today", "thanks", "in my scope"]
+
+
+def legacy_intent(query):
+    """Intent selection exactly as the original if/elif cascade did it"""
+    query = query.lower().strip()
+    if any(k in query for k in ['homework', 'assignment', 'submitted', 'submission']):
+        if any(k in query for k in ['not submitted', 'pending', "haven't", "didn't"]):
+            return 'homework_pending'
+        return 'homework_status'
+    elif any(k in query for k in ['performance', 'score', 'marks', 'grades', 'quiz results']):
+        if any(k in query for k in ['low', 'poor', 'below', 'struggling', 'failing']):
+            return 'low_performance'
+        return 'performance'
+    elif any(k in query for k in ['upcoming', 'scheduled', 'next', 'future']) and 'quiz' in query:
+        return 'upcoming_quizzes'
+    elif any(k in query for k in ['attendance', 'present', 'absent', 'attendance rate']):
+        if any(k in query for k in ['low', 'poor', 'below']):
+            return 'low_attendance'
+        return 'attendance'
+    elif any(k in query for k in ['all students', 'list students', 'show students', 'student list']):
+        return 'student_list'
+    return 'unknown'
+
+
+def make_corpus(size, seed=0):
+    """Synthetic dashboard queries from TEMPLATES, half with FILLER appended"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        query = rng.choice(TEMPLATES).format(
+            grade=rng.randint(6, 10), cls=rng.choice('ABCD'),
+            region=rng.choice(['North', 'South'])
+        )
+        if rng.random() < 0.5:
+            query = f"{query} {rng.choice(FILLER)}"
+        corpus.append(query)
+    return corpus
+
+
+HISTORY_QUERIES = [
+    "List all students",
+    "Show me attendance data",
+    "Which students haven't submitted their homework yet?",
+    "Who are the low-performing students?",
+    "Show me performance data for Grade 8"
+]
+
+# A new data version every this many queries, as after a sync
+QUERIES_PER_VERSION = 7
@@ -0,0 +1,47 @@
+"""Write synthetic students.csv and quizzes.csv at district scale.
+
+The output directory can be served directly by the dashboard in offline mode
+(snapshot it first for a fast cold start):
+
+    python benchmarks/generate_data.py --students 1000000 --out-dir /tmp/district
+    python snapshot.py --source csv --data-dir /tmp/district
+    DATA_MODE=offline LOCAL_DATA_DIR=/tmp/district streamlit run main.py
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import CLASSES, GRADES, REGIONS, generate_quizzes, generate_students
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--quizzes', type=int, default=None, help="default: one per 50 students")
+    parser.add_argument('--grades', type=int, nargs='+', default=list(GRADES))
+    parser.add_argument('--classes', nargs='+', default=list(CLASSES))
+    parser.add_argument('--regions', nargs='+', default=list(REGIONS))
+    parser.add_argument('--region-weights', type=float, nargs='+', default=None)
+    parser.add_argument('--score-mean', type=float, default=72)
+    parser.add_argument('--score-sd', type=float, default=14)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out-dir', required=True)
+    args = parser.parse_args()
+
+    layout = dict(grades=args.grades, classes=args.classes, regions=args.regions)
+    students = generate_students(args.students, args.seed, region_weights=args.region_weights,
+                                 score_mean=args.score_mean, score_sd=args.score_sd, **layout)
+    quizzes = generate_quizzes(args.quizzes or max(1, args.students // 50), args.seed, **layout)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for table_name, frame in (('students', students), ('quizzes', quizzes)):
+        path = os.path.join(args.out_dir, table_name + '.csv')
+        frame.to_csv(path, index=False)
+        print(f"{table_name}: {len(frame)} rows -> {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,626 @@
+"""Data access layer for the admin portal.
+
+Builds Supabase queries that are already narrowed to an admin's scope, so each
+admin only pulls their own slice of the ``students`` and ``quizzes`` tables
+instead of downloading everything and filtering in pandas.
+
+Tables are read page by page with ``range()`` requests and streamed into
+pre-typed columns, so peak memory is one page of JSON plus the compact frame
+rather than the whole JSON payload, a list of dicts and the frame at once.
+
+IncrementalTable keeps a loaded frame current by fetching only rows whose
+``updated_at`` is at or past the last sync, instead of re-downloading the
+whole table on every cache expiry. LocalTable serves a table read once from
+local storage (see snapshot.py) through the same interface.
+
+Every request has a timeout (set on the shared HTTP client) and transient
+network errors are retried with exponential backoff. DataStore.prefetch()
+syncs all tables concurrently, so a cold load costs about one table's round
+trips rather than the sum of them.
+"""
+
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+try:
+    import httpx
+    RETRYABLE_ERRORS = (httpx.TransportError, ConnectionError, TimeoutError)
+except ImportError:
+    httpx = None
+    RETRYABLE_ERRORS = (ConnectionError, TimeoutError)
+
+from analytics import JoinIndex
+from instrumentation import span
+from roles import ScopeIndex, scope_values
+from schedule import ScheduleIndex
+from stats import build_aggregates, rollup
+
+# Columns the dashboard and query engine actually read from each table
+TABLE_COLUMNS = {
+    'students': [
+        'student_id', 'name', 'grade', 'class', 'region',
+        'homework_status', 'quiz_score', 'quiz_name', 'quiz_date', 'attendance_rate'
+    ],
+    'quizzes': [
+        'quiz_id', 'quiz_name', 'grade', 'class', 'region',
+        'subject', 'scheduled_date'
+    ]
+}
+
+# Stable ordering column used to paginate each table
+TABLE_KEYS = {
+    'students': 'student_id',
+    'quizzes': 'quiz_id'
+}
+
+# Compact dtypes applied while streaming; unlisted columns stay as objects
+COLUMN_DTYPES = {
+    'student_id': 'int32',
+    'quiz_id': 'int32',
+    'grade': 'int8',
+    'class': 'category',
+    'region': 'category',
+    'homework_status': 'category',
+    'quiz_name': 'category',
+    'subject': 'category',
+    'quiz_score': 'float32',
+    'attendance_rate': 'float32',
+    'scheduled_date': 'datetime64[ns]',
+    'quiz_date': 'datetime64[ns]'
+}
+
+# Stored for a null in an integer column (no id or grade is negative)
+INTEGER_NULL = -1
+
+# Supabase caps responses at 1000 rows by default, so never ask for more
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_PREFETCH = 2
+
+# Column maintained by a trigger on every insert/update, used as sync watermark
+WATERMARK_COLUMN = 'updated_at'
+
+# Seconds before a Supabase request is abandoned, and pooled connections
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_CONNECTIONS = 20
+
+# Attempts per request after the first, and the initial retry delay in seconds
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.2
+
+def create_pooled_client(url, key, timeout=DEFAULT_TIMEOUT, max_connections=DEFAULT_MAX_CONNECTIONS):
+    """Supabase client on one keep-alive HTTP connection pool with timeouts.
+
+    The client is thread-safe; build it once per process and share it so
+    every session and concurrent fetch reuses the same connections.
+    """
+    from supabase import ClientOptions, create_client
+
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
+
+def execute_with_retry(make_request, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Run make_request(), retrying transient network errors with backoff.
+
+    Delays double after each attempt, with jitter so concurrent callers do
+    not retry in lockstep. Other errors (bad columns, auth) raise at once.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return make_request()
+        except RETRYABLE_ERRORS:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+
+def build_query(client, table_name, columns=None, filters=None, since=None):
+    """Return a select over table_name with optional filters.
+
+    A filter value that is a list or tuple matches any of its values. With
+    since set, only rows whose updated_at is at or after it are selected.
+    """
+    if columns is None:
+        columns = TABLE_COLUMNS.get(table_name)
+    query = client.table(table_name).select(",".join(columns) if columns else "*")
+
+    for column, value in (filters or {}).items():
+        values = scope_values(value)
+        query = query.eq(column, values[0]) if len(values) == 1 else query.in_(column, list(values))
+
+    if since is not None:
+        query = query.gte(WATERMARK_COLUMN, since)
+
+    return query
+
+def iter_pages(make_query, page_size=DEFAULT_PAGE_SIZE, prefetch=DEFAULT_PREFETCH,
+               retries=DEFAULT_RETRIES):
+    """Yield pages of rows from make_query() until an empty page is returned.
+
+    make_query must build a fresh, ordered query for every call. With
+    prefetch > 1, that many range requests are kept in flight at once.
+    Each page request is retried on transient errors.
+
+    A short page does not end the table: the server may cap rows per
+    response below page_size (PostgREST's max_rows), so the rest of that
+    page's range is requested before moving on.
+    """
+    def fetch(start, end):
+        return execute_with_retry(lambda: make_query().range(start, end).execute().data, retries)
+
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as pool:
+        # (start, end, future) per range requested, in row order
+        in_flight = deque()
+        next_start = 0
+        for _ in range(max(1, prefetch)):
+            in_flight.append((next_start, next_start + page_size - 1,
+                              pool.submit(fetch, next_start, next_start + page_size - 1)))
+            next_start += page_size
+        while in_flight:
+            start, end, future = in_flight.popleft()
+            rows = future.result()
+            if not rows:
+                for _, _, pending in in_flight:
+                    pending.cancel()
+                return
+            yield rows
+            if len(rows) < end - start + 1:
+                rest = start + len(rows)
+                in_flight.appendleft((rest, end, pool.submit(fetch, rest, end)))
+            else:
+                in_flight.append((next_start, next_start + page_size - 1,
+                                  pool.submit(fetch, next_start, next_start + page_size - 1)))
+                next_start += page_size
+
+class ColumnarFrameBuilder:
+    """Accumulates pages of row dicts into typed column chunks"""
+
+    def __init__(self, columns, dtypes=None):
+        self.columns = list(columns)
+        self.dtypes = {c: (dtypes or COLUMN_DTYPES).get(c) for c in self.columns}
+        self.chunks = {c: [] for c in self.columns}
+        self.categories = {c: {} for c in self.columns if self.dtypes[c] == 'category'}
+
+    def append(self, rows):
+        for column in self.columns:
+            values = [row.get(column) for row in rows]
+            dtype = self.dtypes[column]
+            if dtype == 'category':
+                lookup = self.categories[column]
+                codes = [-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values]
+                self.chunks[column].append(np.asarray(codes, dtype='int32'))
+            elif dtype is not None and dtype.startswith('datetime64'):
+                # Parsed once here rather than on every date comparison
+                self.chunks[column].append(pd.to_datetime(values, format='ISO8601', utc=True)
+                                           .tz_localize(None).to_numpy(dtype=dtype))
+            elif pd.api.types.is_integer_dtype(dtype):
+                values = [INTEGER_NULL if v is None or v != v else v for v in values]
+                self.chunks[column].append(np.asarray(values, dtype=dtype))
+            elif dtype is not None:
+                self.chunks[column].append(np.asarray(values, dtype=dtype))
+            else:
+                self.chunks[column].append(np.asarray(values, dtype=object))
+
+    def build(self):
+        data = {}
+        for column in self.columns:
+            dtype = self.dtypes[column]
+            chunks = self.chunks[column]
+            if dtype == 'category':
+                codes = np.concatenate(chunks) if chunks else np.empty(0, dtype='int32')
+                # Categories sorted, as astype('category') leaves them for CSV and snapshot loads
+                categories = pd.Index(list(self.categories[column]))
+                order = categories.argsort()
+                remap = np.empty(len(order) + 1, dtype='int32')
+                remap[order] = np.arange(len(order), dtype='int32')
+                remap[-1] = -1
+                data[column] = pd.Categorical.from_codes(remap[codes], categories[order])
+            elif chunks:
+                data[column] = np.concatenate(chunks)
+            else:
+                data[column] = np.empty(0, dtype=dtype or object)
+        return pd.DataFrame(data, columns=self.columns)
+
+def apply_column_types(dataframe):
+    """Cast a frame loaded some other way (e.g. CSV) to the streaming dtypes"""
+    dtypes = {c: d for c, d in COLUMN_DTYPES.items() if c in dataframe.columns}
+    nulls = {c: INTEGER_NULL for c, d in dtypes.items() if pd.api.types.is_integer_dtype(d)}
+    return dataframe.fillna(nulls).astype(dtypes)
+
+def data_version(dataframe):
+    """Content fingerprint of a loaded frame, stored in its attrs.
+
+    Unchanged data fetched again gets the same version, so results cached
+    against it stay valid across reloads.
+    """
+    if 'data_version' not in dataframe.attrs:
+        dataframe.attrs['data_version'] = int(pd.util.hash_pandas_object(dataframe).sum())
+    return dataframe.attrs['data_version']
+
+def fetch_table(client, table_name, columns=None, filters=None,
+                page_size=DEFAULT_PAGE_SIZE, prefetch=DEFAULT_PREFETCH, since=None):
+    """Stream a (filtered) table page by page into a compact, typed DataFrame"""
+    if columns is None:
+        columns = TABLE_COLUMNS[table_name]
+    key = TABLE_KEYS.get(table_name, columns[0])
+
+    def make_query():
+        return build_query(client, table_name, columns, filters, since).order(key)
+
+    builder = ColumnarFrameBuilder(columns)
+    for rows in iter_pages(make_query, page_size, prefetch):
+        builder.append(rows)
+    frame = builder.build()
+    data_version(frame)
+    return frame
+
+# ==================== INCREMENTAL SYNC ====================
+
+class IncrementalTable:
+    """One table (or scoped slice of it) kept current with watermark syncs.
+
+    The first sync loads every row. Later syncs fetch only rows with
+    updated_at >= the newest value seen so far, plus the key column alone to
+    detect hard deletes, and merge them into the cached frame. Tables without
+    an updated_at column fall back to full reloads.
+
+    The merged frame replaces the previous one rather than being mutated, so
+    readers holding the old frame are never affected by a concurrent sync.
+    """
+
+    def __init__(self, client, table_name, filters=None, columns=None,
+                 page_size=DEFAULT_PAGE_SIZE, prefetch=DEFAULT_PREFETCH):
+        self.client = client
+        self.table_name = table_name
+        self.filters = filters
+        self.columns = list(columns or TABLE_COLUMNS[table_name])
+        self.key = TABLE_KEYS.get(table_name, self.columns[0])
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.frame = None
+        self.watermark = None
+        self.incremental = True
+        self.last_sync = 0.0
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    def _fetch(self, columns, since=None):
+        return fetch_table(self.client, self.table_name, columns, self.filters,
+                           self.page_size, self.prefetch, since)
+
+    def _full_load(self):
+        if not self.incremental:
+            return self._keyed(self._fetch(self.columns))
+        try:
+            frame = self._fetch(self.columns + [WATERMARK_COLUMN])
+        except RETRYABLE_ERRORS:
+            raise
+        except Exception:
+            frame = self._fetch(self.columns)
+            # The plain select worked, so the table has no watermark column
+            # and every sync has to be a full reload
+            self.incremental = False
+            return self._keyed(frame)
+        self.watermark = frame[WATERMARK_COLUMN].max() if len(frame) else None
+        return self._keyed(frame)
+
+    def _keyed(self, frame):
+        """Index a frame by its key column and drop any stale version stamp"""
+        frame.index = frame[self.key].to_numpy()
+        frame.attrs = {}
+        return frame
+
+    def _merge(self, changes, live_keys):
+        """Return the current frame with changed rows replaced and deletes dropped"""
+        changes = self._keyed(changes)
+        stale = self.frame.index.isin(changes.index) | ~self.frame.index.isin(live_keys)
+        if not stale.any() and changes.empty:
+            return self.frame
+        merged = pd.concat([self.frame[~stale], changes]).sort_index(kind='stable')
+        return self._keyed(apply_column_types(merged))
+
+    def sync(self, min_interval=0):
+        """Bring the frame up to date; returns (frame, changed).
+
+        Syncs more recent than min_interval seconds are skipped. changed is
+        False when the frame (and so its data version) is unchanged.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_sync < min_interval:
+                if self.frame is not None:
+                    return self.frame, False
+                if self.last_error is not None:
+                    raise self.last_error
+
+            try:
+                with span(f'supabase sync: {self.table_name}'):
+                    return self._sync(now)
+            except Exception as e:
+                # Remember the failure so callers fall back without retrying
+                # the network on every call within min_interval, and keep
+                # serving the last good frame if there is one
+                self.last_sync = now
+                self.last_error = e
+                if self.frame is not None:
+                    return self.frame, False
+                raise
+
+    def _sync(self, now):
+        if self.frame is None or not self.incremental:
+            frame = self._full_load()
+            changed = self.frame is None or data_version(frame) != data_version(self.frame)
+        else:
+            changes = self._fetch(self.columns + [WATERMARK_COLUMN], since=self.watermark)
+            live_keys = self._fetch([self.key])[self.key].to_numpy()
+            frame = self._merge(changes, live_keys)
+            # updated_at >= watermark always re-reads the newest rows, so
+            # compare contents rather than trusting a non-empty change set
+            changed = frame is not self.frame and data_version(frame) != data_version(self.frame)
+            if len(changes):
+                self.watermark = max(self.watermark or '', changes[WATERMARK_COLUMN].max())
+
+        if changed:
+            self.frame = frame
+            data_version(self.frame)
+        self.last_sync = now
+        self.last_error = None
+        return self.frame, changed
+
+class LocalTable:
+    """A table read once from local storage, with IncrementalTable's sync()"""
+
+    def __init__(self, table_name, load, columns=None):
+        self.table_name = table_name
+        self.load = load
+        self.columns = list(columns or TABLE_COLUMNS[table_name])
+        self.key = TABLE_KEYS.get(table_name, self.columns[0])
+        self.frame = None
+        self.lock = threading.Lock()
+
+    def sync(self, min_interval=0):
+        """Load the table on first use; returns (frame, changed)"""
+        with self.lock:
+            if self.frame is not None:
+                return self.frame, False
+            with span(f'local load: {self.table_name}'):
+                loaded = self.load()
+                frame = apply_column_types(loaded[[c for c in self.columns if c in loaded.columns]])
+                frame.index = frame[self.key].to_numpy()
+                # Snapshots carry the version computed when they were written
+                frame.attrs = {k: v for k, v in loaded.attrs.items() if k == 'data_version'}
+                data_version(frame)
+            self.frame = frame
+            return frame, True
+
+# ==================== SHARED STORE ====================
+
+class TableSnapshot:
+    """One immutable version of a table with its scope index and slices"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.version = data_version(frame)
+        self.index = ScopeIndex(frame)
+        self.slices = {}
+        self.aggregates = None
+        self.stats = {}
+        self.schedules = {}
+
+class DataStore:
+    """Process-wide table store shared read-only by every session.
+
+    Each table is synced once per process (not once per admin), and every
+    data version keeps a single frame plus one materialized slice per admin
+    scope. Grade+region scopes are views into the frame, so memory stays
+    roughly constant as sessions and admins are added. Frames and slices
+    handed out are shared and must not be modified.
+    """
+
+    def __init__(self, client, table_names=('students', 'quizzes'), min_interval=0):
+        self.min_interval = min_interval
+        self.tables = {name: IncrementalTable(client, name) for name in table_names}
+        self.snapshots = {}
+        # Slice version last handed out per (table, admin)
+        self.served_versions = {}
+        self.lock = threading.Lock()
+        self.executor = None
+        self.joins = None
+        # Optional TrendStore fed with each new version of trend_table
+        self.trends = None
+        self.trend_table = 'students'
+        # Error of the last failed history write, None once one succeeds
+        self.trend_error = None
+
+    @classmethod
+    def local(cls, loaders):
+        """A store over local tables, given a loader callable per table"""
+        store = cls(None, table_names=())
+        store.tables = {name: LocalTable(name, load) for name, load in loaders.items()}
+        return store
+
+    def prefetch(self, table_names=None):
+        """Sync tables concurrently so get() calls within min_interval are lookups.
+
+        Waits for every sync; each request is bounded by the client timeout
+        and retries. Failures are not raised here: each table remembers its
+        error and get() reports it (or serves the last good frame). Syncs run
+        in a copy of the caller's context, so their spans reach its timer.
+        """
+        names = list(table_names or self.tables)
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.tables)),
+                                                   thread_name_prefix='table-sync')
+        futures = [self.executor.submit(contextvars.copy_context().run, self._sync, name) for name in names]
+        wait(futures)
+
+    def _sync(self, table_name):
+        """Sync one table, recording a new version or day of trend_table in the history.
+
+        A failed history write is kept in trend_error rather than raised, so
+        the table still loads; the next sync tries to record it again.
+        """
+        frame, changed = self.tables[table_name].sync(self.min_interval)
+        if self.trends is not None and table_name == self.trend_table:
+            try:
+                with span('trend history'):
+                    self.trends.refresh(frame)
+                self.trend_error = None
+            except Exception as e:
+                self.trend_error = e
+        return frame, changed
+
+    def get(self, table_name, admin_key):
+        """Return (slice, changed) for an admin's scope of a table.
+
+        changed is True when this scope's rows differ from what was last
+        returned for it, so results cached for other scopes can be kept.
+        """
+        frame, _ = self._sync(table_name)
+        with self.lock:
+            snapshot = self.snapshots.get(table_name)
+            if snapshot is None or snapshot.frame is not frame:
+                with span(f'scope index: {table_name}'):
+                    snapshot = TableSnapshot(frame)
+                self.snapshots[table_name] = snapshot
+
+            scoped = snapshot.slices.get(admin_key)
+            if scoped is None:
+                with span(f'role filtering: {table_name}'):
+                    scoped = snapshot.index.resolve(admin_key)
+                # Version each slice by its own contents so a change elsewhere
+                # in the table leaves this scope's cached results valid
+                scoped.attrs = {}
+                data_version(scoped)
+                snapshot.slices[admin_key] = scoped
+
+            version = data_version(scoped)
+            changed = self.served_versions.get((table_name, admin_key)) != version
+            self.served_versions[(table_name, admin_key)] = version
+            return scoped, changed
+
+    def versions(self):
+        """Data version of each loaded table"""
+        with self.lock:
+            return {name: snapshot.version for name, snapshot in self.snapshots.items()}
+
+    def scope_stats(self, admin_key, table_name='students'):
+        """Quick Stats for an admin, rolled up from per-group aggregates.
+
+        Aggregates and each admin's roll-up are computed once per data
+        version of the table. Returns None until the table has been loaded.
+        """
+        with self.lock:
+            snapshot = self.snapshots.get(table_name)
+            if snapshot is None:
+                return None
+            if admin_key not in snapshot.stats:
+                if snapshot.aggregates is None:
+                    snapshot.aggregates = build_aggregates(snapshot.frame)
+                snapshot.stats[admin_key] = rollup(snapshot.aggregates, admin_key)
+            return snapshot.stats[admin_key]
+
+    def schedule_index(self, admin_key, table_name='quizzes'):
+        """ScheduleIndex over an admin's slice of the quizzes table.
+
+        Built once per scope and data version. Returns None until the
+        admin's slice has been loaded with get().
+        """
+        with self.lock:
+            snapshot = self.snapshots.get(table_name)
+            if snapshot is None or admin_key not in snapshot.slices:
+                return None
+            if admin_key not in snapshot.schedules:
+                with span(f'schedule index: {table_name}'):
+                    snapshot.schedules[admin_key] = ScheduleIndex(snapshot.slices[admin_key])
+            return snapshot.schedules[admin_key]
+
+    def join_index(self, students='students', quizzes='quizzes'):
+        """JoinIndex over the full students and quizzes tables.
+
+        Built once per pair of data versions and shared by every admin, who
+        restrict it to their scope per query. Returns None until both tables
+        have been loaded.
+        """
+        with self.lock:
+            left = self.snapshots.get(students)
+            right = self.snapshots.get(quizzes)
+            if left is None or right is None:
+                return None
+            versions = (left.version, right.version)
+            if self.joins is None or self.joins[0] != versions:
+                with span('join index'):
+                    self.joins = (versions, JoinIndex(left.frame, right.frame))
+            return self.joins[1]
+
+    def trend_store(self):
+        """The store's TrendStore, or None without one or until trend_table has been loaded.
+
+        The table's versions are recorded as it syncs (on the prefetch
+        threads when prefetch() is used), so this is a lookup.
+        """
+        with self.lock:
+            loaded = self.trend_table in self.snapshots
+        return self.trends if loaded else None
+
+    def memory_report(self):
+        """Rows and bytes held per table and per materialized scope.
+
+        Slices that are views into the table frame share its memory and are
+        flagged as such rather than counted twice in the total.
+        """
+        rows = []
+        with self.lock:
+            for table_name, snapshot in self.snapshots.items():
+                table_bytes = int(snapshot.frame.memory_usage(deep=True).sum())
+                rows.append({'table': table_name, 'scope': '(table)', 'rows': len(snapshot.frame),
+                             'bytes': table_bytes, 'view': False})
+                key_column = snapshot.index.frame.columns[0]
+                base = snapshot.index.frame[key_column].to_numpy()
+                for admin_key, scoped in snapshot.slices.items():
+                    is_view = len(scoped) > 0 and np.shares_memory(scoped[key_column].to_numpy(), base)
+                    rows.append({'table': table_name, 'scope': admin_key, 'rows': len(scoped),
+                                 'bytes': int(scoped.memory_usage(deep=True).sum()), 'view': bool(is_view)})
+        return rows
+
+    def total_bytes(self):
+        """Bytes actually held, counting view slices once through their table"""
+        return sum(r['bytes'] for r in self.memory_report() if not r['view'])
+
+# ==================== HEALTH CHECK ====================
+
+class ConnectionMonitor:
+    """Runs a connection probe on a background thread every interval seconds.
+
+    Readers get the latest (ok, message) result immediately instead of
+    waiting on a network round trip during a rerun.
+    """
+
+    def __init__(self, probe, interval=30):
+        self.probe = probe
+        self.interval = interval
+        self.result = None
+        self.checked_at = None
+        self.thread = threading.Thread(target=self._run, name='connection-monitor', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            self.result = self.probe()
+            self.checked_at = time.time()
+            time.sleep(self.interval)
+
+    def status(self):
+        """Latest (ok, message), or (None, message) before the first probe"""
+        if self.result is None:
+            return None, "⏳ Checking connection..."
+        return self.result
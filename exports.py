@@ -0,0 +1,100 @@
+"""Query result export for the admin portal.
+
+Files are generated only when a download is requested. Rows are written in
+chunks into a spooled temporary file (kept in memory while small, moved to
+disk past SPOOL_BYTES), so an export never builds the whole file as one
+Python string. Parquet and Arrow IPC need pyarrow and are only offered when
+it is installed.
+"""
+
+import gzip
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+DEFAULT_CHUNK_ROWS = 10000
+# Exports larger than this spill from memory to a temporary file
+SPOOL_BYTES = 8 * 2**20
+
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv', 'arrow': False},
+    'csv.gz': {'label': 'CSV (gzip)', 'extension': 'csv.gz', 'mime': 'application/gzip', 'arrow': False},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet', 'arrow': True},
+    'arrow': {'label': 'Arrow IPC', 'extension': 'arrow', 'mime': 'application/vnd.apache.arrow.file', 'arrow': True}
+}
+
+def available_formats():
+    """Export formats usable with the installed libraries"""
+    return [key for key, spec in EXPORT_FORMATS.items() if pa is not None or not spec['arrow']]
+
+def iter_chunks(dataframe, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield row slices of at most chunk_rows (one empty slice for no rows)"""
+    if len(dataframe) == 0:
+        yield dataframe
+        return
+    for start in range(0, len(dataframe), chunk_rows):
+        yield dataframe.iloc[start:start + chunk_rows]
+
+def iter_csv_chunks(dataframe, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield the CSV encoding of a frame as UTF-8 byte chunks"""
+    for i, chunk in enumerate(iter_chunks(dataframe, chunk_rows)):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode('utf-8')
+
+# ==================== WRITERS ====================
+
+def _write_csv(dataframe, out, chunk_rows):
+    for data in iter_csv_chunks(dataframe, chunk_rows):
+        out.write(data)
+
+def _write_csv_gz(dataframe, out, chunk_rows):
+    # mtime=0 keeps the output identical for identical results
+    with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6, mtime=0) as compressed:
+        _write_csv(dataframe, compressed, chunk_rows)
+
+def _arrow_batches(dataframe, chunk_rows):
+    schema = pa.Schema.from_pandas(dataframe, preserve_index=False)
+    batches = (
+        pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        for chunk in iter_chunks(dataframe, chunk_rows)
+    )
+    return schema, batches
+
+def _write_parquet(dataframe, out, chunk_rows):
+    schema, batches = _arrow_batches(dataframe, chunk_rows)
+    with pa.parquet.ParquetWriter(out, schema) as writer:
+        for batch in batches:
+            writer.write_table(batch)
+
+def _write_arrow(dataframe, out, chunk_rows):
+    schema, batches = _arrow_batches(dataframe, chunk_rows)
+    with pa.ipc.new_file(out, schema) as writer:
+        for batch in batches:
+            writer.write_table(batch)
+
+EXPORT_WRITERS = {
+    'csv': _write_csv,
+    'csv.gz': _write_csv_gz,
+    'parquet': _write_parquet,
+    'arrow': _write_arrow
+}
+
+def write_export(dataframe, fmt, out, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write a frame to a binary file object in one of EXPORT_FORMATS"""
+    if fmt not in available_formats():
+        raise ValueError(f"Export format '{fmt}' is not available")
+    EXPORT_WRITERS[fmt](dataframe, out, chunk_rows)
+
+def export_file(dataframe, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Export a frame into a rewound temporary file and return it"""
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    write_export(dataframe, fmt, out, chunk_rows)
+    out.seek(0)
+    return out
+
+def export_filename(prefix, fmt, stamp):
+    return f"{prefix}_{stamp}.{EXPORT_FORMATS[fmt]['extension']}"
@@ -0,0 +1,55 @@
+"""Per-session query history.
+
+History keeps compact records (query text, intent, params, scope, data
+version, row count, message) rather than whole responses. Result frames live
+only in the shared, size-bounded result cache and are looked up again, or
+recomputed from the store, when an entry is opened.
+"""
+
+import itertools
+from collections import deque
+
+from query_engine import normalize_query, result_key
+
+DEFAULT_HISTORY_LIMIT = 50
+
+class QueryHistory:
+    """The last max_entries queries of a session, newest last"""
+
+    def __init__(self, max_entries=DEFAULT_HISTORY_LIMIT):
+        self.entries = deque(maxlen=max_entries)
+        self.ids = itertools.count(1)
+
+    def record(self, query, response, scope, data_version, admin, timestamp):
+        """Store a compact record of a response and return it"""
+        intent, params = normalize_query(query)
+        data = response['data']
+        entry = {
+            'id': next(self.ids),
+            'query': query,
+            'intent': intent,
+            'params': dict(params),
+            'scope': scope,
+            'data_version': data_version,
+            'rows': len(data) if data is not None else 0,
+            'success': response['success'],
+            'message': response['message'],
+            'admin': admin,
+            'timestamp': timestamp
+        }
+        self.entries.append(entry)
+        return entry
+
+    def cache_key(self, entry):
+        """The result cache key the entry's response was stored under"""
+        return result_key(entry['query'], entry['scope'], entry['data_version'])
+
+    def recent(self, count=5):
+        """Newest entries first"""
+        return list(itertools.islice(reversed(self.entries), count))
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
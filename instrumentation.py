@@ -0,0 +1,183 @@
+"""Lightweight timing instrumentation for dashboard reruns.
+
+A RerunTimer collects the spans of one rerun. Library code reports its hot
+stages through span(), which records into whichever timer is active on the
+current thread and costs next to nothing when profiling is off; measure()
+does the same for counted quantities such as result payload bytes. Finished
+reruns can be appended to a JSON lines file and summarized across sessions:
+
+    python instrumentation.py spans.jsonl
+"""
+
+import argparse
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+_ACTIVE_TIMER = contextvars.ContextVar('active_timer', default=None)
+# Names of the open sections; a copied context (see DataStore.prefetch)
+# carries them, so spans on a worker thread nest under the caller's section
+_OPEN_SECTIONS = contextvars.ContextVar('open_sections', default=())
+
+class RerunTimer:
+    """Wall-clock time spent in each dashboard section during one rerun.
+
+    Sections may be recorded from several threads at once.
+    """
+
+    def __init__(self, session=None, scope=None):
+        self.rerun_id = uuid.uuid4().hex[:12]
+        self.session = session
+        self.scope = scope
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.sections = []
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name):
+        open_sections = _OPEN_SECTIONS.get()
+        parent = open_sections[-1] if open_sections else None
+        token = _OPEN_SECTIONS.set(open_sections + (name,))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _OPEN_SECTIONS.reset(token)
+            elapsed = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.sections.append((name, parent, start - self.started, elapsed))
+
+    def count(self, name, value):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def rows(self):
+        """Section timings as records for display, slowest first"""
+        with self.lock:
+            sections = list(self.sections)
+        return [
+            {'section': name, 'within': parent or '', 'ms': round(ms, 2)}
+            for name, parent, _, ms in sorted(sections, key=lambda s: s[3], reverse=True)
+        ]
+
+    def spans(self):
+        """Section timings as flat records for export, in start order"""
+        with self.lock:
+            sections, counters = list(self.sections), dict(self.counters)
+        return [
+            {
+                'rerun': self.rerun_id,
+                'session': self.session,
+                'scope': self.scope,
+                'section': name,
+                'parent': parent,
+                'start': round(self.started_at + offset, 6),
+                'ms': round(ms, 3)
+            }
+            for name, parent, offset, ms in sorted(sections, key=lambda s: s[2])
+        ] + [
+            {
+                'rerun': self.rerun_id,
+                'session': self.session,
+                'scope': self.scope,
+                'counter': name,
+                'value': value
+            }
+            for name, value in counters.items()
+        ]
+
+def activate(timer):
+    """Make timer the target of span() on this thread (None disables spans)"""
+    _ACTIVE_TIMER.set(timer)
+
+@contextmanager
+def span(name):
+    """Time a stage into the active timer, if profiling is on"""
+    timer = _ACTIVE_TIMER.get()
+    if timer is None:
+        yield
+        return
+    with timer.section(name):
+        yield
+
+def measure(name, value):
+    """Add value to a counter of the active timer, if profiling is on.
+
+    value may be a callable, so costly measurements are skipped otherwise.
+    """
+    timer = _ACTIVE_TIMER.get()
+    if timer is None:
+        return
+    value = value() if callable(value) else value
+    if value is not None:
+        timer.count(name, value)
+
+# ==================== EXPORT ====================
+
+class SpanSink:
+    """Appends finished reruns to a JSON lines file, one span per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, timer):
+        lines = ''.join(json.dumps(record) + '\n' for record in timer.spans())
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+def read_spans(path):
+    """Load an exported span file into a DataFrame"""
+    return pd.read_json(path, lines=True)
+
+def latency_summary(spans):
+    """Count, p50, p95 and max latency (ms) per section, slowest p95 first"""
+    if 'section' not in spans.columns:
+        return pd.DataFrame(columns=['count', 'p50_ms', 'p95_ms', 'max_ms'])
+    grouped = spans.dropna(subset=['section']).groupby('section')['ms']
+    summary = pd.DataFrame({
+        'count': grouped.size(),
+        'p50_ms': grouped.quantile(0.5),
+        'p95_ms': grouped.quantile(0.95),
+        'max_ms': grouped.max()
+    })
+    return summary.sort_values('p95_ms', ascending=False).round(2)
+
+def counter_summary(spans):
+    """Reruns, mean and p95 per rerun of each counter"""
+    if 'counter' not in spans.columns:
+        return pd.DataFrame(columns=['reruns', 'mean', 'p95'])
+    per_rerun = spans.dropna(subset=['counter']).groupby(['counter', 'rerun'])['value'].sum()
+    grouped = per_rerun.groupby(level='counter')
+    return pd.DataFrame({
+        'reruns': grouped.size(),
+        'mean': grouped.mean(),
+        'p95': grouped.quantile(0.95)
+    }).round(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize exported rerun spans")
+    parser.add_argument('path', help="JSON lines file written via PROFILE_SPANS_PATH")
+    args = parser.parse_args()
+
+    spans = read_spans(args.path)
+    print(f"{spans['rerun'].nunique()} reruns, {spans['session'].nunique()} sessions")
+    print(latency_summary(spans).to_string())
+    counters = counter_summary(spans)
+    if len(counters):
+        print()
+        print(counters.to_string())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Local stand-in for the Supabase client.
+
+Implements the small slice of the supabase-py query builder the portal uses
+(``table().select().eq()...execute()``) on top of in-memory tables, so the data
+layer can be exercised and benchmarked without a network connection.
+
+A fixed per-request latency can be added to stand in for network round
+trips, and max_rows caps the rows of any one response the way PostgREST's
+max_rows setting does. Writes (``insert``, ``update``, ``delete``) are supported too. Tables that have
+an ``updated_at`` column get it stamped on every write, the way a
+``moddatetime`` trigger would in Postgres.
+"""
+
+import itertools
+import os
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+
+class LocalResponse:
+    """Mimics the ``APIResponse`` object returned by supabase-py"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class LocalQuery:
+    """Chainable query over a single local table"""
+
+    def __init__(self, backend, table_name):
+        self.backend = backend
+        self.table_name = table_name
+        self.action = 'select'
+        self.values = None
+        self.columns = None
+        self.filters = []
+        self.order_by = None
+        self.row_range = None
+
+    def select(self, columns="*"):
+        if columns and columns.strip() != "*":
+            self.columns = [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, rows):
+        self.action = 'insert'
+        self.values = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values):
+        self.action = 'update'
+        self.values = values
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, lambda s: s == value))
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append((column, lambda s: s.isin(values)))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append((column, lambda s: s > value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append((column, lambda s: s >= value))
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count):
+        self.row_range = (0, count - 1)
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    def _mask(self, frame):
+        mask = pd.Series(True, index=frame.index)
+        for column, predicate in self.filters:
+            if column not in frame.columns:
+                raise KeyError(f"column {self.table_name}.{column} does not exist")
+            mask &= predicate(frame[column])
+        return mask
+
+    def execute(self):
+        self.backend.requests += 1
+        if self.backend.latency:
+            time.sleep(self.backend.latency)
+        if self.action != 'select':
+            return self.backend.write(self)
+
+        frame = self.backend.tables.get(self.table_name, pd.DataFrame())
+        if self.filters:
+            frame = frame[self._mask(frame)]
+        if self.order_by is not None:
+            column, desc = self.order_by
+            ordered = frame[column].is_monotonic_decreasing if desc else frame[column].is_monotonic_increasing
+            if not ordered:
+                frame = frame.sort_values(column, ascending=not desc, kind='stable')
+        if self.row_range is not None:
+            start, end = self.row_range
+            frame = frame.iloc[start:end + 1]
+        if self.backend.max_rows is not None:
+            frame = frame.iloc[:self.backend.max_rows]
+        if self.columns is not None:
+            missing = [c for c in self.columns if c not in frame.columns]
+            if missing:
+                raise KeyError(f"column {self.table_name}.{missing[0]} does not exist")
+            frame = frame[self.columns]
+        return LocalResponse(frame.to_dict('records'))
+
+
+class LocalBackend:
+    """In-memory tables exposed through a Supabase-like ``table()`` API"""
+
+    def __init__(self, tables=None, latency=0, max_rows=None):
+        self.tables = dict(tables or {})
+        self.latency = latency
+        self.max_rows = max_rows
+        self.requests = 0
+        # Strictly increasing write clock for updated_at stamps
+        self.clock = itertools.count(1)
+        self.epoch = datetime(2024, 1, 1)
+
+    @classmethod
+    def from_csv_dir(cls, directory):
+        """Load every ``<table>.csv`` in a directory as a table"""
+        tables = {}
+        for filename in os.listdir(directory):
+            if filename.endswith('.csv'):
+                tables[filename[:-4]] = pd.read_csv(os.path.join(directory, filename))
+        return cls(tables)
+
+    def table(self, table_name):
+        return LocalQuery(self, table_name)
+
+    def now(self):
+        return (self.epoch + timedelta(microseconds=next(self.clock))).isoformat()
+
+    def write(self, query):
+        frame = self.tables.get(query.table_name, pd.DataFrame())
+        stamp = {'updated_at': self.now()} if 'updated_at' in frame.columns else {}
+
+        if query.action == 'insert':
+            rows = pd.DataFrame([{**row, **stamp} for row in query.values])
+            self.tables[query.table_name] = pd.concat([frame, rows], ignore_index=True)
+            return LocalResponse(rows.to_dict('records'))
+
+        mask = query._mask(frame)
+        if query.action == 'update':
+            for column, value in {**query.values, **stamp}.items():
+                frame.loc[mask, column] = value
+            return LocalResponse(frame[mask].to_dict('records'))
+
+        self.tables[query.table_name] = frame[~mask].reset_index(drop=True)
+        return LocalResponse(frame[mask].to_dict('records'))
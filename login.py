@@ -1,13 +1,9 @@
 import streamlit as st
-from supabase import create_client
 from dotenv import load_dotenv
-import os
-import time
+
+from auth import auth_from_env, verify_login
 
 load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 st.set_page_config(
     page_title="Login - Dumroo Admin",
@@ -15,28 +11,18 @@ st.set_page_config(
     layout="centered"
 )
 
-def verify_login(email, password):
-    """Verify admin credentials"""
-    try:
-        # Demo credentials for testing
-        demo_users = {
-            'rajesh@school.com': {'password': 'admin123', 'role': 'admin1'},
-            'lakshmi@school.com': {'password': 'admin123', 'role': 'admin2'},
-            'anil@school.com': {'password': 'admin123', 'role': 'admin3'}
-        }
-        
-        if email in demo_users and demo_users[email]['password'] == password:
-            return True, demo_users[email]['role']
-        return False, None
-    except Exception as e:
-        st.error(f"Login error: {str(e)}")
-        return False, None
+@st.cache_resource
+def get_auth():
+    """Admin directory and session signer (see auth.auth_from_env), once per process"""
+    return auth_from_env()
 
 # Initialize session state
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'admin_role' not in st.session_state:
     st.session_state.admin_role = None
+if 'auth_token' not in st.session_state:
+    st.session_state.auth_token = None
 
 # If already logged in, show success and redirect info
 if st.session_state.logged_in:
@@ -46,6 +32,7 @@ if st.session_state.logged_in:
     if st.button("🚪 Logout"):
         st.session_state.logged_in = False
         st.session_state.admin_role = None
+        st.session_state.auth_token = None
         st.rerun()
     st.stop()
 
@@ -90,11 +77,17 @@ with st.container():
         
         if st.button("🚀 Login", use_container_width=True, type="primary"):
             if email and password:
-                success, role = verify_login(email, password)
+                try:
+                    admin_directory, session_signer = get_auth()
+                    success, role = verify_login(admin_directory, email, password)
+                except Exception as e:
+                    st.error(f"Login error: {str(e)}")
+                    success, role = False, None
                 
                 if success:
                     st.session_state.logged_in = True
                     st.session_state.admin_role = role
+                    st.session_state.auth_token = session_signer.issue(email, role)
                     st.success("✅ Login successful!")
                     st.balloons()
                     st.info("🎯 Now run this command in a NEW terminal window:")
@@ -123,6 +116,10 @@ with st.container():
             - Email: `anil@school.com`
             - Password: `admin123`
             
+            **4. Dr. Meera Iyer** (Grades 8 and 9, North and South)
+            - Email: `meera@school.com`
+            - Password: `admin123`
+            
             ---
             
             *Use any of these credentials to test the system*
@@ -1,22 +1,53 @@
 import streamlit as st
-import pandas as pd
 from dotenv import load_dotenv
 import os
-from supabase import create_client
 from datetime import datetime
+from functools import partial
+import uuid
+
+# Only what the login page needs is imported up front; the data stack is
+# imported below the login gate (see DASHBOARD)
+from roles import ADMIN_ROLES, scope_label
+from auth import auth_from_env, session_claims, verify_login
 
 # Load environment variables
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Seconds before a single Supabase request is abandoned
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+# DATA_MODE=offline serves the local snapshot (or CSV copies) in LOCAL_DATA_DIR
+# without contacting Supabase; online mode falls back to it when Supabase fails
+OFFLINE_MODE = os.getenv("DATA_MODE", "online").lower() == "offline"
+
+# Opt-in profiling: admins listed in PROFILING_ADMINS ("*" for all) get a
+# per-rerun timing panel, and PROFILE_SPANS_PATH appends every rerun's spans
+# to a JSON lines file (summarize with `python instrumentation.py <path>`)
+PROFILING_ADMINS = {a.strip() for a in os.getenv("PROFILING_ADMINS", "").split(",") if a.strip()}
+PROFILE_SPANS_PATH = os.getenv("PROFILE_SPANS_PATH")
+
+# Offered as one-click buttons, and always kept warm in the result cache
+EXAMPLE_QUERIES = [
+    "Which students haven't submitted their homework yet?",
+    "Show me performance data for Grade 8",
+    "List all upcoming quizzes",
+    "Who are the low-performing students?",
+    "Show me attendance data",
+    "List all students"
+]
+
+# Dates are parsed at load; show them without a time of day
+RESULT_COLUMN_CONFIG = {
+    'scheduled_date': st.column_config.DateColumn(format='YYYY-MM-DD'),
+    'period': st.column_config.DateColumn(format='YYYY-MM-DD')
+}
 
 # Validate Supabase credentials
-if not SUPABASE_URL or not SUPABASE_KEY:
-    st.error("❌ Supabase credentials not found. Please set SUPABASE_URL and SUPABASE_KEY in environment variables or .streamlit/secrets.toml")
+if not OFFLINE_MODE and (not SUPABASE_URL or not SUPABASE_KEY):
+    st.error("❌ Supabase credentials not found. Please set SUPABASE_URL and SUPABASE_KEY in environment variables or .streamlit/secrets.toml, or set DATA_MODE=offline")
     st.stop()
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 st.set_page_config(
     page_title="Dumroo AI Admin Panel",
     page_icon="📚",
@@ -26,25 +57,28 @@ st.set_page_config(
 
 # ==================== AUTHENTICATION ====================
 
-def verify_login(email, password):
-    """Verify admin credentials"""
-    demo_users = {
-        'rajesh@school.com': {'password': 'admin123', 'role': 'admin1'},
-        'lakshmi@school.com': {'password': 'admin123', 'role': 'admin2'},
-        'anil@school.com': {'password': 'admin123', 'role': 'admin3'}
-    }
-    
-    if email in demo_users and demo_users[email]['password'] == password:
-        return True, demo_users[email]['role']
-    return False, None
+@st.cache_resource
+def get_auth():
+    """Admin directory and session signer (see auth.auth_from_env), once per process"""
+    return auth_from_env()
 
 # Initialize session state
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'admin_role' not in st.session_state:
     st.session_state.admin_role = None
-if 'query_history' not in st.session_state:
-    st.session_state.query_history = []
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+if 'auth_token' not in st.session_state:
+    st.session_state.auth_token = None
+
+# Reruns check the session's signed token, not the password; an expired
+# token or an admin removed from the directory means logging in again
+admin_directory, session_signer = get_auth()
+if st.session_state.logged_in and session_claims(session_signer, admin_directory, st.session_state.auth_token) is None:
+    st.session_state.logged_in = False
+    st.session_state.admin_role = None
+    st.session_state.auth_token = None
 
 # ==================== LOGIN PAGE ====================
 
@@ -88,11 +122,12 @@ if not st.session_state.logged_in:
         
         if st.button("🚀 Login", use_container_width=True, type="primary"):
             if email and password:
-                success, role = verify_login(email, password)
+                success, role = verify_login(admin_directory, email, password)
                 
                 if success:
                     st.session_state.logged_in = True
                     st.session_state.admin_role = role
+                    st.session_state.auth_token = session_signer.issue(email, role)
                     st.success("✅ Login successful!")
                     st.balloons()
                     st.rerun()
@@ -115,10 +150,52 @@ if not st.session_state.logged_in:
 
 # ==================== DASHBOARD (Only shows if logged in) ====================
 
+# Imported on the first authenticated rerun of the process rather than at
+# startup, so the login page renders without pandas, the Supabase client or
+# the query engine; later reruns find them already in sys.modules
+import pandas as pd
+
+from data_layer import TABLE_COLUMNS, ConnectionMonitor, DataStore, create_pooled_client, data_version
+from snapshot import DEFAULT_DATA_DIR, local_table_loaders
+from query_engine import RESULT_CACHE, RESULT_CACHE_MAX_BYTES, LastQuery, run_query
+from history import DEFAULT_HISTORY_LIMIT, QueryHistory
+from stats import quick_stats
+from exports import EXPORT_FORMATS, available_formats, export_file, export_filename
+from instrumentation import RerunTimer, SpanSink, activate, measure, span
+from paging import DEFAULT_PAGE_SIZE, PAGE_SIZES, frame_payload_bytes, page_count, page_slice, payload_bytes
+from precompute import DEFAULT_WORKERS, Precomputer
+from trends import TrendStore
+from schedule import ScheduleIndex
+
+LOCAL_DATA_DIR = os.getenv("LOCAL_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_DATA_DIR))
+
+# Memory caps: queries kept per session, and MB of result frames cached
+# for all sessions (history re-reads its results from that cache)
+QUERY_HISTORY_LIMIT = int(os.getenv("QUERY_HISTORY_LIMIT", DEFAULT_HISTORY_LIMIT))
+RESULT_CACHE.max_bytes = int(float(os.getenv("RESULT_CACHE_MB", RESULT_CACHE_MAX_BYTES / 2**20)) * 2**20)
+
+# Append-only score/attendance history behind trend queries ("" keeps it in
+# memory only)
+TREND_HISTORY_DIR = os.getenv("TREND_HISTORY_DIR", os.path.join(LOCAL_DATA_DIR, 'history'))
+
+# Threads that warm the result cache for every admin after each data
+# refresh (0 disables warming)
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", DEFAULT_WORKERS))
+
+if 'query_history' not in st.session_state:
+    st.session_state.query_history = QueryHistory(QUERY_HISTORY_LIMIT)
+if 'last_query' not in st.session_state:
+    st.session_state.last_query = LastQuery()
+
+@st.cache_resource
+def get_supabase_client():
+    """One pooled, thread-safe client, created on first use and reused across reruns and sessions"""
+    return create_pooled_client(SUPABASE_URL, SUPABASE_KEY, timeout=SUPABASE_TIMEOUT)
+
 # Test Supabase connection
-def test_supabase_connection():
+def test_supabase_connection(client):
     try:
-        test_response = supabase.table('students').select("*").limit(1).execute()
+        test_response = client.table('students').select("student_id").limit(1).execute()
         if test_response.data:
             return True, "✅ Connected to Supabase"
         else:
@@ -126,6 +203,77 @@ def test_supabase_connection():
     except Exception as e:
         return False, f"❌ Connection failed: {str(e)}"
 
+# Seconds between background connection probes
+HEALTH_CHECK_INTERVAL = 30
+
+@st.cache_resource
+def get_connection_monitor():
+    """Probe Supabase on a background thread instead of on every rerun"""
+    return ConnectionMonitor(partial(test_supabase_connection, get_supabase_client()), interval=HEALTH_CHECK_INTERVAL)
+
+@st.fragment(run_every=HEALTH_CHECK_INTERVAL)
+def render_connection_status():
+    if OFFLINE_MODE:
+        st.info("📴 Offline mode: serving local data")
+        return
+    is_connected, msg = get_connection_monitor().status()
+    if is_connected:
+        st.success(msg)
+    elif is_connected is None:
+        st.info(msg)
+    else:
+        st.error(msg)
+
+@st.fragment
+def render_memory_report():
+    # Deep memory accounting walks every string, so only run it on request
+    if st.toggle("Show memory usage", key='show_memory_report'):
+        stores = data_stores()
+        memory_report = [row for store in stores for row in store.memory_report()]
+        if memory_report:
+            st.dataframe(pd.DataFrame(memory_report), use_container_width=True, hide_index=True)
+            st.caption(f"Held by this server: {sum(store.total_bytes() for store in stores) / 2**20:.2f} MB")
+        else:
+            st.caption("No tables loaded yet")
+
+@st.fragment
+def render_paged_result(data, key):
+    """One page of a result frame with sort and paging controls.
+
+    Only the visible page is sent to the browser, and paging or sorting
+    reruns just this fragment.
+    """
+    if len(data) <= PAGE_SIZES[0]:
+        visible = data
+    else:
+        col_sort, col_order, col_size, col_page = st.columns([3, 2, 2, 2])
+        with col_sort:
+            sort_column = st.selectbox(
+                "Sort by",
+                options=[None] + list(data.columns),
+                format_func=lambda c: "(result order)" if c is None else c,
+                key=f"{key}_sort"
+            )
+        with col_order:
+            descending = st.toggle("Descending", key=f"{key}_descending")
+        with col_size:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES,
+                                     index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_size")
+        pages = page_count(len(data), page_size)
+        # A smaller result than last time may have fewer pages
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+        with col_page:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+        visible = page_slice(data, page - 1, page_size, sort_column, not descending)
+        first_row = (page - 1) * page_size + 1
+    
+    measure('result payload bytes', partial(payload_bytes, visible))
+    measure('unpaged payload bytes', partial(frame_payload_bytes, data))
+    st.dataframe(visible, use_container_width=True, hide_index=True, column_config=RESULT_COLUMN_CONFIG)
+    if visible is not data:
+        st.caption(f"Rows {first_row}-{first_row + len(visible) - 1} of {len(data)}")
+
 st.markdown("""
     <style>
     .main-header {
@@ -137,169 +285,95 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=60)
-def load_student_data():
-    try:
-        response = supabase.table('students').select("*").execute()
-        if response.data:
-            return pd.DataFrame(response.data)
-        else:
-            st.warning("⚠️ No students data in Supabase")
-            return pd.DataFrame()
-    except Exception as e:
-        st.error(f"❌ Error loading students: {str(e)}")
-        csv_path = 'data/students.csv'
-        if os.path.exists(csv_path):
-            return pd.read_csv(csv_path)
-        return pd.DataFrame()
-
-@st.cache_data(ttl=60)
-def load_quiz_data():
-    try:
-        response = supabase.table('quizzes').select("*").execute()
-        if response.data:
-            return pd.DataFrame(response.data)
-        else:
-            st.warning("⚠️ No quizzes data in Supabase")
-            return pd.DataFrame()
-    except Exception as e:
-        st.error(f"❌ Error loading quizzes: {str(e)}")
-        csv_path = 'data/quizzes.csv'
-        if os.path.exists(csv_path):
-            return pd.read_csv(csv_path)
-        return pd.DataFrame()
-
-ADMIN_ROLES = {
-    'admin1': {
-        'name': 'Mr. Rajesh Singh',
-        'grade': 8,
-        'class': 'A',
-        'region': 'North',
-        'description': 'Manages Grade 8, Class A in North region'
-    },
-    'admin2': {
-        'name': 'Ms. Lakshmi Reddy',
-        'grade': 9,
-        'region': 'South',
-        'description': 'Manages Grade 9 (all classes) in South region'
-    },
-    'admin3': {
-        'name': 'Mr. Anil Patel',
-        'grade': 8,
-        'region': 'North',
-        'description': 'Manages Grade 8 (all classes) in North region'
-    }
-}
+# Seconds between incremental syncs of each table
+SYNC_INTERVAL = 60
 
-def apply_role_based_filtering(dataframe, admin_key):
-    role = ADMIN_ROLES[admin_key]
-    filtered_data = dataframe.copy()
-    
-    if 'grade' in filtered_data.columns:
-        filtered_data = filtered_data[filtered_data['grade'] == role['grade']]
-    
-    if 'class' in role and 'class' in filtered_data.columns:
-        filtered_data = filtered_data[filtered_data['class'] == role['class']]
-    
-    if 'region' in filtered_data.columns:
-        filtered_data = filtered_data[filtered_data['region'] == role['region']]
-    
-    return filtered_data
+@st.cache_resource
+def get_data_store():
+    """Tables and per-scope slices shared by every session in this process"""
+    store = DataStore(get_supabase_client(), min_interval=SYNC_INTERVAL)
+    store.trends = get_trend_store()
+    return store
 
-def process_natural_language_query(query, students_df, quizzes_df):
-    query = query.lower().strip()
-    
-    response = {
-        'success': False,
-        'message': '',
-        'data': None,
-        'type': 'unknown'
-    }
-    
-    if any(keyword in query for keyword in ['homework', 'assignment', 'submitted', 'submission']):
-        if any(keyword in query for keyword in ['not submitted', 'pending', "haven't", "didn't"]):
-            pending_students = students_df[students_df['homework_status'] == 'pending']
-            
-            response['success'] = True
-            response['type'] = 'homework_pending'
-            response['data'] = pending_students[['name', 'grade', 'class', 'homework_status']]
-            response['message'] = f"Found {len(pending_students)} student(s) with pending homework submissions"
-            
-            if len(pending_students) == 0:
-                response['message'] = "Great news! All students have submitted their homework! 🎉"
-        else:
-            response['success'] = True
-            response['type'] = 'homework_status'
-            response['data'] = students_df[['name', 'grade', 'class', 'homework_status']]
-            response['message'] = "Homework submission status for all students in your scope"
-    
-    elif any(keyword in query for keyword in ['performance', 'score', 'marks', 'grades', 'quiz results']):
-        filtered_data = students_df.copy()
-        
-        if 'grade 8' in query:
-            filtered_data = filtered_data[filtered_data['grade'] == 8]
-        elif 'grade 9' in query:
-            filtered_data = filtered_data[filtered_data['grade'] == 9]
-        
-        if any(keyword in query for keyword in ['low', 'poor', 'below', 'struggling', 'failing']):
-            threshold = 70
-            filtered_data = filtered_data[filtered_data['quiz_score'] < threshold]
-            avg_score = filtered_data['quiz_score'].mean() if len(filtered_data) > 0 else 0
-            
-            response['success'] = True
-            response['type'] = 'low_performance'
-            response['data'] = filtered_data[['name', 'grade', 'class', 'quiz_score', 'quiz_name']]
-            response['message'] = f"Students scoring below {threshold}% (Average: {avg_score:.1f}%)"
-        else:
-            avg_score = filtered_data['quiz_score'].mean()
-            
-            response['success'] = True
-            response['type'] = 'performance'
-            response['data'] = filtered_data[['name', 'grade', 'class', 'quiz_score', 'quiz_name']]
-            response['message'] = f"Performance data (Average score: {avg_score:.1f}%)"
-    
-    elif any(keyword in query for keyword in ['upcoming', 'scheduled', 'next', 'future']) and 'quiz' in query:
-        response['success'] = True
-        response['type'] = 'upcoming_quizzes'
-        response['data'] = quizzes_df[['quiz_name', 'grade', 'class', 'subject', 'scheduled_date']]
-        response['message'] = f"Found {len(quizzes_df)} upcoming quiz(zes) in your scope"
-    
-    elif any(keyword in query for keyword in ['attendance', 'present', 'absent', 'attendance rate']):
-        avg_attendance = students_df['attendance_rate'].mean()
-        
-        if any(keyword in query for keyword in ['low', 'poor', 'below']):
-            threshold = 90
-            low_attendance = students_df[students_df['attendance_rate'] < threshold]
-            
-            response['success'] = True
-            response['type'] = 'low_attendance'
-            response['data'] = low_attendance[['name', 'grade', 'class', 'attendance_rate']]
-            response['message'] = f"Students with attendance below {threshold}% (Class average: {avg_attendance:.1f}%)"
-        else:
-            response['success'] = True
-            response['type'] = 'attendance'
-            response['data'] = students_df[['name', 'grade', 'class', 'attendance_rate']]
-            response['message'] = f"Attendance data (Class average: {avg_attendance:.1f}%)"
-    
-    elif any(keyword in query for keyword in ['all students', 'list students', 'show students', 'student list']):
-        response['success'] = True
-        response['type'] = 'student_list'
-        response['data'] = students_df[['name', 'grade', 'class', 'homework_status', 'quiz_score', 'attendance_rate']]
-        response['message'] = f"Showing all {len(students_df)} students in your scope"
-    
-    else:
-        response['success'] = False
-        response['message'] = """I couldn't understand that query. Here are some examples:
-        
-• "Which students haven't submitted their homework yet?"
-• "Show me performance data for Grade 8"
-• "List all upcoming quizzes scheduled for next week"
-• "Who are the low-performing students?"
-• "Show me attendance data"
-• "List all students"
-        """
-    
-    return response
+@st.cache_resource
+def get_trend_store():
+    """History of the primary store's students table, replayed once per process"""
+    return TrendStore(TREND_HISTORY_DIR or None)
+
+@st.cache_resource
+def get_precomputer():
+    """One cache-warming worker pool per process, or None when disabled"""
+    if PRECOMPUTE_WORKERS <= 0:
+        return None
+    return Precomputer(EXAMPLE_QUERIES, max_workers=PRECOMPUTE_WORKERS)
+
+@st.cache_resource
+def get_local_store():
+    """Local snapshot (or CSV) tables, read once and shared like the live store"""
+    store = DataStore.local(local_table_loaders(LOCAL_DATA_DIR))
+    # The local copy only feeds the history when it is the primary source
+    if OFFLINE_MODE:
+        store.trends = get_trend_store()
+    return store
+
+def data_stores():
+    """Stores to read from, in order of preference"""
+    if OFFLINE_MODE:
+        return [get_local_store()]
+    return [get_data_store(), get_local_store()]
+
+@st.cache_resource
+def get_span_sink(path):
+    """One writer per export file, shared by every session"""
+    return SpanSink(path)
+
+def history_result(entry):
+    """Result frame for a history entry and whether the data changed since.
+
+    Served from the shared result cache when it is still there, otherwise
+    the query is run again on the entry's scope.
+    """
+    response = RESULT_CACHE.get(st.session_state.query_history.cache_key(entry))
+    if response is not None:
+        return response['data'], False
+    students, students_store = load_table('students', entry['scope'])
+    quizzes, quizzes_store = load_table('quizzes', entry['scope'])
+    version = (data_version(students), data_version(quizzes))
+    response = run_query(entry['query'], students, quizzes, scope=entry['scope'], data_version=version,
+                         join_index=shared_join_index(students_store, quizzes_store),
+                         schedule=quizzes_store.schedule_index(entry['scope']) if quizzes_store else None,
+                         trends=students_store.trend_store() if students_store else None)
+    return response['data'], version != entry['data_version']
+
+def load_table(table_name, admin_key):
+    """Return (slice, store) for an admin's scope of a table.
+
+    Reads the live store unless in offline mode, and the local copy when
+    Supabase is unreachable. store is None when no source has the table.
+    """
+    for store in data_stores():
+        try:
+            data, changed = store.get(table_name, admin_key)
+        except Exception as e:
+            if store is get_local_store():
+                st.error(f"❌ No local copy of {table_name}: {str(e)}")
+            else:
+                st.error(f"❌ Error loading {table_name}: {str(e)}")
+            continue
+        if changed:
+            RESULT_CACHE.invalidate(admin_key)
+        if data.empty:
+            st.warning(f"⚠️ No {table_name} data found")
+        return data, store
+    return pd.DataFrame(columns=TABLE_COLUMNS[table_name]), None
+
+def shared_join_index(students_store, quizzes_store):
+    """The store's JoinIndex when both tables came from the same store"""
+    if students_store is None or students_store is not quizzes_store:
+        return None
+    return students_store.join_index()
+
+timer = RerunTimer(session=st.session_state.session_id, scope=st.session_state.admin_role)
 
 st.markdown('<p class="main-header">📚 Dumroo AI Admin Panel</p>', unsafe_allow_html=True)
 st.markdown("### Natural Language Query Interface with Role-Based Access Control")
@@ -307,11 +381,8 @@ st.markdown("### Natural Language Query Interface with Role-Based Access Control
 with st.sidebar:
     # Connection Status
     st.header("🔌 Connection")
-    is_connected, msg = test_supabase_connection()
-    if is_connected:
-        st.success(msg)
-    else:
-        st.error(msg)
+    with timer.section('connection'):
+        render_connection_status()
     
     st.markdown("---")
     
@@ -333,24 +404,50 @@ with st.sidebar:
     st.session_state.admin_role = selected_admin
     current_role = ADMIN_ROLES[selected_admin]
     
+    timer.scope = selected_admin
+    show_profile = '*' in PROFILING_ADMINS or selected_admin in PROFILING_ADMINS
+    # Stage-level spans from the data layer and query engine only when profiling
+    activate(timer if show_profile or PROFILE_SPANS_PATH else None)
+    
     st.markdown("---")
     st.subheader("🔒 Your Access Scope")
     st.info(f"""
 **Admin:** {current_role['name']}
 
 **You can access:**
-- Grade: {current_role['grade']}
-- Class: {current_role.get('class', 'All classes')}
-- Region: {current_role['region']}
+- Grade: {scope_label(selected_admin, 'grade')}
+- Class: {scope_label(selected_admin, 'class')}
+- Region: {scope_label(selected_admin, 'region')}
 
 *You can only view and query data within this scope*
     """)
     
-    students_df = load_student_data()
-    quizzes_df = load_quiz_data()
-    
-    filtered_students = apply_role_based_filtering(students_df, selected_admin)
-    filtered_quizzes = apply_role_based_filtering(quizzes_df, selected_admin)
+    # Slices of the shared store (or the CSV fallback) for this admin's scope;
+    # between syncs this is a lookup, not a reload
+    with timer.section('load data'):
+        # Both tables sync concurrently; the loads below are then lookups
+        with span('sync tables'):
+            data_stores()[0].prefetch()
+        with span('load students'):
+            filtered_students, students_store = load_table('students', selected_admin)
+        with span('load quizzes'):
+            filtered_quizzes, quizzes_store = load_table('quizzes', selected_admin)
+        # The sync above recorded any new data version or day in the trend history
+        trends = students_store.trend_store() if students_store else None
+        if trends is not None and students_store.trend_error is not None:
+            st.warning(f"⚠️ Trend history not saved: {str(students_store.trend_error)}")
+    
+    # A new data version starts warming the example and frequent queries for
+    # every admin in the background; otherwise this is a version comparison
+    precomputer = get_precomputer()
+    if precomputer is not None and students_store is not None and students_store is quizzes_store:
+        precomputer.refresh(students_store)
+    
+    # Rolled up from per-group aggregates computed once per data version
+    with timer.section('quick stats'):
+        stats = students_store.scope_stats(selected_admin) if students_store else None
+        if stats is None and len(filtered_students) > 0:
+            stats = quick_stats(filtered_students, selected_admin)
     
     st.markdown("---")
     st.subheader("📊 Quick Stats")
@@ -359,16 +456,19 @@ with st.sidebar:
     with col1:
         st.metric("Total Students", len(filtered_students))
         if len(filtered_students) > 0:
-            pending_hw = len(filtered_students[filtered_students['homework_status'] == 'pending'])
+            pending_hw = stats['pending_homework']
             st.metric("Pending Homework", pending_hw, delta=None if pending_hw == 0 else f"-{pending_hw}")
         else:
             st.metric("Pending Homework", "N/A")
     
     with col2:
-        st.metric("Upcoming Quizzes", len(filtered_quizzes))
-        if len(filtered_students) > 0:
-            avg_score = filtered_students['quiz_score'].mean()
-            st.metric("Avg Quiz Score", f"{avg_score:.1f}%")
+        schedule = quizzes_store.schedule_index(selected_admin) if quizzes_store else None
+        if schedule is None:
+            schedule = ScheduleIndex(filtered_quizzes)
+        upcoming = schedule.between(datetime.now().date(), None)
+        st.metric("Upcoming Quizzes", len(upcoming))
+        if len(filtered_students) > 0 and stats['avg_score'] is not None:
+            st.metric("Avg Quiz Score", f"{stats['avg_score']:.1f}%")
         else:
             st.metric("Avg Quiz Score", "N/A")
     
@@ -381,11 +481,18 @@ with st.sidebar:
 - All results are filtered by your access scope
     """)
     
+    with st.expander("📦 Shared Data Cache"):
+        render_memory_report()
+    
+    timings_panel = st.empty()
+    
     st.markdown("---")
     if st.button("🚪 Logout", use_container_width=True):
         st.session_state.logged_in = False
         st.session_state.admin_role = None
-        st.session_state.query_history = []
+        st.session_state.auth_token = None
+        st.session_state.query_history.clear()
+        st.session_state.last_query.clear()
         st.rerun()
 
 st.subheader("💬 Ask a Question")
@@ -393,16 +500,7 @@ st.subheader("💬 Ask a Question")
 with st.expander("📝 Example Queries (click to try)", expanded=True):
     col1, col2 = st.columns(2)
     
-    example_queries = [
-        "Which students haven't submitted their homework yet?",
-        "Show me performance data for Grade 8",
-        "List all upcoming quizzes",
-        "Who are the low-performing students?",
-        "Show me attendance data",
-        "List all students"
-    ]
-    
-    for i, example in enumerate(example_queries):
+    for i, example in enumerate(EXAMPLE_QUERIES):
         col = col1 if i % 2 == 0 else col2
         with col:
             if st.button(example, key=f"example_{i}", use_container_width=True):
@@ -416,68 +514,120 @@ query_input = st.text_input(
     label_visibility="collapsed"
 )
 
-if st.button("🔍 Search", type="primary", use_container_width=True) or query_input:
-    if query_input:
-        with st.spinner("🤔 Processing your query..."):
-            filtered_students = apply_role_based_filtering(students_df, st.session_state.admin_role)
-            filtered_quizzes = apply_role_based_filtering(quizzes_df, st.session_state.admin_role)
-            
-            result = process_natural_language_query(
-                query_input,
-                filtered_students,
-                filtered_quizzes
-            )
+with timer.section('query'):
+    if st.button("🔍 Search", type="primary", use_container_width=True) or query_input:
+        if query_input:
+            with st.spinner("🤔 Processing your query..."):
+                query_version = (data_version(filtered_students), data_version(filtered_quizzes))
+                # Other widgets rerun the script too; the same query against
+                # the same scope and data is served from the last run
+                result, executed = st.session_state.last_query.run(
+                    query_input,
+                    filtered_students,
+                    filtered_quizzes,
+                    scope=selected_admin,
+                    data_version=query_version,
+                    join_index=shared_join_index(students_store, quizzes_store),
+                    schedule=quizzes_store.schedule_index(selected_admin) if quizzes_store else None,
+                    trends=trends
+                )
             
-            st.session_state.query_history.append({
-                'query': query_input,
-                'result': result,
-                'admin': current_role['name'],
-                'timestamp': datetime.now().strftime("%I:%M %p")
-            })
+                if executed:
+                    if precomputer is not None:
+                        precomputer.observe(query_input)
+                    st.session_state.query_history.record(
+                        query_input,
+                        result,
+                        scope=selected_admin,
+                        data_version=query_version,
+                        admin=current_role['name'],
+                        timestamp=datetime.now().strftime("%I:%M %p")
+                    )
             
-            st.markdown("---")
+                st.markdown("---")
             
-            if result['success']:
-                st.success(f"✅ {result['message']}")
+                if result['success']:
+                    st.success(f"✅ {result['message']}")
                 
-                if result['data'] is not None and len(result['data']) > 0:
-                    st.markdown("### 📊 Results:")
+                    if result['data'] is not None and len(result['data']) > 0:
+                        st.markdown("### 📊 Results:")
                     
-                    st.dataframe(
-                        result['data'],
-                        use_container_width=True,
-                        hide_index=True
-                    )
+                        with span('render results'):
+                            render_paged_result(result['data'], key='result')
                     
-                    csv = result['data'].to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Results as CSV",
-                        data=csv,
-                        file_name=f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv"
-                    )
-            else:
-                st.error("❌ Query not understood")
-                st.info(result['message'])
-    else:
-        st.warning("⚠️ Please enter a query")
+                        export_format = st.selectbox(
+                            "Export format",
+                            options=available_formats(),
+                            format_func=lambda f: EXPORT_FORMATS[f]['label'],
+                            key='export_format'
+                        )
+                        # The file is only generated when the button is clicked
+                        st.download_button(
+                            label=f"📥 Download Results as {EXPORT_FORMATS[export_format]['label']}",
+                            data=partial(export_file, result['data'], export_format),
+                            file_name=export_filename("query_results", export_format, datetime.now().strftime('%Y%m%d_%H%M%S')),
+                            mime=EXPORT_FORMATS[export_format]['mime']
+                        )
+                else:
+                    st.error("❌ Query not understood")
+                    st.info(result['message'])
+        else:
+            st.warning("⚠️ Please enter a query")
 
-if st.session_state.query_history:
-    st.markdown("---")
-    st.subheader("📜 Query History")
-    
-    for i, entry in enumerate(reversed(st.session_state.query_history[-5:])):
-        with st.expander(f"🕐 {entry['timestamp']} - {entry['query'][:60]}...", expanded=(i == 0)):
-            st.markdown(f"**Admin:** {entry['admin']}")
-            st.markdown(f"**Query:** {entry['query']}")
-            st.markdown(f"**Result:** {entry['result']['message']}")
+with timer.section('history'):
+    if st.session_state.query_history:
+        st.markdown("---")
+        st.subheader("📜 Query History")
+    
+        for i, entry in enumerate(st.session_state.query_history.recent(5)):
+            # Only open entries fetch and render their result frame
+            expander = st.expander(
+                f"🕐 {entry['timestamp']} - {entry['query'][:60]}...",
+                expanded=(i == 0),
+                key=f"history_entry_{entry['id']}",
+                on_change="rerun"
+            )
+            with expander:
+                st.markdown(f"**Admin:** {entry['admin']}")
+                st.markdown(f"**Query:** {entry['query']}")
+                st.markdown(f"**Result:** {entry['message']}")
             
-            if entry['result']['data'] is not None and len(entry['result']['data']) > 0:
-                st.dataframe(entry['result']['data'], use_container_width=True, hide_index=True)
-    
-    if st.button("🗑️ Clear History"):
-        st.session_state.query_history = []
-        st.rerun()
+                if expander.open and entry['rows'] > 0:
+                    data, changed = history_result(entry)
+                    if changed:
+                        st.caption("ℹ️ The data has changed since this query ran; showing current results")
+                    render_paged_result(data, key=f"history_{entry['id']}")
+    
+        if st.button("🗑️ Clear History"):
+            st.session_state.query_history.clear()
+            st.rerun()
+
+if show_profile:
+    with timings_panel.container():
+        with st.expander("⏱️ Rerun Timings"):
+            st.dataframe(pd.DataFrame(timer.rows()), use_container_width=True, hide_index=True)
+            st.caption(f"Total rerun time: {timer.total_ms():.1f} ms")
+            if timer.counters:
+                st.caption(" · ".join(f"{name}: {value:,}" for name, value in timer.counters.items()))
+            cache_stats = precomputer.stats() if precomputer is not None else RESULT_CACHE.stats()
+            if cache_stats['hit_rate'] is not None:
+                st.caption(
+                    f"Result cache: {cache_stats['hit_rate']:.0%} hit rate "
+                    f"({cache_stats['hits']:,} hits, {cache_stats['warmed_hits']:,} from precomputed results, "
+                    f"{cache_stats['misses']:,} misses since start)"
+                )
+            if precomputer is not None and cache_stats['last_run']:
+                last_run = cache_stats['last_run']
+                st.caption(
+                    f"Last warm-up: {last_run['queries']} queries × {last_run['scopes']} scopes "
+                    f"in {last_run['seconds']:.2f} s" + (" · warming now" if cache_stats['warming'] else "")
+                )
+
+if PROFILE_SPANS_PATH:
+    try:
+        get_span_sink(PROFILE_SPANS_PATH).write(timer)
+    except OSError as e:
+        st.sidebar.warning(f"⚠️ Could not write profiling spans: {str(e)}")
 
 st.markdown("---")
 st.markdown("""
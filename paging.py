@@ -0,0 +1,94 @@
+"""Server-side pagination of query result frames.
+
+Only the visible page of a result is handed to st.dataframe, so a rerun
+serializes page_size rows however large the result is. Sorting happens
+here too: the stable sort order of a (frame, column, direction) is computed
+once and kept while the frame is alive, so paging through a sorted result
+is a take() of page_size positions per rerun.
+"""
+
+import math
+import threading
+import weakref
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+PAGE_SIZES = (25, 50, 100, 250)
+DEFAULT_PAGE_SIZE = 50
+
+# Sort orders kept for recently paged frames
+MAX_SORT_ORDERS = 32
+
+_SORT_ORDERS = OrderedDict()
+_SORT_LOCK = threading.Lock()
+
+# Payload sizes kept for recently shown frames
+MAX_PAYLOAD_SIZES = 32
+
+_PAYLOAD_SIZES = OrderedDict()
+
+def page_count(rows, page_size):
+    return max(1, math.ceil(rows / page_size))
+
+def sort_order(frame, column, ascending=True):
+    """Row positions of frame stably sorted by column, missing values last.
+
+    Cached per frame object; result frames are shared read-only, so the
+    order stays valid for as long as the frame does.
+    """
+    key = (id(frame), column, ascending)
+    with _SORT_LOCK:
+        cached = _SORT_ORDERS.get(key)
+        if cached is not None and cached[0]() is frame:
+            _SORT_ORDERS.move_to_end(key)
+            return cached[1]
+
+    values = frame[column].reset_index(drop=True)
+    order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    with _SORT_LOCK:
+        _SORT_ORDERS[key] = (weakref.ref(frame), order)
+        while len(_SORT_ORDERS) > MAX_SORT_ORDERS:
+            _SORT_ORDERS.popitem(last=False)
+    return order
+
+def page_slice(frame, page, page_size=DEFAULT_PAGE_SIZE, sort_column=None, ascending=True):
+    """Rows of one page (0-based, clamped to the last page), sorted by sort_column if given"""
+    page = min(max(page, 0), page_count(len(frame), page_size) - 1)
+    start = page * page_size
+    if sort_column is None:
+        return frame.iloc[start:start + page_size]
+    return frame.take(sort_order(frame, sort_column, ascending)[start:start + page_size])
+
+def payload_bytes(frame):
+    """Size of the Arrow IPC stream Streamlit sends to the browser for a frame"""
+    if pa is None:
+        return None
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.size()
+
+def frame_payload_bytes(frame):
+    """payload_bytes() of a shared result frame, computed once per frame object.
+
+    Cached like sort orders, so measuring a whole cached result on every
+    profiled rerun does not convert it to Arrow each time.
+    """
+    key = id(frame)
+    with _SORT_LOCK:
+        cached = _PAYLOAD_SIZES.get(key)
+        if cached is not None and cached[0]() is frame:
+            _PAYLOAD_SIZES.move_to_end(key)
+            return cached[1]
+
+    size = payload_bytes(frame)
+    with _SORT_LOCK:
+        _PAYLOAD_SIZES[key] = (weakref.ref(frame), size)
+        while len(_PAYLOAD_SIZES) > MAX_PAYLOAD_SIZES:
+            _PAYLOAD_SIZES.popitem(last=False)
+    return size
@@ -0,0 +1,127 @@
+"""Background warming of the shared result cache after each data refresh.
+
+The dashboard's example queries, and the queries asked most often since the
+process started, are answered ahead of time for every admin scope as soon as
+a new data version is loaded, so clicking them is a cache lookup. Work runs
+on a small thread pool: the result cache lives in this process, so worker
+processes could not fill it.
+"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from data_layer import data_version
+from query_engine import RESULT_CACHE, normalize_query, warm_query
+from roles import ADMIN_ROLES
+
+# Observed queries (beyond the fixed ones) warmed per scope
+DEFAULT_FREQUENT_QUERIES = 5
+
+# Distinct observed queries remembered before the rarest are forgotten
+MAX_TRACKED_QUERIES = 1000
+
+DEFAULT_WORKERS = 2
+
+class Precomputer:
+    """Re-warms the result cache for every admin whenever the store's data changes"""
+
+    def __init__(self, queries=(), cache=RESULT_CACHE, frequent=DEFAULT_FREQUENT_QUERIES,
+                 max_workers=DEFAULT_WORKERS, admin_keys=None):
+        self.fixed_queries = list(queries)
+        self.cache = cache
+        self.frequent = frequent
+        self.admin_keys = list(admin_keys or ADMIN_ROLES)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='precompute')
+        self.lock = threading.Lock()
+        # Normalized query key -> count, and the wording last seen for it
+        self.counts = Counter()
+        self.wordings = {}
+        self.versions = None
+        self.running = 0
+        self.computed = 0
+        self.last_run = None
+        self.last_error = None
+
+    def observe(self, query):
+        """Count a query asked by a user towards the frequent set"""
+        key = normalize_query(query)
+        if key[0] == 'unknown':
+            return
+        with self.lock:
+            self.counts[key] += 1
+            self.wordings[key] = query
+            if len(self.counts) > MAX_TRACKED_QUERIES:
+                for stale, _ in self.counts.most_common()[MAX_TRACKED_QUERIES // 2:]:
+                    del self.counts[stale]
+                    del self.wordings[stale]
+
+    def queries(self):
+        """Fixed queries followed by the most frequent observed ones, one per key"""
+        with self.lock:
+            frequent = [self.wordings[key] for key, _ in self.counts.most_common(self.frequent)]
+        selected = {}
+        for query in self.fixed_queries + frequent:
+            selected.setdefault(normalize_query(query), query)
+        return list(selected.values())
+
+    def refresh(self, store):
+        """Warm every scope in the background if the store's data changed.
+
+        Cheap enough to call on every rerun: it only compares versions.
+        """
+        versions = tuple(sorted(store.versions().items()))
+        with self.lock:
+            if not versions or versions == self.versions:
+                return False
+            self.versions = versions
+            self.running += len(self.admin_keys)
+            started = time.perf_counter()
+        queries = self.queries()
+        for admin_key in self.admin_keys:
+            self.executor.submit(self._warm_scope, store, admin_key, queries, started)
+        return True
+
+    def _warm_scope(self, store, admin_key, queries, started):
+        computed = 0
+        try:
+            students, students_changed = store.get('students', admin_key)
+            quizzes, quizzes_changed = store.get('quizzes', admin_key)
+            # As load_table() does for a session, drop this scope's stale results
+            if students_changed or quizzes_changed:
+                self.cache.invalidate(admin_key)
+            version = (data_version(students), data_version(quizzes))
+            join_index = store.join_index()
+            schedule = store.schedule_index(admin_key)
+            trends = store.trend_store()
+            for query in queries:
+                computed += warm_query(query, students, quizzes, scope=admin_key, data_version=version,
+                                       cache=self.cache, join_index=join_index, schedule=schedule, trends=trends)
+        except Exception as e:
+            # Warming is best effort; the query is computed when asked instead
+            with self.lock:
+                self.last_error = f"{admin_key}: {e}"
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.computed += computed
+                if self.running == 0:
+                    self.last_run = {
+                        'versions': self.versions,
+                        'seconds': time.perf_counter() - started,
+                        'queries': len(queries),
+                        'scopes': len(self.admin_keys)
+                    }
+
+    def stats(self):
+        """Progress of warming plus the result cache's hit counts"""
+        with self.lock:
+            stats = {
+                'warming': self.running > 0,
+                'computed': self.computed,
+                'tracked_queries': len(self.counts),
+                'last_run': self.last_run,
+                'last_error': self.last_error
+            }
+        return {**stats, **self.cache.stats()}
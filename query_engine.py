@@ -0,0 +1,698 @@
+"""Natural language query processing for the admin portal.
+
+A query is split into words and each word is classified once per process:
+the keyword tags it adds and which parameter patterns (grade, class,
+"below N" thresholds, "top N") can start there. Only those patterns are
+then searched, and the intent is chosen from an explicit priority list
+instead of an if/elif cascade of substring searches. A query text is parsed
+once; the date expressions in schedule and trend queries ("next week",
+"this month") are resolved to concrete dates once per day.
+
+Queries normalize to an (intent, params) key, and responses are cached in a
+process-wide LRU keyed by (admin scope, data version, normalized query), so
+the same question asked again, by any session, is not recomputed.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from analytics import DEFAULT_QUIZ_WINDOW_DAYS, JoinIndex
+from instrumentation import measure, span
+from ranking import DEFAULT_RANK_LIMIT, rank_rows
+from roles import scope_filters
+from schedule import MONTHS, ScheduleIndex, describe_range, resolve_date_range
+from trends import DEFAULT_TREND_DAYS, MAX_DAILY_TREND_DAYS, TrendStore
+
+# Keyword lists per tag. A tag fires when any keyword occurs as a substring
+# of the lower-cased query.
+KEYWORD_TAGS = {
+    'homework': ['homework', 'assignment', 'submitted', 'submission'],
+    'pending': ['not submitted', 'pending', "haven't", "didn't"],
+    'performance': ['performance', 'performing', 'score', 'scoring', 'marks', 'grades', 'quiz results'],
+    'low_performance': ['low', 'poor', 'below', 'struggling', 'failing'],
+    'upcoming': ['upcoming', 'scheduled', 'next', 'future'],
+    'quiz': ['quiz'],
+    'attendance': ['attendance', 'present', 'absent', 'attendance rate'],
+    'low_attendance': ['low', 'poor', 'below'],
+    'student_list': ['all students', 'list students', 'show students', 'student list'],
+    'subject': ['subject', 'per subject', 'by subject'],
+    'trend': ['trend', 'over time', 'decline', 'declining'],
+    'daily': ['daily', 'per day', 'by day', 'each day'],
+    'weekly': ['weekly', 'per week', 'by week', 'each week']
+}
+
+# Keyword lists per tag that only count as whole words ("changed" and
+# "improvement" are not "change" and "improve")
+WHOLE_WORD_TAGS = {
+    'change': ['change', 'changes', 'improve', 'improved', 'progress']
+}
+
+# Intents in priority order with the tags each one requires. The first
+# intent whose tags are all present wins; variants refine the base intent.
+INTENT_RULES = [
+    ('ranking', {'rank'}, None),
+    ('trend', {'trend'}, None),
+    # "change", "improve" and "progress" only ask for a trend over a named period
+    ('trend', {'change', 'dated'}, None),
+    ('pending_before_quiz', {'homework', 'pending', 'quiz'}, None),
+    ('homework', {'homework'}, ('pending', 'homework_pending', 'homework_status')),
+    ('score_by_subject', {'performance', 'subject'}, None),
+    ('performance', {'performance'}, ('low_performance', 'low_performance', 'performance')),
+    ('upcoming_quizzes', {'upcoming', 'quiz'}, None),
+    ('attendance', {'attendance'}, ('low_attendance', 'low_attendance', 'attendance')),
+    ('student_list', {'student_list'}, None)
+]
+
+# Default cut-offs for the "low" variants of each intent
+LOW_THRESHOLDS = {
+    'low_performance': 70,
+    'low_attendance': 90
+}
+
+# Ranking words and the direction they sort in (True: largest first)
+RANK_WORDS = {
+    'top': True, 'best': True, 'highest': True,
+    'bottom': False, 'worst': False, 'lowest': False
+}
+
+# Region names recognized in queries, as they are spelled in the data
+REGIONS = ('North', 'South', 'East', 'West')
+
+# Intents whose answer depends on today's date, which becomes part of the key;
+# trend history only grows on a new data version or a new day
+DATE_RELATIVE_INTENTS = {'pending_before_quiz', 'trend'}
+
+# Words without which no date expression (see schedule.DATE_PATTERNS) can
+# occur; resolve_date_range() is only called when one of them, or an ISO
+# date, is in the query
+DATE_WORDS = frozenset({'today', 'tomorrow', 'yesterday', 'days', 'week', 'weeks', 'month', 'months', 'year', *MONTHS})
+ISO_DATE_PATTERN = re.compile(r"(?<!\w)\d{4}-\d{1,2}-\d{1,2}\b")
+
+# Parameters that reach past one word of the query: (pattern searched over
+# the whole query, trigger words, whether triggers must be whole words).
+# A pattern is only searched when one of its trigger words occurs.
+PARAM_PATTERNS = {
+    'threshold': (re.compile(r"(?:below|under|less than)\s+(\d+(?:\.\d+)?)"), ('below', 'under', 'less'), False),
+    'grade': (re.compile(r"grade\s+(\d+)"), ('grade',), False),
+    'class': (re.compile(r"class\s+([a-z])\b"), ('class',), False),
+    'days': (re.compile(r"(?:next|within)\s+(\d+)\s+days?"), ('next', 'within'), False),
+    'rank': (re.compile(rf"(?<!\w)({'|'.join(RANK_WORDS)})\b(?:\s+(\d+))?"), tuple(RANK_WORDS), True),
+    'per': (re.compile(r"(?<!\w)(?:per|each|every)\s+(grade|class|region)\b"), ('per', 'each', 'every'), True),
+    'region': (re.compile(rf"(?<!\w)({'|'.join(r.lower() for r in REGIONS)})\b"), tuple(r.lower() for r in REGIONS), True)
+}
+PARAM_KINDS = frozenset(PARAM_PATTERNS)
+# Kinds whose value is a number, only searched for when a word has a digit
+NUMBER_KINDS = frozenset({'threshold', 'grade', 'days'})
+REGION_WORDS = frozenset(r.lower() for r in REGIONS)
+
+def _tags_by_keyword(keyword_tags):
+    tags_by_keyword = {}
+    for tag, keywords in keyword_tags.items():
+        for keyword in keywords:
+            tags_by_keyword.setdefault(keyword, set()).add(tag)
+    return {keyword: frozenset(tags) for keyword, tags in tags_by_keyword.items()}
+
+# Keywords within one word of the query, whole words, and keywords spanning
+# words ("not submitted"), which are looked up in the whole query
+WORD_KEYWORD_TAGS = {k: tags for k, tags in _tags_by_keyword(KEYWORD_TAGS).items() if ' ' not in k}
+WHOLE_WORD_KEYWORD_TAGS = _tags_by_keyword(WHOLE_WORD_TAGS)
+PHRASE_TAGS = {k: tags for k, tags in _tags_by_keyword(KEYWORD_TAGS).items() if ' ' in k}
+PHRASES = frozenset(PHRASE_TAGS)
+
+# Whole words within one whitespace-separated word ("low-performing")
+WORD_RUN = re.compile(r"\w+")
+
+def _word_markers(word):
+    """Tags one whitespace-separated word of a query adds, plus what to look for past it.
+
+    Keywords may occur anywhere in the word, as substrings of the query
+    did in the keyword cascade, so "below" and "low-performing" both add
+    the tags of "low". Whole-word keywords, ranking words, regions and date
+    words must be one of the word's \\w+ runs, so "stop" is not "top".
+    Phrases and PARAM_PATTERNS that this word can start are added by name
+    ("not submitted", 'grade'), 'number' when it has a digit, 'date' when a
+    date expression can start here, and a region named by it.
+    """
+    runs = set(WORD_RUN.findall(word))
+    markers = set()
+    for keyword, tags in WORD_KEYWORD_TAGS.items():
+        if keyword in word:
+            markers |= tags
+    for keyword, tags in WHOLE_WORD_KEYWORD_TAGS.items():
+        if keyword in runs:
+            markers |= tags
+    for phrase in PHRASES:
+        if word.endswith(phrase.split(' ', 1)[0]):
+            markers.add(phrase)
+    for kind, (_, triggers, whole) in PARAM_PATTERNS.items():
+        if any(trigger in (runs if whole else word) for trigger in triggers):
+            markers.add(kind)
+    if not runs.isdisjoint(DATE_WORDS) or ISO_DATE_PATTERN.search(word):
+        markers.add('date')
+    if any(c.isdigit() for c in word):
+        markers.add('number')
+    markers |= runs & REGION_WORDS
+    return frozenset(markers)
+
+class Memo(dict):
+    """function(key) for each key, computed on first use.
+
+    Holds at most max_keys keys; when full it is cleared and starts over.
+    """
+
+    def __init__(self, function, max_keys):
+        super().__init__()
+        self.function = function
+        self.max_keys = max_keys
+
+    def __missing__(self, key):
+        value = self.function(key)
+        if len(self) >= self.max_keys:
+            self.clear()
+        self[key] = value
+        return value
+
+# Queries reuse a small vocabulary, so a word is classified once and routing
+# is then a dict lookup per word rather than a pass over every keyword
+WORD_MARKERS = Memo(_word_markers, max_keys=20000)
+
+# Tags the intent depends on, and the intent for each combination of them
+RULE_TAGS = frozenset().union(*(required | {variant[0]} if variant else required for _, required, variant in INTENT_RULES))
+
+def _intent(tags):
+    """The first of INTENT_RULES whose tags are all present, refined by its variant"""
+    for base, required, variant in INTENT_RULES:
+        if required <= tags:
+            if variant is None:
+                return base
+            modifier, refined, plain = variant
+            return refined if modifier in tags else plain
+    return 'unknown'
+
+INTENT_BY_TAGS = Memo(_intent, max_keys=2 ** len(RULE_TAGS))
+
+# Parameters of a query that sets none of them
+NO_PARAMS = {
+    'grade': None, 'class': None, 'pending': False, 'low': False, 'threshold': None, 'days': None,
+    'as_of': None, 'start': None, 'end': None, 'rank': None, 'limit': None, 'metric': None,
+    'per': None, 'region': None, 'bucket': None
+}
+
+# Tags implied by an explicit "below/under/less than N" threshold
+THRESHOLD_TAGS = frozenset({'low_performance', 'low_attendance'})
+
+# Tags implied by a "next/within N days" window or any other date expression
+DAYS_TAGS = frozenset({'upcoming', 'dated'})
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+def _parse_query(query):
+    """The lower-cased query, its tags and the parameters its text gives.
+
+    Returns (query, tags, grade, class, threshold, days, rank, limit, per,
+    region). Nothing here depends on today's date, so a query text is
+    parsed once (see PARSED_QUERIES) and only its dates are resolved anew.
+    """
+    query = query.lower().strip()
+    tags = set()
+    for word in query.split():
+        tags |= WORD_MARKERS[word]
+    grade = None
+    class_name = None
+    threshold = None
+    days = None
+    rank = None
+    limit = None
+    per = None
+    region = None
+
+    for phrase in tags & PHRASES:
+        if phrase in query:
+            tags |= PHRASE_TAGS[phrase]
+    kinds = tags & PARAM_KINDS
+    if 'number' not in tags:
+        kinds -= NUMBER_KINDS
+    regions = tags & REGION_WORDS
+    if len(regions) == 1:
+        # Only with several regions named is the query searched for the first
+        kinds.discard('region')
+        region = next(iter(regions)).title()
+    # "per grade 9" groups by grade rather than naming grade 9
+    grouped = [m.span() for m in PARAM_PATTERNS['per'][0].finditer(query)] if 'per' in kinds else []
+    for kind in kinds:
+        pattern = PARAM_PATTERNS[kind][0]
+        if kind in ('grade', 'class') and grouped:
+            match = next((m for m in pattern.finditer(query) if not any(a <= m.start() < b for a, b in grouped)), None)
+        else:
+            match = pattern.search(query)
+        if match is None:
+            continue
+        if kind == 'threshold':
+            tags |= THRESHOLD_TAGS
+            threshold = _number(match.group(1))
+        elif kind == 'grade':
+            grade = int(match.group(1))
+        elif kind == 'days':
+            tags |= DAYS_TAGS
+            days = int(match.group(1))
+        elif kind == 'rank':
+            rank = 'top' if RANK_WORDS[match.group(1)] else 'bottom'
+            limit = int(match.group(2)) if match.group(2) else None
+        elif kind == 'per':
+            per = match.group(1)
+        elif kind == 'region':
+            region = match.group(1).title()
+        elif kind == 'class':
+            class_name = match.group(1).upper()
+    return query, frozenset(tags), grade, class_name, threshold, days, rank, limit, per, region
+
+# The dashboard routes the same query text on every rerun, for each history
+# entry and when warming examples for every admin
+PARSED_QUERIES = Memo(_parse_query, max_keys=4096)
+
+def _date_range(query_and_day):
+    return resolve_date_range(*query_and_day)
+
+# Date expressions resolved per query text and day
+DATE_RANGES = Memo(_date_range, max_keys=4096)
+
+def route_query(query):
+    """Return (intent, params) for a query"""
+    query, tags, grade, class_name, threshold, days, rank, limit, per, region = PARSED_QUERIES[query]
+    dated = 'date' in tags
+
+    # Relative dates are resolved here, so the cache key holds actual dates
+    today = date.today() if dated or days is not None else None
+    date_range = DATE_RANGES[query, today] if dated and tags & {'quiz', 'trend', 'change'} else None
+    if days is not None:
+        date_range = (today, today + timedelta(days=days))
+    if date_range is not None:
+        tags = tags | DAYS_TAGS
+
+    intent = INTENT_BY_TAGS[RULE_TAGS & tags]
+    params = {**NO_PARAMS, 'grade': grade, 'class': class_name, 'region': region}
+    if intent in LOW_THRESHOLDS:
+        params['low'] = True
+        params['threshold'] = threshold if threshold is not None else LOW_THRESHOLDS[intent]
+    elif intent == 'homework_pending':
+        params['pending'] = True
+    elif intent == 'ranking':
+        params.update(rank=rank, limit=limit or DEFAULT_RANK_LIMIT, per=per,
+                      metric='attendance_rate' if 'attendance' in tags else 'quiz_score')
+    elif intent == 'pending_before_quiz':
+        params['days'] = days if days is not None else DEFAULT_QUIZ_WINDOW_DAYS
+        params['as_of'] = (today or date.today()).isoformat()
+    elif intent == 'upcoming_quizzes':
+        start, end = date_range or (today or date.today(), None)
+        params['start'] = start.isoformat() if start is not None else None
+        params['end'] = end.isoformat() if end is not None else None
+    elif intent == 'trend':
+        today = today or date.today()
+        start, end = date_range or (None, None)
+        end = end or today
+        start = start or end - timedelta(days=DEFAULT_TREND_DAYS - 1)
+        if 'weekly' in tags or 'daily' in tags:
+            bucket = 'week' if 'weekly' in tags else 'day'
+        else:
+            bucket = 'day' if (end - start).days < MAX_DAILY_TREND_DAYS else 'week'
+        params.update(as_of=today.isoformat(), start=start.isoformat(), end=end.isoformat(), bucket=bucket,
+                      metric='attendance_rate' if 'attendance' in tags else 'quiz_score')
+    return intent, params
+
+def normalize_query(query):
+    """Reduce a query to a hashable (intent, params) key.
+
+    Different wordings of the same question ("pending homework" and "who
+    hasn't submitted homework") share a key.
+    """
+    intent, params = route_query(query)
+    return intent, tuple((k, v) for k, v in sorted(params.items()) if v is not None)
+
+# ==================== INTENT HANDLERS ====================
+
+def _narrow(dataframe, params):
+    """Apply the grade/class/region named in the query on top of the admin scope"""
+    if params['grade'] is not None and 'grade' in dataframe.columns:
+        dataframe = dataframe[dataframe['grade'] == params['grade']]
+    if params['class'] is not None and 'class' in dataframe.columns:
+        dataframe = dataframe[dataframe['class'] == params['class']]
+    if params['region'] is not None and 'region' in dataframe.columns:
+        dataframe = dataframe[dataframe['region'] == params['region']]
+    return dataframe
+
+def _homework_pending(students_df, quizzes_df, params):
+    pending_students = students_df[students_df['homework_status'] == 'pending']
+    message = f"Found {len(pending_students)} student(s) with pending homework submissions"
+    if len(pending_students) == 0:
+        message = "Great news! All students have submitted their homework! 🎉"
+    return pending_students[['name', 'grade', 'class', 'homework_status']], message
+
+def _homework_status(students_df, quizzes_df, params):
+    data = students_df[['name', 'grade', 'class', 'homework_status']]
+    return data, "Homework submission status for all students in your scope"
+
+def _low_performance(students_df, quizzes_df, params):
+    threshold = params['threshold']
+    filtered_data = students_df[students_df['quiz_score'] < threshold]
+    avg_score = filtered_data['quiz_score'].mean() if len(filtered_data) > 0 else 0
+    data = filtered_data[['name', 'grade', 'class', 'quiz_score', 'quiz_name']]
+    return data, f"Students scoring below {threshold}% (Average: {avg_score:.1f}%)"
+
+def _performance(students_df, quizzes_df, params):
+    avg_score = students_df['quiz_score'].mean()
+    data = students_df[['name', 'grade', 'class', 'quiz_score', 'quiz_name']]
+    return data, f"Performance data (Average score: {avg_score:.1f}%)"
+
+
+def _low_attendance(students_df, quizzes_df, params):
+    threshold = params['threshold']
+    avg_attendance = students_df['attendance_rate'].mean()
+    low_attendance = students_df[students_df['attendance_rate'] < threshold]
+    data = low_attendance[['name', 'grade', 'class', 'attendance_rate']]
+    return data, f"Students with attendance below {threshold}% (Class average: {avg_attendance:.1f}%)"
+
+def _attendance(students_df, quizzes_df, params):
+    avg_attendance = students_df['attendance_rate'].mean()
+    data = students_df[['name', 'grade', 'class', 'attendance_rate']]
+    return data, f"Attendance data (Class average: {avg_attendance:.1f}%)"
+
+def _ranking(students_df, quizzes_df, params):
+    metric = params['metric']
+    columns = ['name', 'grade', 'class']
+    if params['per'] not in (None, *columns):
+        columns.append(params['per'])
+    columns += [metric] + (['quiz_name'] if metric == 'quiz_score' else [])
+    data = rank_rows(students_df[columns], metric, params['limit'], params['rank'] == 'top', params['per'])
+    label = metric.replace('_', ' ')
+    per = f" per {params['per']}" if params['per'] else ""
+    return data, f"{params['rank'].title()} {params['limit']} student(s){per} by {label} ({len(data)} shown)"
+
+def _student_list(students_df, quizzes_df, params):
+    data = students_df[['name', 'grade', 'class', 'homework_status', 'quiz_score', 'attendance_rate']]
+    return data, f"Showing all {len(students_df)} students in your scope"
+
+# ==================== CROSS-TABLE HANDLERS ====================
+
+def _constraints(scope, params):
+    """Admin scope (column, allowed values) and the query's grade/class/region as (column, value)"""
+    constraints = list(scope_filters(scope).items()) if scope is not None else []
+    for column in ('grade', 'class', 'region'):
+        if params[column] is not None:
+            constraints.append((column, params[column]))
+    return constraints
+
+def _pending_before_quiz(join_index, constraints, params):
+    data = join_index.pending_before_quiz(constraints, as_of=params['as_of'], days=params['days'])
+    students = data['student'].nunique()
+    data = data.drop(columns='student')
+    message = f"Found {students} student(s) with pending homework and a quiz in the next {params['days']} days"
+    if students == 0:
+        message = f"No students with pending homework have a quiz in the next {params['days']} days"
+    return data, message
+
+def _score_by_subject(join_index, constraints, params):
+    data = join_index.score_by_subject(constraints)
+    return data, f"Average score per subject across {int(data['students'].sum())} students"
+
+# ==================== TREND HANDLERS ====================
+
+def _trend(trends, constraints, params):
+    start, end = date.fromisoformat(params['start']), date.fromisoformat(params['end'])
+    attendance = params['metric'] == 'attendance_rate'
+    label, column = ('Attendance', 'avg_attendance') if attendance else ('Average score', 'avg_score')
+    data = trends.trend(params['metric'], constraints, start, end, params['bucket'])
+    data = data.rename(columns={'average': column})
+    when = f"{describe_range(start, end)}, by {params['bucket']}"
+    if data.empty:
+        return data, f"No {label.lower()} history recorded {when} in your scope"
+    first, last = data[column].iloc[0], data[column].iloc[-1]
+    if len(data) == 1:
+        return data, f"{label} was {last:.1f}% {when} (only one {params['bucket']} recorded)"
+    direction = 'rose' if last > first else 'fell' if last < first else 'held steady'
+    return data, f"{label} {direction} from {first:.1f}% to {last:.1f}% ({last - first:+.1f} points) {when}"
+
+# Handlers answered from the rollups of a TrendStore
+TREND_HANDLERS = {
+    'trend': _trend
+}
+
+# ==================== SCHEDULE HANDLERS ====================
+
+def _upcoming_quizzes(schedule, params):
+    quizzes = _narrow(schedule.between(params['start'], params['end']), params)
+    data = quizzes[['quiz_name', 'grade', 'class', 'subject', 'scheduled_date']]
+    return data, f"Found {len(data)} quiz(zes) scheduled {describe_range(params['start'], params['end'])} in your scope"
+
+# Handlers answered from a ScheduleIndex over the admin's quizzes
+SCHEDULE_HANDLERS = {
+    'upcoming_quizzes': _upcoming_quizzes
+}
+
+# Handlers answered from a JoinIndex over both tables instead of the frames
+JOIN_HANDLERS = {
+    'pending_before_quiz': _pending_before_quiz,
+    'score_by_subject': _score_by_subject
+}
+
+INTENT_HANDLERS = {
+    'homework_pending': _homework_pending,
+    'homework_status': _homework_status,
+    'low_performance': _low_performance,
+    'performance': _performance,
+    'low_attendance': _low_attendance,
+    'attendance': _attendance,
+    'student_list': _student_list,
+    'ranking': _ranking,
+    **SCHEDULE_HANDLERS,
+    **JOIN_HANDLERS,
+    **TREND_HANDLERS
+}
+
+UNKNOWN_QUERY_MESSAGE = """I couldn't understand that query. Here are some examples:
+
+• "Which students haven't submitted their homework yet?"
+• "Show me performance data for Grade 8"
+• "List all upcoming quizzes scheduled for next week"
+• "Quizzes between Dec 1 and Dec 15"
+• "Who are the low-performing students?"
+• "Show me attendance data"
+• "List all students"
+• "Students with pending homework who have a quiz in the next 3 days"
+• "Average score per subject"
+• "Top 10 students by score" or "Bottom 3 by attendance per class"
+• "How did Grade 8 North attendance change this month?"
+        """
+
+def process_natural_language_query(query, students_df, quizzes_df, join_index=None, scope=None,
+                                   schedule=None, trends=None):
+    """Answer a query from an admin's frames.
+
+    Cross-table intents use join_index when given, a JoinIndex over the
+    full tables that scope then restricts, and schedule queries use
+    schedule, a ScheduleIndex over quizzes_df; either is built from the
+    frames passed in when not given. Trend queries use trends, a TrendStore
+    that scope restricts, or a single snapshot of students_df without one.
+    """
+    intent, params = route_query(query)
+
+    response = {
+        'success': False,
+        'message': '',
+        'data': None,
+        'type': 'unknown'
+    }
+
+    handler = INTENT_HANDLERS.get(intent)
+    if handler is None:
+        response['message'] = UNKNOWN_QUERY_MESSAGE
+        return response
+
+    if intent in SCHEDULE_HANDLERS:
+        if schedule is None:
+            schedule = ScheduleIndex(quizzes_df)
+        data, message = handler(schedule, params)
+    elif intent in JOIN_HANDLERS:
+        if join_index is None:
+            join_index = JoinIndex(students_df, quizzes_df)
+        data, message = handler(join_index, _constraints(scope, params), params)
+    elif intent in TREND_HANDLERS:
+        if trends is None:
+            trends = TrendStore()
+            trends.record(students_df)
+        data, message = handler(trends, _constraints(scope, params), params)
+    else:
+        data, message = handler(_narrow(students_df, params), _narrow(quizzes_df, params), params)
+    response['success'] = True
+    response['type'] = intent
+    response['data'] = data
+    response['message'] = message
+    return response
+
+# ==================== RESULT CACHE ====================
+
+def response_bytes(response):
+    """Approximate memory held by a response's result frame"""
+    data = response.get('data')
+    return int(data.memory_usage(deep=True).sum()) if data is not None else 0
+
+class QueryResultCache:
+    """LRU of query responses shared by every session.
+
+    Bounded by entry count and, when max_bytes is set, by the memory of the
+    cached result frames; a response larger than max_bytes is not cached.
+    Cached responses (and their DataFrames) are shared between callers and
+    must be treated as read-only. Entries put with warmed=True (precomputed
+    rather than asked for) are counted separately when they are hit.
+    """
+
+    def __init__(self, maxsize=256, max_bytes=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.warmed = set()
+        self.warmed_hits = 0
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            if key in self.warmed:
+                self.warmed_hits += 1
+            return self.entries[key]
+
+    def __contains__(self, key):
+        """Whether key is cached, without touching recency or hit counts"""
+        with self.lock:
+            return key in self.entries
+
+    def put(self, key, response, warmed=False):
+        size = response_bytes(response)
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self.entries[key] = response
+            self.sizes[key] = size
+            self.bytes += size
+            if warmed:
+                self.warmed.add(key)
+            while len(self.entries) > self.maxsize or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        del self.entries[key]
+        self.bytes -= self.sizes.pop(key)
+        self.warmed.discard(key)
+
+    def invalidate(self, scope):
+        """Drop the entries computed for one scope, leaving other scopes cached"""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == scope]:
+                self._drop(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.warmed.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Hit counts and occupancy since the process started"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'warmed_hits': self.warmed_hits,
+                'entries': len(self.entries),
+                'warmed_entries': len(self.warmed),
+                'bytes': self.bytes
+            }
+
+# Default memory cap for cached result frames
+RESULT_CACHE_MAX_BYTES = 64 * 2**20
+
+RESULT_CACHE = QueryResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
+
+def result_key(query, scope, data_version):
+    """Result cache key for a query against one scope and data version"""
+    return scope, data_version, normalize_query(query)
+
+def run_query(query, students_df, quizzes_df, scope, data_version, cache=RESULT_CACHE, join_index=None,
+              schedule=None, trends=None):
+    """process_natural_language_query() served through the shared result cache.
+
+    scope identifies the rows the frames were restricted to (the admin key)
+    and data_version the load they came from; both are part of the key so a
+    reload or a different admin never sees another entry's rows. join_index,
+    when given, must be built from the tables the frames were sliced from,
+    schedule from quizzes_df, and trends must have recorded that data version.
+    """
+    key = result_key(query, scope, data_version)
+    response = cache.get(key)
+    measure('result cache misses' if response is None else 'result cache hits', 1)
+    if response is None:
+        with span('process query'):
+            response = process_natural_language_query(query, students_df, quizzes_df, join_index=join_index,
+                                                      scope=scope, schedule=schedule, trends=trends)
+        cache.put(key, response)
+    return dict(response)
+
+class LastQuery:
+    """The last query a session ran, so reruns with unchanged inputs reuse it.
+
+    A Streamlit rerun triggered by any widget re-runs the search block while
+    the text box still holds the query; only a change of query text, scope,
+    data version (or, for date-relative queries, today's date) executes it
+    again.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.response = None
+        self.executions = 0
+
+    def run(self, query, students_df, quizzes_df, scope, data_version, **kwargs):
+        """Return (response, executed), executing through run_query() only on new inputs"""
+        key = (query, result_key(query, scope, data_version))
+        if key == self.key:
+            return self.response, False
+        self.response = run_query(query, students_df, quizzes_df, scope, data_version, **kwargs)
+        self.key = key
+        self.executions += 1
+        measure('query executions', 1)
+        return self.response, True
+
+    def clear(self):
+        self.key = None
+        self.response = None
+
+def warm_query(query, students_df, quizzes_df, scope, data_version, cache=RESULT_CACHE, join_index=None,
+               schedule=None, trends=None):
+    """Cache a query's response ahead of time, as run_query() would.
+
+    Does nothing if it is cached already, and leaves the cache's hit and
+    miss counts alone. Returns True when the response was computed.
+    """
+    key = result_key(query, scope, data_version)
+    if key in cache:
+        return False
+    response = process_natural_language_query(query, students_df, quizzes_df, join_index=join_index,
+                                              scope=scope, schedule=schedule, trends=trends)
+    cache.put(key, response, warmed=True)
+    return True
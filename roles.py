@@ -0,0 +1,143 @@
+"""Admin roles and role-based access control for the admin portal.
+
+Roles are read from Data/roles.json (or ADMIN_ROLES_PATH). A role may pin
+each scope column to one value or list several: "grade": [8, 9] covers
+both grades. A column a role leaves out is not restricted.
+
+numpy and pandas are imported where frames are filtered, not at module
+load, so the login page can read roles without loading the data stack.
+"""
+
+import json
+import os
+
+# Scope columns an admin role can be restricted on, in filtering order
+SCOPE_KEYS = ('grade', 'class', 'region')
+
+DEFAULT_ROLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data', 'roles.json')
+
+def scope_values(value):
+    """A scope value as the tuple of values it allows"""
+    return tuple(value) if isinstance(value, (list, tuple, set, frozenset)) else (value,)
+
+def load_roles(path=DEFAULT_ROLES_PATH):
+    """Roles by admin key from a JSON file of {admin_key: {name, grade, ...}}"""
+    with open(path) as f:
+        roles = json.load(f)
+    for admin_key, role in roles.items():
+        for key in SCOPE_KEYS:
+            if key in role and not scope_values(role[key]):
+                raise ValueError(f"Role {admin_key} lists no {key} values")
+    return roles
+
+def compile_scopes(roles):
+    """Each role's scope as {column: allowed values}, built once per load"""
+    return {
+        admin_key: {key: scope_values(role[key]) for key in SCOPE_KEYS if key in role}
+        for admin_key, role in roles.items()
+    }
+
+ADMIN_ROLES = load_roles(os.getenv("ADMIN_ROLES_PATH", DEFAULT_ROLES_PATH))
+ROLE_SCOPES = compile_scopes(ADMIN_ROLES)
+
+def scope_filters(admin_key):
+    """Return the {column: allowed values} predicates that define an admin's scope"""
+    return ROLE_SCOPES[admin_key]
+
+def scope_label(admin_key, key):
+    """Allowed values of one scope column for display, e.g. "8, 9" or "All classes" """
+    values = ROLE_SCOPES[admin_key].get(key)
+    if values is None:
+        return f"All {'classes' if key == 'class' else key + 's'}"
+    return ", ".join(str(v) for v in values)
+
+def filter_by_scope(dataframe, filters):
+    """Rows matching every {column: allowed values} filter, by direct isin() on the frame"""
+    import numpy as np
+
+    mask = np.ones(len(dataframe), dtype=bool)
+    for column, values in filters.items():
+        if column in dataframe.columns:
+            mask &= dataframe[column].isin(scope_values(values)).to_numpy()
+    return dataframe[mask]
+
+def apply_role_based_filtering(dataframe, admin_key):
+    return filter_by_scope(dataframe, scope_filters(admin_key))
+
+class ScopeIndex:
+    """Rows of any admin scope in a frame, without rescanning the frame's columns.
+
+    Every row is given the code of its (grade, class, region) group. A
+    scope is evaluated with isin() over the few distinct groups, then mapped
+    to rows with one lookup per row. A stably sorted copy by (grade, region)
+    is kept as well, so scopes covering one grade and region resolve to a
+    slice of it instead of a copy. Results hold the same rows, in the same
+    order and with the same index labels, as filter_by_scope().
+    """
+
+    def __init__(self, dataframe):
+        import numpy as np
+        import pandas as pd
+
+        self.source = dataframe
+        self.block_keys = [c for c in ('grade', 'region') if c in dataframe.columns]
+        self.keys = [c for c in SCOPE_KEYS if c in dataframe.columns]
+        if self.block_keys:
+            order = np.lexsort([pd.factorize(dataframe[key], sort=True)[0] for key in reversed(self.block_keys)])
+            self.frame = dataframe.take(order)
+            # Position in the sorted frame of each row
+            self.sorted_positions = np.empty(len(order), dtype=np.int64)
+            self.sorted_positions[order] = np.arange(len(order))
+        else:
+            self.frame = dataframe
+            self.sorted_positions = np.arange(len(dataframe))
+
+        # Mixed-radix key per row; each column's digit 0 means a missing value
+        combined = np.zeros(len(dataframe), dtype=np.int64)
+        self.values = []
+        for key in self.keys:
+            codes, values = pd.factorize(dataframe[key])
+            combined = combined * (len(values) + 1) + (codes + 1)
+            self.values.append(pd.Index(values))
+        row_groups, groups = pd.factorize(combined)
+        self.row_groups = row_groups.astype(np.int32)
+
+        # Each group's digit per column, to test scopes against groups, not rows
+        self.group_digits = []
+        for values in reversed(self.values):
+            self.group_digits.insert(0, groups % (len(values) + 1))
+            groups = groups // (len(values) + 1)
+
+    def group_mask(self, filters):
+        """Boolean per group for a {column: allowed values} scope"""
+        import numpy as np
+
+        mask = np.ones(len(self.group_digits[0]) if self.group_digits else 1, dtype=bool)
+        for key, values, digits in zip(self.keys, self.values, self.group_digits):
+            if key in filters:
+                allowed = np.concatenate([[False], values.isin(scope_values(filters[key]))])
+                mask &= allowed[digits]
+        return mask
+
+    def positions(self, filters):
+        """Positions of the rows matching a scope, in table order"""
+        import numpy as np
+
+        return np.flatnonzero(self.group_mask(filters)[self.row_groups])
+
+    def resolve_scope(self, filters):
+        """Rows matching a {column: allowed values} scope"""
+        import numpy as np
+
+        if not self.keys:
+            return self.source
+        positions = self.positions(filters)
+        sorted_positions = self.sorted_positions[positions]
+        # One run of the sorted frame in table order, e.g. one grade and region
+        if len(positions) and np.all(np.diff(sorted_positions) == 1):
+            return self.frame.iloc[sorted_positions[0]:sorted_positions[-1] + 1]
+        return self.source.take(positions)
+
+    def resolve(self, admin_key):
+        """Return the rows visible to admin_key without rescanning the frame"""
+        return self.resolve_scope(scope_filters(admin_key))
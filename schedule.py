@@ -0,0 +1,171 @@
+"""Quiz schedule lookups by date range.
+
+scheduled_date is parsed into a datetime column once at load (see
+data_layer.COLUMN_DTYPES). ScheduleIndex keeps a scope's quizzes ordered by
+that column, so any date range is two binary searches and a slice of the
+sorted rows, however many years of history the calendar holds.
+
+resolve_date_range() turns the date expressions in a query ("next week",
+"next 2 weeks", "tomorrow", "in December", "between Dec 1 and Dec 15") into a concrete
+(start, end) pair relative to today. Ranges are whole days, inclusive at
+both ends; None on either side leaves it open.
+"""
+
+import calendar
+import re
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+MONTHS = {}
+for number in range(1, 13):
+    MONTHS[calendar.month_name[number].lower()] = number
+    MONTHS[calendar.month_abbr[number].lower()] = number
+MONTHS['sept'] = 9
+
+_MONTH = '|'.join(sorted(MONTHS, key=len, reverse=True))
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_DATE = (
+    rf"\d{{4}}-\d{{1,2}}-\d{{1,2}}"
+    rf"|(?:{_MONTH})\.?\s+{_DAY}(?:,?\s+\d{{4}})?"
+    rf"|{_DAY}\s+(?:{_MONTH})\.?(?:,?\s+\d{{4}})?"
+)
+
+# Tried in order; the first expression found in the query decides the range.
+# Each needs one of its words (None: a digit, as every _DATE has one), so
+# patterns that cannot match are skipped without a search
+DATE_PATTERNS = [
+    ('between', None, re.compile(rf"\b(?:between|from)\s+({_DATE})\s+(?:and|to|until|through)\s+({_DATE})\b")),
+    ('span', None, re.compile(r"\b(next|last|past)\s+(\d+)\s+(day|week|month)s?\b")),
+    ('day', ('today', 'tomorrow', 'yesterday'), re.compile(r"\b(today|tomorrow|yesterday)\b")),
+    ('period', ('week', 'month', 'year'), re.compile(r"\b(this|next|last|past)\s+(week|month|year)\b")),
+    ('month', tuple(MONTHS), re.compile(rf"\b(?:in|during|for|of)\s+({_MONTH})\.?(?:\s+(\d{{4}}))?\b|\b({_MONTH})\.?\s+(\d{{4}})\b")),
+    ('after', None, re.compile(rf"\b(?:after|since|from)\s+({_DATE})\b")),
+    ('before', None, re.compile(rf"\b(?:before|until|till|by)\s+({_DATE})\b")),
+    ('on', None, re.compile(rf"\b({_DATE})\b"))
+]
+_DIGIT = re.compile(r"\d")
+
+_DATE_PARTS = re.compile(
+    rf"(\d{{4}})-(\d{{1,2}})-(\d{{1,2}})"
+    rf"|({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?"
+    rf"|(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH})\.?(?:,?\s+(\d{{4}}))?"
+)
+
+def parse_date(text, today):
+    """A date from "2024-12-01", "Dec 1", "1st December 2024"; the year defaults to today's"""
+    match = _DATE_PARTS.fullmatch(text.strip())
+    if match is None:
+        return None
+    iso_year, iso_month, iso_day, month_a, day_a, year_a, day_b, month_b, year_b = match.groups()
+    try:
+        if iso_year:
+            return date(int(iso_year), int(iso_month), int(iso_day))
+        if month_a:
+            return date(int(year_a or today.year), MONTHS[month_a], int(day_a))
+        return date(int(year_b or today.year), MONTHS[month_b], int(day_b))
+    except ValueError:
+        return None
+
+def _add_months(day, months):
+    """The same day of the month months later (or earlier), clamped to the month's length"""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def _span_range(which, count, unit, today):
+    """"next 3 weeks" from today on, "last 3 weeks" up to today"""
+    sign = 1 if which == 'next' else -1
+    if unit == 'month':
+        other = _add_months(today, sign * count)
+    else:
+        other = today + timedelta(days=sign * count * (7 if unit == 'week' else 1))
+    return (today, other) if sign > 0 else (other, today)
+
+def _month_range(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+PERIOD_SHIFTS = {'this': 0, 'next': 1, 'last': -1, 'past': -1}
+
+def _period_range(which, unit, today):
+    shift = PERIOD_SHIFTS[which]
+    if unit == 'week':
+        start = today + timedelta(days=7 * shift - today.weekday())
+        return start, start + timedelta(days=6)
+    if unit == 'month':
+        month_index = today.year * 12 + today.month - 1 + shift
+        return _month_range(month_index // 12, month_index % 12 + 1)
+    year = today.year + shift
+    return date(year, 1, 1), date(year, 12, 31)
+
+def resolve_date_range(query, today=None):
+    """Return (start, end) dates for the first date expression in query, or None"""
+    today = today or date.today()
+    query = query.lower()
+    has_digit = _DIGIT.search(query) is not None
+    for kind, words, pattern in DATE_PATTERNS:
+        if not (has_digit if words is None else any(word in query for word in words)):
+            continue
+        match = pattern.search(query)
+        if match is None:
+            continue
+        if kind == 'between':
+            start, end = parse_date(match.group(1), today), parse_date(match.group(2), today)
+            if start is not None and end is not None:
+                if end < start and not re.search(r"\d{4}", match.group(2)):
+                    # "between Dec 20 and Jan 5" runs into the next year
+                    end = _add_months(end, 12)
+                return (start, end) if start <= end else (end, start)
+        elif kind == 'span':
+            return _span_range(match.group(1), int(match.group(2)), match.group(3), today)
+        elif kind == 'day':
+            offset = {'today': 0, 'tomorrow': 1, 'yesterday': -1}[match.group(1)]
+            day = today + timedelta(days=offset)
+            return day, day
+        elif kind == 'period':
+            return _period_range(match.group(1), match.group(2), today)
+        elif kind == 'month':
+            month = MONTHS[match.group(1) or match.group(3)]
+            return _month_range(int(match.group(2) or match.group(4) or today.year), month)
+        else:
+            day = parse_date(match.group(1), today)
+            if day is not None:
+                return {'after': (day, None), 'before': (None, day), 'on': (day, day)}[kind]
+    return None
+
+def describe_range(start, end):
+    """Human-readable form of a (start, end) range for result messages"""
+    if start is not None and end is not None:
+        return f"on {start}" if start == end else f"between {start} and {end}"
+    if start is not None:
+        return f"from {start} on"
+    if end is not None:
+        return f"up to {end}"
+    return "at any date"
+
+class ScheduleIndex:
+    """A quizzes frame ordered by scheduled date for binary-search range lookups.
+
+    Built once per scope and data version. Lookups return slices of the
+    sorted frame, which are shared and must not be modified.
+    """
+
+    def __init__(self, frame, column='scheduled_date'):
+        dates = pd.to_datetime(frame[column]).to_numpy(dtype='datetime64[ns]')
+        order = np.argsort(dates, kind='stable')
+        # Most tables are already stored in date order, so no reordered copy is needed
+        self.frame = frame if (np.diff(order) > 0).all() else frame.take(order)
+        # NaT sorts last and is left out of every range
+        self.dates = dates[order][:int((~np.isnat(dates)).sum())]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def between(self, start=None, end=None):
+        """Rows scheduled from start to end inclusive; None leaves a side open"""
+        low = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start, 'ns'), 'left')
+        high = len(self.dates) if end is None else np.searchsorted(
+            self.dates, np.datetime64(end, 'ns') + np.timedelta64(1, 'D'), 'left'
+        )
+        return self.frame.iloc[low:max(low, high)]
@@ -0,0 +1,108 @@
+"""Columnar on-disk snapshots of the portal tables.
+
+Each table is written as an uncompressed Arrow IPC file with the compact
+dtypes of the data layer. Reading memory-maps the file, so a cold start
+costs little more than opening it instead of parsing CSV text. The
+dashboard serves these snapshots in offline mode and whenever Supabase is
+unreachable, falling back to the CSV copies in the data directory when no
+snapshot has been taken.
+
+    python snapshot.py --source supabase   # snapshot the live tables
+    python snapshot.py --source csv        # snapshot Data/*.csv
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+from data_layer import TABLE_COLUMNS, apply_column_types, data_version
+
+DEFAULT_DATA_DIR = 'Data'
+SNAPSHOT_SUBDIR = 'snapshot'
+SNAPSHOT_EXTENSION = '.arrow'
+
+# Schema metadata key holding the content version computed at write time
+VERSION_METADATA_KEY = b'data_version'
+
+def snapshot_path(data_dir, table_name):
+    return os.path.join(data_dir, SNAPSHOT_SUBDIR, table_name + SNAPSHOT_EXTENSION)
+
+def csv_path(data_dir, table_name):
+    return os.path.join(data_dir, table_name + '.csv')
+
+def write_snapshot_table(frame, path):
+    """Write one typed table to an Arrow IPC file, replacing it atomically"""
+    if pa is None:
+        raise ImportError("pyarrow is required to write snapshots")
+    frame = apply_column_types(frame).reset_index(drop=True)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        VERSION_METADATA_KEY: str(data_version(frame)).encode()
+    })
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+def read_snapshot_table(path):
+    """Memory-map a snapshot file into a DataFrame without parsing it.
+
+    Column buffers stay backed by the mapped file where the dtype allows, so
+    the frame is read-only and must not be modified in place.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    frame = table.to_pandas(split_blocks=True)
+    version = (table.schema.metadata or {}).get(VERSION_METADATA_KEY)
+    if version is not None:
+        frame.attrs['data_version'] = int(version)
+    return frame
+
+def local_table_loaders(data_dir=DEFAULT_DATA_DIR, table_names=tuple(TABLE_COLUMNS)):
+    """Loader per table: the snapshot if one exists, else the CSV copy"""
+    def loader(table_name):
+        path = snapshot_path(data_dir, table_name)
+        if pa is not None and os.path.exists(path):
+            return lambda: read_snapshot_table(path)
+        return lambda: pd.read_csv(csv_path(data_dir, table_name))
+    return {table_name: loader(table_name) for table_name in table_names}
+
+def fetch_supabase_tables(table_names):
+    """Read every table from the Supabase project configured in the environment"""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    from data_layer import fetch_table
+
+    load_dotenv()
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    return {table_name: fetch_table(client, table_name) for table_name in table_names}
+
+def main():
+    parser = argparse.ArgumentParser(description="Write memory-mappable snapshots of the portal tables")
+    parser.add_argument('--source', choices=['supabase', 'csv'], default='supabase')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    table_names = list(TABLE_COLUMNS)
+    if args.source == 'supabase':
+        frames = fetch_supabase_tables(table_names)
+    else:
+        frames = {name: pd.read_csv(csv_path(args.data_dir, name)) for name in table_names}
+
+    for table_name, frame in frames.items():
+        path = snapshot_path(args.data_dir, table_name)
+        write_snapshot_table(frame, path)
+        print(f"{table_name}: {len(frame)} rows -> {path}")
+
+if __name__ == '__main__':
+    main()
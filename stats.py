@@ -0,0 +1,61 @@
+"""Quick Stats aggregation for the admin portal.
+
+The students table is reduced once per data version to one row per
+(grade, class, region) group holding counts and score/attendance totals. Any
+admin scope's stats are then rolled up from those few group rows instead of
+rescanning the roster on every rerun.
+"""
+
+import numpy as np
+import pandas as pd
+
+from roles import scope_filters, scope_values
+
+GROUP_KEYS = ['grade', 'class', 'region']
+
+def build_aggregates(students_df):
+    """One row per (grade, class, region) with additive totals and extremes"""
+    keys = [k for k in GROUP_KEYS if k in students_df.columns]
+    work = pd.DataFrame({
+        **{k: students_df[k] for k in keys},
+        'pending': (students_df['homework_status'] == 'pending').astype('int32'),
+        'quiz_score': students_df['quiz_score'].astype('float64'),
+        'attendance_rate': students_df['attendance_rate'].astype('float64')
+    })
+    # Students missing a key keep a group of their own, which only unrestricted scopes include
+    grouped = work.groupby(keys, observed=True, sort=False, dropna=False)
+    return grouped.agg(
+        students=('pending', 'size'),
+        pending=('pending', 'sum'),
+        score_sum=('quiz_score', 'sum'),
+        score_count=('quiz_score', 'count'),
+        score_min=('quiz_score', 'min'),
+        score_max=('quiz_score', 'max'),
+        attendance_sum=('attendance_rate', 'sum'),
+        attendance_count=('attendance_rate', 'count')
+    ).reset_index()
+
+def rollup(aggregates, admin_key):
+    """Combine the group rows inside an admin's scope into Quick Stats"""
+    mask = np.ones(len(aggregates), dtype=bool)
+    for column, values in scope_filters(admin_key).items():
+        if column in aggregates.columns:
+            mask &= aggregates[column].isin(scope_values(values)).to_numpy()
+
+    def total(column):
+        return aggregates[column].to_numpy()[mask].sum()
+
+    score_count = total('score_count')
+    attendance_count = total('attendance_count')
+    return {
+        'students': int(total('students')),
+        'pending_homework': int(total('pending')),
+        'avg_score': total('score_sum') / score_count if score_count else None,
+        'min_score': np.nanmin(aggregates['score_min'].to_numpy()[mask]) if score_count else None,
+        'max_score': np.nanmax(aggregates['score_max'].to_numpy()[mask]) if score_count else None,
+        'avg_attendance': total('attendance_sum') / attendance_count if attendance_count else None
+    }
+
+def quick_stats(students_df, admin_key):
+    """Quick Stats for a frame that has no precomputed aggregates"""
+    return rollup(build_aggregates(students_df), admin_key)
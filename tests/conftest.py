@@ -0,0 +1,30 @@
+"""Helpers shared by the tests and benchmarks/bench_startup.py.
+
+Kept free of the data stack: the startup benchmark imports this module in
+the interpreter whose login page it checks for HEAVY_MODULES.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the login page should render without
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'supabase', 'httpx')
+
+
+def log_in(at, email='rajesh@school.com', password='admin123'):
+    """Submit the login form of an AppTest of main.py with the demo credentials"""
+    at.text_input[0].set_value(email)
+    at.text_input[1].set_value(password)
+    return next(b for b in at.button if b.label == "🚀 Login").click().run()
+
+
+def cold_start(eager):
+    """Time one login page and dashboard in a fresh interpreter"""
+    script = os.path.join(ROOT, 'benchmarks', 'bench_startup.py')
+    command = [sys.executable, script, '--child'] + (['--eager'] if eager else [])
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,59 @@
+"""JoinIndex answers against direct filtering and a plain merge, null keys included."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import JOIN_KEYS, JoinIndex
+from benchmarks.fixtures import generate_quizzes, generate_students
+from data_layer import apply_column_types
+from roles import ROLE_SCOPES, filter_by_scope
+
+def with_null_keys(frame, every):
+    """Null class on every n-th row and null region on every (n+1)-th"""
+    frame = frame.copy()
+    frame.loc[frame.index[::every], 'class'] = None
+    frame.loc[frame.index[::every + 1], 'region'] = None
+    return apply_column_types(frame)
+
+STUDENTS = with_null_keys(generate_students(3000, seed=8), 17)
+QUIZZES = with_null_keys(generate_quizzes(400, seed=8, start='2024-12-01', days=30), 11)
+AS_OF, DAYS = '2024-12-10', 10
+
+SCOPES = [*ROLE_SCOPES.values(), {'grade': (8,), 'class': ('B',), 'region': ('North',)},
+          {'class': ('A', 'C')}, {'region': ('South',)}, {}]
+
+@pytest.fixture(scope='module')
+def join_index():
+    return JoinIndex(STUDENTS, QUIZZES)
+
+@pytest.mark.parametrize('scope', SCOPES, ids=str)
+def test_pending_before_quiz_matches_a_merge(join_index, scope):
+    students = STUDENTS.assign(student=np.arange(len(STUDENTS)))
+    pending = filter_by_scope(students[students['homework_status'] == 'pending'], scope)
+    dates = pd.to_datetime(QUIZZES['scheduled_date'])
+    window = (dates >= AS_OF) & (dates <= pd.Timestamp(AS_OF) + pd.Timedelta(days=DAYS))
+    upcoming = filter_by_scope(QUIZZES[window], scope)
+    merged = pending[['student', *JOIN_KEYS]].merge(upcoming[['quiz_name', *JOIN_KEYS]], on=JOIN_KEYS)
+    expected = sorted(zip(merged['student'], merged['quiz_name'].astype(str)))
+
+    result = join_index.pending_before_quiz(list(scope.items()), as_of=AS_OF, days=DAYS)
+    assert sorted(zip(result['student'], result['quiz_name'].astype(str))) == expected
+
+@pytest.mark.parametrize('scope', SCOPES, ids=str)
+def test_score_by_subject_matches_direct_filtering(join_index, scope):
+    scoped = filter_by_scope(STUDENTS, scope)
+    subject_by_quiz = dict(zip(QUIZZES['quiz_name'].astype(object), QUIZZES['subject'].astype(object)))
+    subjects = [subject_by_quiz.get(name) or name.split()[0] for name in scoped['quiz_name'].astype(object)]
+    grouped = scoped.assign(subject=subjects).groupby('subject', sort=True)['quiz_score']
+    expected = pd.DataFrame({'students': grouped.size(), 'avg_score': grouped.mean().astype('float64').round(1)})
+
+    result = join_index.score_by_subject(list(scope.items())).set_index('subject')
+    assert result['students'].tolist() == expected['students'].tolist()
+    assert result.index.astype(str).tolist() == expected.index.tolist()
+    assert np.allclose(result['avg_score'], expected['avg_score'])
+
+def test_students_without_a_class_stay_out_of_class_scopes(join_index):
+    scope = {'grade': (8,), 'class': ('B',), 'region': ('North',)}
+    result = join_index.pending_before_quiz(list(scope.items()), as_of=AS_OF, days=DAYS)
+    assert STUDENTS['class'].iloc[result['student']].eq('B').all()
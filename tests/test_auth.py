@@ -0,0 +1,99 @@
+"""Password checks, signed session tokens and the per-rerun session check."""
+
+import csv
+
+import pytest
+
+from auth import (DIRECTORY_COLUMNS, AdminDirectory, SessionSigner, _b64decode, _b64encode, auth_from_env,
+                  hash_password, session_claims, verify_login)
+
+# A low KDF cost keeps the tests quick; stored hashes carry their own
+ITERATIONS = 1000
+ADMINS = [
+    {'email': 'rajesh@school.com', 'role': 'admin1', 'password_hash': hash_password('admin123', ITERATIONS)},
+    {'email': 'lakshmi@school.com', 'role': 'admin2', 'password_hash': hash_password('secret456', ITERATIONS)}
+]
+
+def make_directory(admins=ADMINS):
+    return AdminDirectory(admins)
+
+def with_role(email, role):
+    return [{**admin, 'role': role} if admin['email'] == email else admin for admin in ADMINS]
+
+def test_correct_password_returns_the_role():
+    assert verify_login(make_directory(), 'rajesh@school.com', 'admin123') == (True, 'admin1')
+    assert verify_login(make_directory(), '  Rajesh@School.com ', 'admin123') == (True, 'admin1')
+
+@pytest.mark.parametrize('email, password', [
+    ('rajesh@school.com', 'admin124'),
+    ('rajesh@school.com', ''),
+    ('rajesh@school.com', 'secret456'),
+    ('nobody@school.com', 'admin123')
+])
+def test_wrong_password_or_unknown_user_is_rejected(email, password):
+    assert verify_login(make_directory(), email, password) == (False, None)
+
+def test_unknown_role_is_refused_when_loading():
+    with pytest.raises(ValueError):
+        AdminDirectory(with_role('rajesh@school.com', 'superuser'))
+
+def test_valid_token_returns_its_claims():
+    signer = SessionSigner('key')
+    claims = signer.verify(signer.issue('Rajesh@school.com', 'admin1'))
+    assert claims['sub'] == 'rajesh@school.com' and claims['role'] == 'admin1'
+
+def tampered_tokens(signer):
+    token = signer.issue('lakshmi@school.com', 'admin2')
+    payload, signature = token.split('.')
+    raised = _b64encode(_b64decode(payload).replace(b'admin2', b'admin1'))
+    return [
+        f"{raised}.{signature}",
+        f"{payload}.{signature[:-2]}AA",
+        f"{payload}.",
+        payload,
+        'not-a-token',
+        SessionSigner('other key').issue('lakshmi@school.com', 'admin2')
+    ]
+
+@pytest.mark.parametrize('index', range(6))
+def test_tampered_token_is_rejected(index):
+    signer = SessionSigner('key')
+    assert signer.verify(tampered_tokens(signer)[index]) is None
+
+def test_expired_token_is_rejected():
+    signer = SessionSigner('key', ttl=60)
+    token = signer.issue('rajesh@school.com', 'admin1', now=1000)
+    assert signer.verify(token, now=1059) is not None
+    assert signer.verify(token, now=1060) is None
+
+def test_session_check_accepts_a_listed_admin():
+    signer = SessionSigner('key')
+    token = signer.issue('rajesh@school.com', 'admin1')
+    assert session_claims(signer, make_directory(), token)['role'] == 'admin1'
+
+def test_token_is_rejected_after_a_role_change():
+    signer = SessionSigner('key')
+    token = signer.issue('rajesh@school.com', 'admin1')
+    assert session_claims(signer, make_directory(with_role('rajesh@school.com', 'admin2')), token) is None
+
+def test_token_is_rejected_after_the_admin_is_removed():
+    signer = SessionSigner('key')
+    token = signer.issue('rajesh@school.com', 'admin1')
+    remaining = [admin for admin in ADMINS if admin['email'] != 'rajesh@school.com']
+    assert session_claims(signer, make_directory(remaining), token) is None
+
+def test_auth_from_env(tmp_path, monkeypatch):
+    path = tmp_path / 'admins.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=DIRECTORY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(ADMINS)
+    monkeypatch.setenv('ADMIN_DIRECTORY_PATH', str(path))
+    monkeypatch.setenv('AUTH_SECRET', 'shared key')
+    monkeypatch.setenv('AUTH_SESSION_HOURS', '0.5')
+
+    directory, signer = auth_from_env()
+    assert len(directory) == len(ADMINS) and signer.ttl == 1800
+    # Pages configured with the same secret accept each other's tokens
+    _, other_signer = auth_from_env()
+    assert session_claims(other_signer, directory, signer.issue('rajesh@school.com', 'admin1')) is not None
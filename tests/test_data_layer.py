@@ -0,0 +1,61 @@
+"""Paginated loading from a Supabase-like backend."""
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import generate_quizzes, generate_students
+from data_layer import INTEGER_NULL, TABLE_COLUMNS, DataStore, apply_column_types, fetch_table
+from instrumentation import RerunTimer, activate
+from local_backend import LocalBackend
+
+COLUMNS = TABLE_COLUMNS['students']
+
+@pytest.fixture(scope='module')
+def students():
+    return generate_students(2500, seed=1)[COLUMNS]
+
+@pytest.mark.parametrize('prefetch', [1, 3])
+@pytest.mark.parametrize('max_rows', [None, 300, 1000])
+def test_every_row_is_loaded_whatever_the_server_row_cap(students, prefetch, max_rows):
+    backend = LocalBackend({'students': students}, max_rows=max_rows)
+    frame = fetch_table(backend, 'students', page_size=1000, prefetch=prefetch)
+    assert frame['student_id'].tolist() == students['student_id'].tolist()
+
+def test_exact_multiple_of_page_size(students):
+    frame = fetch_table(LocalBackend({'students': students.head(2000)}), 'students', page_size=1000)
+    assert len(frame) == 2000
+
+def test_empty_table(students):
+    frame = fetch_table(LocalBackend({'students': students.head(0)}), 'students')
+    assert frame.empty and list(frame.columns) == COLUMNS
+
+def test_categories_match_csv_loading(students):
+    frame = fetch_table(LocalBackend({'students': students}), 'students', page_size=700)
+    expected = apply_column_types(students)
+    for column in ('class', 'region', 'homework_status', 'quiz_name'):
+        assert list(frame[column].cat.categories) == sorted(frame[column].cat.categories)
+        assert list(frame[column].cat.categories) == list(expected[column].cat.categories)
+        assert frame[column].tolist() == expected[column].tolist()
+
+@pytest.mark.parametrize('dtype', ['float64', object])
+def test_null_grade_is_stored_as_sentinel(students, dtype):
+    # JSON null arrives as None; a CSV-backed table yields NaN
+    rows = students.head(10).astype({'grade': dtype})
+    rows.loc[rows.index[3], 'grade'] = None
+    frame = fetch_table(LocalBackend({'students': rows}), 'students')
+    assert frame['grade'].dtype == 'int8'
+    assert frame['grade'].iloc[3] == INTEGER_NULL
+    pd.testing.assert_series_equal(frame['grade'], apply_column_types(rows)['grade'].reset_index(drop=True))
+
+def test_prefetch_spans_are_recorded_under_the_callers_section(students):
+    quizzes = generate_quizzes(200, seed=1)[TABLE_COLUMNS['quizzes']]
+    store = DataStore(LocalBackend({'students': students, 'quizzes': quizzes}))
+    timer = RerunTimer()
+    activate(timer)
+    try:
+        with timer.section('sync tables'):
+            store.prefetch()
+    finally:
+        activate(None)
+    synced = {name: parent for name, parent, _, _ in timer.sections if name.startswith('supabase sync')}
+    assert synced == {'supabase sync: students': 'sync tables', 'supabase sync: quizzes': 'sync tables'}
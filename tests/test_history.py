@@ -0,0 +1,36 @@
+"""Session history stays bounded however many queries are run."""
+
+import pandas as pd
+
+from benchmarks.fixtures import HISTORY_QUERIES, QUERIES_PER_VERSION, generate_students
+from data_layer import apply_column_types
+from history import QueryHistory
+from query_engine import QueryResultCache, run_query
+
+STUDENTS = apply_column_types(generate_students(1000))
+
+def run_session(count, limit, max_bytes):
+    cache = QueryResultCache(maxsize=10**6, max_bytes=max_bytes)
+    history = QueryHistory(limit)
+    quizzes = STUDENTS.iloc[0:0]
+    peak = 0
+    for i in range(1, count + 1):
+        query = HISTORY_QUERIES[i % len(HISTORY_QUERIES)]
+        version = i // QUERIES_PER_VERSION
+        result = run_query(query, STUDENTS, quizzes, scope='admin', data_version=version, cache=cache)
+        history.record(query, result, 'admin', version, 'admin', '')
+        peak = max(peak, cache.bytes)
+    return history, cache, peak
+
+def test_history_keeps_the_newest_entries_without_frames():
+    history, cache, _ = run_session(300, limit=50, max_bytes=2**20)
+    assert len(history) == 50
+    assert [entry['id'] for entry in history.entries] == list(range(251, 301))
+    for entry in history.entries:
+        assert not any(isinstance(value, (pd.DataFrame, pd.Series)) for value in entry.values())
+
+def test_result_frames_stay_within_the_cache_budget():
+    history, cache, peak = run_session(300, limit=50, max_bytes=2**18)
+    assert 0 < peak <= 2**18
+    # Entries whose results were evicted are still listed, and recomputed when opened
+    assert sum(history.cache_key(entry) in cache for entry in history.entries) < len(history)
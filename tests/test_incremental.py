@@ -0,0 +1,110 @@
+"""IncrementalTable watermark syncs against a Supabase-like backend."""
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import generate_students
+from data_layer import TABLE_COLUMNS, WATERMARK_COLUMN, IncrementalTable, apply_column_types
+from local_backend import LocalBackend, LocalQuery
+
+COLUMNS = TABLE_COLUMNS['students']
+
+def make_backend(watermark=True):
+    students = generate_students(1500, seed=2)[COLUMNS]
+    if watermark:
+        students = students.assign(**{WATERMARK_COLUMN: '2024-01-01T00:00:00'})
+    return LocalBackend({'students': students}, max_rows=400)
+
+def expected_rows(backend, grade=None):
+    rows = backend.tables['students']
+    if grade is not None:
+        rows = rows[rows['grade'] == grade]
+    return apply_column_types(rows[COLUMNS]).sort_values('student_id').reset_index(drop=True)
+
+def assert_synced(table, backend, grade=None):
+    pd.testing.assert_frame_equal(table.frame[COLUMNS].reset_index(drop=True), expected_rows(backend, grade),
+                                  check_categorical=False)
+
+def students(backend):
+    return backend.table('students')
+
+@pytest.fixture
+def watermarks(monkeypatch):
+    """Every (column, value) passed to gte()"""
+    calls = []
+    gte = LocalQuery.gte
+    def recording_gte(query, column, value):
+        calls.append((column, value))
+        return gte(query, column, value)
+    monkeypatch.setattr(LocalQuery, 'gte', recording_gte)
+    return calls
+
+def test_insert_update_and_delete_are_merged():
+    backend = make_backend()
+    table = IncrementalTable(backend, 'students', page_size=500)
+    table.sync()
+    new_row = backend.tables['students'].iloc[0][COLUMNS].to_dict()
+    new_row.update(student_id=10_000, name='New Student')
+    students(backend).insert({**new_row, WATERMARK_COLUMN: None}).execute()
+    students(backend).update({'quiz_score': 12, 'homework_status': 'pending'}).eq('student_id', 7).execute()
+    students(backend).delete().in_('student_id', [3, 900]).execute()
+
+    frame, changed = table.sync()
+    assert changed
+    assert_synced(table, backend)
+    assert frame.loc[7, 'quiz_score'] == 12 and 10_000 in frame.index and 3 not in frame.index
+
+def test_rows_moving_out_of_and_into_a_scope():
+    backend = make_backend()
+    table = IncrementalTable(backend, 'students', filters={'grade': 8}, page_size=500)
+    frame, _ = table.sync()
+    leaving = int(frame['student_id'].iloc[0])
+    joining = int(backend.tables['students'].query('grade != 8')['student_id'].iloc[0])
+    students(backend).update({'grade': 9}).eq('student_id', leaving).execute()
+    students(backend).update({'grade': 8}).eq('student_id', joining).execute()
+
+    frame, changed = table.sync()
+    assert changed
+    assert leaving not in frame.index and joining in frame.index
+    assert_synced(table, backend, grade=8)
+
+def test_resync_without_changes_keeps_the_frame():
+    backend = make_backend()
+    table = IncrementalTable(backend, 'students', page_size=500)
+    first, changed = table.sync()
+    assert changed
+    frame, changed = table.sync()
+    assert frame is first and not changed
+
+def test_syncs_fetch_only_rows_at_or_after_the_watermark(watermarks):
+    backend = make_backend()
+    table = IncrementalTable(backend, 'students', page_size=500)
+    table.sync()
+    assert watermarks == [] and table.watermark == '2024-01-01T00:00:00'
+
+    students(backend).update({'attendance_rate': 50}).eq('student_id', 11).execute()
+    stamp = backend.tables['students'].set_index('student_id').loc[11, WATERMARK_COLUMN]
+    table.sync()
+    assert watermarks[0] == (WATERMARK_COLUMN, '2024-01-01T00:00:00')
+    assert set(watermarks) == {watermarks[0]}
+    assert table.watermark == stamp
+
+    watermarks.clear()
+    table.sync()
+    assert set(watermarks) == {(WATERMARK_COLUMN, stamp)}
+    assert_synced(table, backend)
+
+def test_table_without_updated_at_falls_back_to_full_reloads(watermarks):
+    backend = make_backend(watermark=False)
+    table = IncrementalTable(backend, 'students', page_size=500)
+    first, _ = table.sync()
+    assert not table.incremental and WATERMARK_COLUMN not in first.columns
+
+    students(backend).update({'quiz_score': 99}).eq('student_id', 5).execute()
+    students(backend).delete().eq('student_id', 6).execute()
+    frame, changed = table.sync()
+    assert changed and watermarks == []
+    assert_synced(table, backend)
+
+    frame_again, changed = table.sync()
+    assert frame_again is frame and not changed
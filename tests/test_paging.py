@@ -0,0 +1,22 @@
+"""Result pages, sort orders and payload sizes."""
+
+import paging
+from benchmarks.fixtures import generate_students
+from data_layer import apply_column_types
+
+STUDENTS = apply_column_types(generate_students(600, seed=4))
+
+def test_pages_in_sort_order_cover_every_row():
+    pages = [paging.page_slice(STUDENTS, page, 50, 'quiz_score', False) for page in range(12)]
+    scores = [score for page in pages for score in page['quiz_score'].tolist()]
+    assert len(scores) == len(STUDENTS)
+    assert scores == STUDENTS['quiz_score'].sort_values(ascending=False, kind='stable').tolist()
+
+def test_payload_size_is_computed_once_per_frame(monkeypatch):
+    calls = []
+    measure = paging.payload_bytes
+    monkeypatch.setattr(paging, 'payload_bytes', lambda frame: calls.append(frame) or measure(frame))
+    frame = STUDENTS.copy()
+    sizes = [paging.frame_payload_bytes(frame) for _ in range(3)]
+    assert sizes == [measure(frame)] * 3 and len(calls) == 1
+    assert paging.frame_payload_bytes(frame.head(10)) < sizes[0] and len(calls) == 2
@@ -0,0 +1,63 @@
+"""Query executions across a scripted sequence of dashboard interactions.
+
+Drives main.py with Streamlit's AppTest against the local data (offline
+mode). Only a new query text, admin or data version should execute a query
+and add a history entry; switching the export format, opening the memory
+report or pressing Search again with the same query should not.
+"""
+
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import log_in
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+APP_ENV = {'DATA_MODE': 'offline', 'PRECOMPUTE_WORKERS': '0', 'TREND_HISTORY_DIR': ''}
+
+def type_query(text):
+    return lambda at: at.text_input(key='query_input_field').set_value(text).run()
+
+def click_search(at):
+    return next(b for b in at.button if b.label == "🔍 Search").click().run()
+
+def select_admin(admin_key):
+    return lambda at: at.selectbox(key='admin_selector').set_value(admin_key).run()
+
+def select_export_format(fmt):
+    return lambda at: at.selectbox(key='export_format').set_value(fmt).run()
+
+def toggle_memory_report(at):
+    return at.toggle(key='show_memory_report').set_value(True).run()
+
+# (interaction, label, executions expected from it)
+SCRIPT = [
+    (type_query("List all students"), "type a query", 1),
+    (click_search, "press Search again", 0),
+    (select_export_format('csv.gz'), "change export format", 0),
+    (toggle_memory_report, "toggle the memory report", 0),
+    (select_admin('admin2'), "switch admin", 1),
+    (type_query("Show me attendance data"), "type another query", 1),
+    (click_search, "press Search again", 0),
+    (select_admin('admin2'), "re-select the same admin", 0),
+    (type_query("List all students"), "go back to the first query", 1)
+]
+
+def test_only_new_queries_execute(monkeypatch):
+    for name, value in APP_ENV.items():
+        monkeypatch.setenv(name, value)
+    at = AppTest.from_file(MAIN, default_timeout=60)
+    at.run()
+    at = log_in(at)
+    assert at.session_state['logged_in']
+
+    executions = []
+    for interact, label, _ in SCRIPT:
+        before = at.session_state['last_query'].executions
+        at = interact(at)
+        assert not at.exception, f"{label}: {at.exception[0].value}"
+        executions.append((label, at.session_state['last_query'].executions - before))
+
+    assert executions == [(label, expected) for _, label, expected in SCRIPT]
+    assert len(at.session_state['query_history']) == sum(expected for _, _, expected in SCRIPT)
@@ -0,0 +1,48 @@
+"""The word-classifying router against the original keyword cascade."""
+
+import pytest
+
+from benchmarks.fixtures import legacy_intent, make_corpus
+from query_engine import Memo, route_query
+
+def test_intents_match_legacy_cascade():
+    # Keywords added after the cascade ("performing", "scoring") route differently
+    corpus = [q for q in make_corpus(2000, seed=5) if 'performing' not in q.lower() and 'scoring' not in q.lower()]
+    assert [route_query(q)[0] for q in corpus] == [legacy_intent(q) for q in corpus]
+
+@pytest.mark.parametrize('query, intent, expected', [
+    ("top 3 per region", 'ranking', {'rank': 'top', 'limit': 3, 'per': 'region'}),
+    ("best 10 in grade 9", 'ranking', {'rank': 'top', 'limit': 10, 'grade': 9}),
+    ("attendance under 75.5", 'low_attendance', {'threshold': 75.5}),
+    ("quizzes on 2024-11-05", 'upcoming_quizzes', {'start': '2024-11-05', 'end': '2024-11-05'}),
+    ("Any future quiz for class b?", 'upcoming_quizzes', {'class': 'B'}),
+    ("students in the north", 'unknown', {'region': 'North'}),
+    ("stop", 'unknown', {'rank': None}),
+    ("top 3 each grade 9", 'ranking', {'per': 'grade', 'grade': None}),
+    ("bottom 5 per class b in grade 7", 'ranking', {'per': 'class', 'class': None, 'grade': 7}),
+])
+def test_parameters(query, intent, expected):
+    routed, params = route_query(query)
+    assert routed == intent
+    assert {key: params[key] for key in expected} == expected
+
+@pytest.mark.parametrize('query, intent', [
+    ("Which low performing students need to improve?", 'low_performance'),
+    ("homework status changed", 'homework_status'),
+    ("students needing improvement in attendance", 'attendance'),
+    ("How did Grade 8 North attendance change this month?", 'trend'),
+    ("score progress in October", 'trend'),
+    ("Quiz score trend over the last 30 days", 'trend'),
+])
+def test_change_words_need_a_period(query, intent):
+    assert route_query(query)[0] == intent
+
+def test_repeated_queries_get_their_own_params():
+    first = route_query("Show me performance data for Grade 8")
+    first[1]['grade'] = 9
+    assert route_query("Show me performance data for Grade 8") == ('performance', {**first[1], 'grade': 8})
+
+def test_memo_starts_over_when_full():
+    memo = Memo(str.upper, max_keys=2)
+    assert [memo[key] for key in 'abc'] == ['A', 'B', 'C']
+    assert list(memo) == ['c']
@@ -0,0 +1,31 @@
+"""Ranking queries answered from a students frame."""
+
+import pytest
+
+from benchmarks.fixtures import generate_quizzes, generate_students
+from data_layer import apply_column_types
+from query_engine import process_natural_language_query
+
+STUDENTS = apply_column_types(generate_students(2000, seed=4))
+QUIZZES = apply_column_types(generate_quizzes(200, seed=4))
+
+@pytest.mark.parametrize('per', ['grade', 'class', 'region'])
+@pytest.mark.parametrize('rank', ['top', 'bottom'])
+def test_rank_per_group(per, rank):
+    response = process_natural_language_query(f"{rank} 3 by quiz score per {per}", STUDENTS, QUIZZES)
+    assert response['success'] and response['type'] == 'ranking'
+    data = response['data']
+    assert per in data.columns
+    groups = STUDENTS[per].dropna().unique()
+    assert sorted(data[per].unique()) == sorted(groups)
+    for value, group in data.groupby(per, observed=True):
+        scores = STUDENTS.loc[STUDENTS[per] == value, 'quiz_score'].dropna()
+        expected = scores.nlargest(3) if rank == 'top' else scores.nsmallest(3)
+        assert group['rank'].tolist() == [1, 2, 3]
+        assert group['quiz_score'].tolist() == expected.tolist()
+
+def test_rank_overall():
+    response = process_natural_language_query("top 5 by attendance", STUDENTS, QUIZZES)
+    data = response['data']
+    assert data['rank'].tolist() == [1, 2, 3, 4, 5]
+    assert data['attendance_rate'].tolist() == STUDENTS['attendance_rate'].nlargest(5).tolist()
@@ -0,0 +1,52 @@
+"""ScopeIndex against direct filtering, for every configured role."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import generate_quizzes, generate_students, random_scopes
+from data_layer import apply_column_types
+from roles import ADMIN_ROLES, ROLE_SCOPES, ScopeIndex, apply_role_based_filtering, filter_by_scope
+
+TABLES = {
+    'students': apply_column_types(generate_students(5000, seed=3)),
+    'quizzes': apply_column_types(generate_quizzes(500, seed=3))
+}
+
+@pytest.fixture(scope='module', params=sorted(TABLES))
+def table(request):
+    frame = TABLES[request.param]
+    return frame, ScopeIndex(frame)
+
+@pytest.mark.parametrize('admin_key', sorted(ADMIN_ROLES))
+def test_resolve_matches_direct_filtering(table, admin_key):
+    frame, index = table
+    expected = apply_role_based_filtering(frame, admin_key)
+    assert len(expected)
+    # Same rows, in table order, with the same index labels
+    pd.testing.assert_frame_equal(index.resolve(admin_key), expected)
+
+@pytest.mark.parametrize('scope', [
+    {'grade': (8, 9), 'region': ('South', 'North')},
+    {'grade': (10, 6), 'class': ('B', 'A')},
+    {'class': ('C',)},
+    {'grade': (12,)},
+    {}
+])
+def test_resolve_scope_keeps_table_order(table, scope):
+    frame, index = table
+    pd.testing.assert_frame_equal(index.resolve_scope(scope), filter_by_scope(frame, scope))
+
+def test_random_and_configured_scopes_match_direct_filtering(table):
+    # Random roles list one or more grades, classes and regions, leave a
+    # column unrestricted or name a value not in the roster
+    frame, index = table
+    scopes = random_scopes(200, seed=7) + list(ROLE_SCOPES.values())
+    mismatches = [scope for scope in scopes if not index.resolve_scope(scope).equals(filter_by_scope(frame, scope))]
+    assert mismatches == []
+
+def test_single_block_scope_is_a_view():
+    frame, index = TABLES['students'], ScopeIndex(TABLES['students'])
+    result = index.resolve_scope({'grade': (8,), 'region': ('North',)})
+    assert np.shares_memory(result['quiz_score'].to_numpy(), index.frame['quiz_score'].to_numpy())
+    pd.testing.assert_frame_equal(result, filter_by_scope(frame, {'grade': (8,), 'region': ('North',)}))
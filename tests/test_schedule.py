@@ -0,0 +1,62 @@
+"""Date expressions in queries and range lookups on the sorted schedule."""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import generate_quizzes
+from data_layer import apply_column_types
+from schedule import ScheduleIndex, resolve_date_range
+
+TODAY = date(2026, 10, 18)  # a Sunday
+
+@pytest.mark.parametrize('query, expected', [
+    ("quizzes today", (date(2026, 10, 18), date(2026, 10, 18))),
+    ("quizzes tomorrow", (date(2026, 10, 19), date(2026, 10, 19))),
+    ("quizzes next week", (date(2026, 10, 19), date(2026, 10, 25))),
+    ("quizzes this month", (date(2026, 10, 1), date(2026, 10, 31))),
+    ("quizzes in December", (date(2026, 12, 1), date(2026, 12, 31))),
+    ("quizzes in feb 2028", (date(2028, 2, 1), date(2028, 2, 29))),
+    ("quizzes next 2 weeks", (date(2026, 10, 18), date(2026, 11, 1))),
+    ("quizzes in the next 10 days", (date(2026, 10, 18), date(2026, 10, 28))),
+    ("scores over the past 3 months", (date(2026, 7, 18), date(2026, 10, 18))),
+    ("between Dec 1 and Dec 15", (date(2026, 12, 1), date(2026, 12, 15))),
+    ("between dec 20 and jan 5", (date(2026, 12, 20), date(2027, 1, 5))),
+    ("from 20th December to 5th January 2027", (date(2026, 12, 20), date(2027, 1, 5))),
+    ("between 2026-12-20 and 2026-01-05", (date(2026, 1, 5), date(2026, 12, 20))),
+    ("after Jan 1", (date(2026, 1, 1), None)),
+    ("before 2026-11-30", (None, date(2026, 11, 30))),
+    ("quizzes on 5 Nov", (date(2026, 11, 5), date(2026, 11, 5))),
+    ("all quizzes", None),
+])
+def test_resolve_date_range(query, expected):
+    assert resolve_date_range(query, TODAY) == expected
+
+@pytest.fixture(scope='module')
+def quizzes():
+    frame = apply_column_types(generate_quizzes(3000, seed=4, start='2026-01-01', days=365))
+    # Shuffled, with a few undated quizzes, so the index has to sort
+    frame = frame.sample(frac=1, random_state=4)
+    frame.loc[frame.index[::50], 'scheduled_date'] = pd.NaT
+    return frame
+
+@pytest.mark.parametrize('start, end', [
+    (date(2026, 3, 1), date(2026, 3, 31)),
+    (date(2026, 6, 15), date(2026, 6, 15)),
+    (date(2026, 10, 18), None),
+    (None, date(2026, 2, 1)),
+    (None, None),
+    (date(2027, 1, 1), date(2027, 2, 1)),
+    (date(2026, 5, 1), date(2026, 4, 1)),
+])
+def test_between_matches_a_full_scan(quizzes, start, end):
+    dates = quizzes['scheduled_date']
+    mask = dates.notna()
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates < pd.Timestamp(end) + pd.Timedelta(days=1)
+    found = ScheduleIndex(quizzes).between(start, end)
+    assert sorted(found['quiz_id']) == sorted(quizzes.loc[mask, 'quiz_id'])
+    assert found['scheduled_date'].is_monotonic_increasing
@@ -0,0 +1,8 @@
+"""The login page renders without the data stack."""
+
+from tests.conftest import HEAVY_MODULES, cold_start
+
+def test_login_page_loads_no_heavy_modules():
+    # A fresh interpreter, since this one has already imported pandas
+    run = cold_start(eager=False)
+    assert run['loaded'] == [], f"the login page loaded {run['loaded']} of {HEAVY_MODULES}"
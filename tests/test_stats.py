@@ -0,0 +1,34 @@
+"""Quick Stats rolled up from group aggregates against the scoped frame itself."""
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import generate_students
+from data_layer import apply_column_types
+from roles import ADMIN_ROLES, apply_role_based_filtering
+from stats import build_aggregates, rollup
+
+def students_with_nulls():
+    frame = generate_students(3000, seed=9)
+    frame.loc[frame.index[::13], 'class'] = None
+    frame.loc[frame.index[::17], 'region'] = None
+    frame['quiz_score'] = frame['quiz_score'].astype('float64')
+    frame.loc[frame.index[::19], 'quiz_score'] = np.nan
+    return apply_column_types(frame)
+
+STUDENTS = students_with_nulls()
+AGGREGATES = build_aggregates(STUDENTS)
+
+@pytest.mark.parametrize('admin_key', sorted(ADMIN_ROLES))
+def test_rollup_matches_the_scoped_frame(admin_key):
+    scoped = apply_role_based_filtering(STUDENTS, admin_key)
+    stats = rollup(AGGREGATES, admin_key)
+    assert stats['students'] == len(scoped)
+    assert stats['pending_homework'] == int((scoped['homework_status'] == 'pending').sum())
+    scores = scoped['quiz_score'].astype('float64')
+    assert np.isclose(stats['avg_score'], scores.mean())
+    assert stats['min_score'] == scores.min() and stats['max_score'] == scores.max()
+    assert np.isclose(stats['avg_attendance'], scoped['attendance_rate'].astype('float64').mean())
+
+def test_students_missing_a_key_are_counted():
+    assert AGGREGATES['students'].sum() == len(STUDENTS)
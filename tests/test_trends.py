@@ -0,0 +1,94 @@
+"""Quiz and attendance history recorded from the students table."""
+
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import TREND_SCOPE, generate_students, naive_trend
+from data_layer import DataStore, apply_column_types, fetch_table
+from local_backend import LocalBackend
+from query_engine import process_natural_language_query
+from trends import TrendStore
+
+STUDENTS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Data', 'students.csv')
+
+def load_students():
+    return fetch_table(LocalBackend({'students': pd.read_csv(STUDENTS_CSV)}), 'students')
+
+def test_quiz_results_are_dated_by_quiz_date():
+    students = load_students()
+    trends = TrendStore()
+    trends.record(students, today=date(2025, 3, 1))
+    response = process_natural_language_query("quiz score trend in November 2024", students, None, trends=trends)
+    assert response['type'] == 'trend'
+    days = pd.read_csv(STUDENTS_CSV)['quiz_date'].value_counts()
+    assert dict(zip(response['data']['period'].dt.strftime('%Y-%m-%d'), response['data']['records'])) == days.to_dict()
+
+def test_unchanged_quizzes_are_not_recorded_again():
+    students = load_students()
+    trends = TrendStore()
+    assert trends.record(students, today=date(2025, 3, 1)) == len(students)
+    assert trends.record(load_students(), today=date(2025, 3, 2)) == 0
+
+def test_attendance_is_snapshotted_once_per_day(tmp_path):
+    students = load_students()
+    trends = TrendStore(str(tmp_path))
+    trends.record(students, today=date(2025, 3, 1))
+    changed = students.assign(attendance_rate=students['attendance_rate'] - 10)
+    changed.attrs = {}
+    trends.refresh(changed, today=date(2025, 3, 1))
+    assert trends.stats()['attendance_snapshots'] == len(students)
+    trends.record(changed, today=date(2025, 3, 2))
+    assert trends.stats()['attendance_snapshots'] == 2 * len(students)
+    assert len(list(tmp_path.glob('attendance-*'))) == 2
+
+    replayed = TrendStore(str(tmp_path))
+    replayed.record(students, today=date(2025, 3, 2))
+    assert len(list(tmp_path.glob('attendance-*'))) == 2
+    expected = trends.trend('attendance_rate', start=date(2025, 3, 1), end=date(2025, 3, 2))
+    pd.testing.assert_frame_equal(replayed.trend('attendance_rate', start=date(2025, 3, 1), end=date(2025, 3, 2)), expected)
+
+def test_syncing_the_store_records_history():
+    store = DataStore(LocalBackend({'students': pd.read_csv(STUDENTS_CSV)}), table_names=('students',))
+    store.trends = TrendStore()
+    assert store.trend_store() is None
+    store.prefetch()
+    assert store.trends.stats()['attendance_snapshots'] == len(load_students())
+    store.get('students', 'admin1')
+    assert store.trend_store() is store.trends
+
+def test_rollups_match_a_scan_of_the_raw_history():
+    rng = np.random.default_rng(0)
+    students = apply_column_types(generate_students(3000, seed=6))
+    trends = TrendStore()
+    snapshots = []
+    first = date(2026, 1, 5)
+    for day_index in range(12):
+        today = first + timedelta(days=day_index)
+        drift = rng.integers(-2, 3, len(students))
+        students = students.assign(attendance_rate=np.clip(students['attendance_rate'] + drift, 0, 100)
+                                   .astype(students['attendance_rate'].dtype))
+        trends.record(students, today)
+        snapshots.append(students[['grade', 'region', 'attendance_rate']].assign(recorded_on=today.isoformat()))
+
+    history = pd.concat(snapshots, ignore_index=True)
+    start, end = first + timedelta(days=2), first + timedelta(days=9)
+    rollup = trends.trend('attendance_rate', TREND_SCOPE, start, end, 'day')
+    naive = naive_trend(history, start.isoformat(), end.isoformat())
+    assert rollup['period'].dt.strftime('%Y-%m-%d').tolist() == naive.index.tolist()
+    assert np.allclose(rollup['average'].to_numpy(), naive.to_numpy())
+
+def test_a_failed_history_write_does_not_stop_loading(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    store = DataStore(LocalBackend({'students': pd.read_csv(STUDENTS_CSV)}), table_names=('students',))
+    store.trends = TrendStore(str(blocker / 'history'))
+    frame, _ = store.get('students', 'admin1')
+    assert len(frame) and isinstance(store.trend_error, OSError)
+    assert store.trend_store() is store.trends
+
+    store.trends.directory = str(tmp_path / 'history')
+    store.get('students', 'admin1')
+    assert store.trend_error is None and store.trends.stats()['attendance_snapshots']
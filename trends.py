@@ -0,0 +1,311 @@
+"""Score and attendance history with daily and weekly rollups.
+
+The students table only holds each student's latest quiz and current
+attendance rate. TrendStore keeps an append-only history of both: a quiz
+result is appended when a student's latest quiz changes, and attendance is
+snapshotted once per day, by the first record that day.
+Every append also updates per-day and per-week totals for each (grade,
+class, region) group, so a trend question is answered by slicing the
+rollup for its date range and summing the groups in scope. Its cost
+depends on the number of periods and groups, not the length of the history.
+
+With a directory the history is also written there as one chunk file per
+append, and replayed from it when the store is created.
+"""
+
+import glob
+import os
+import threading
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+from data_layer import data_version
+from roles import scope_values
+
+TREND_KEYS = ['grade', 'class', 'region']
+
+# History kinds: the metric each records and the columns dating it, in order
+# of preference (a quiz without a quiz_date is dated the day it was recorded)
+HISTORY_KINDS = {
+    'quiz_results': ('quiz_score', ['quiz_date', 'recorded_on']),
+    'attendance': ('attendance_rate', ['recorded_on'])
+}
+
+BUCKETS = ('day', 'week')
+
+# Trend range when the query names no dates, ending today
+DEFAULT_TREND_DAYS = 30
+
+# A day range longer than this is bucketed by week unless the query says otherwise
+MAX_DAILY_TREND_DAYS = 31
+
+_EPOCH = date(1970, 1, 1)
+
+def day_number(day):
+    """Days since 1970-01-01, the period unit of the rollups"""
+    return (day - _EPOCH).days
+
+def week_start(days):
+    """Day number of the Monday on or before each day number (1970-01-01 was a Thursday)"""
+    return days - (days + 3) % 7
+
+def _empty_rollup():
+    return pd.DataFrame({
+        'period': np.array([], dtype=np.int32),
+        'group': np.array([], dtype=np.int32),
+        'total': np.array([], dtype=np.float64),
+        'count': np.array([], dtype=np.int64)
+    })
+
+def _totals(periods, groups, values):
+    """Per-(period, group) sum and count of the non-missing values"""
+    present = ~np.isnan(values)
+    frame = pd.DataFrame({'period': periods[present], 'group': groups[present], 'total': values[present]})
+    grouped = frame.groupby(['period', 'group'], sort=False)
+    return grouped['total'].agg(['sum', 'size']).reset_index().rename(columns={'sum': 'total', 'size': 'count'})
+
+def _parse_days(values):
+    """datetime64[D] per value, NaT where missing or unparseable.
+
+    Each distinct value is parsed once; a column holds few distinct dates.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), errors='coerce').to_numpy(dtype='datetime64[D]')
+    return np.append(parsed, np.datetime64('NaT'))[codes]
+
+def _value_hashes(values):
+    """Stable hash per value of its text, 0 where missing; each distinct value is hashed once"""
+    codes, uniques = pd.factorize(values)
+    hashes = pd.util.hash_array(np.asarray(uniques, dtype=object).astype(str).astype(object))
+    return np.append(hashes, np.uint64(0))[codes]
+
+def _quiz_hashes(frame):
+    """One hash of (quiz_name, quiz_date, quiz_score) per row, whatever the column dtypes"""
+    combined = np.zeros(len(frame), dtype=np.uint64)
+    # Dates are compared as days, so a parsed date matches the text it was read from
+    quiz_dates = _parse_days(frame['quiz_date']) if 'quiz_date' in frame.columns else np.full(len(frame), np.datetime64('NaT'))
+    for values in (frame['quiz_name'], quiz_dates, frame['quiz_score'].astype('float64')):
+        combined = combined * np.uint64(1000003) ^ _value_hashes(values)
+    return combined
+
+def _write_chunk(frame, path):
+    if pa is not None:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.OSFile(path + '.arrow', 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        frame.to_csv(path + '.csv', index=False)
+
+def _read_chunk(path):
+    if path.endswith('.arrow'):
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all().to_pandas()
+    return pd.read_csv(path)
+
+class TrendStore:
+    """Append-only quiz and attendance history with per-group period rollups"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.lock = threading.Lock()
+        # Held for a whole refresh, so no caller sees a version before it is recorded
+        self.refresh_lock = threading.Lock()
+        self.groups = pd.DataFrame({key: pd.Series(dtype=object) for key in TREND_KEYS})
+        self.group_codes = {}
+        # Hash of the latest quiz recorded per student, to append only new results
+        self.quiz_students = pd.Index([])
+        self.quiz_hashes = np.array([], dtype=np.uint64)
+        self.daily = {metric: _empty_rollup() for metric, _ in HISTORY_KINDS.values()}
+        self.weekly = {metric: _empty_rollup() for metric, _ in HISTORY_KINDS.values()}
+        self.rows = {kind: 0 for kind in HISTORY_KINDS}
+        self.recorded = None
+        # Day number of the latest attendance snapshot, replayed ones included
+        self.snapshot_day = None
+        self.marker = None
+        self.version = 0
+        if directory is not None:
+            self._replay()
+
+    def _replay(self):
+        """Rebuild the rollups from the chunk files, oldest first"""
+        paths = []
+        for kind in HISTORY_KINDS:
+            paths += glob.glob(os.path.join(self.directory, f'{kind}-*.arrow' if pa is not None else f'{kind}-*.csv'))
+        for path in sorted(paths, key=lambda p: os.path.basename(p).split('-', 1)[1]):
+            kind = os.path.basename(path).split('-', 1)[0]
+            self._apply(kind, _read_chunk(path))
+
+    def _codes(self, frame):
+        """Group code per row, adding groups not seen before"""
+        # Mixed-radix combination of per-key codes, as ScopeIndex does
+        local = np.zeros(len(frame), dtype=np.int64)
+        missing = np.zeros(len(frame), dtype=bool)
+        for key in TREND_KEYS:
+            codes, uniques = pd.factorize(frame[key])
+            missing |= codes < 0
+            local = local * (len(uniques) + 1) + codes
+        local[missing] = -1
+        seen, first, inverse = np.unique(local, return_index=True, return_inverse=True)
+        lookup = np.full(len(seen), -1, dtype=np.int32)
+        new_keys = []
+        for position, (code, row) in enumerate(zip(seen, first)):
+            if code < 0:
+                continue
+            key = tuple(frame[k].iloc[row] for k in TREND_KEYS)
+            key = tuple(v.item() if hasattr(v, 'item') else v for v in key)
+            if key not in self.group_codes:
+                self.group_codes[key] = len(self.group_codes)
+                new_keys.append(key)
+            lookup[position] = self.group_codes[key]
+        if new_keys:
+            added = pd.DataFrame(new_keys, columns=TREND_KEYS, dtype=object)
+            self.groups = pd.concat([self.groups, added], ignore_index=True)
+        # Rows with a missing key keep code -1
+        return lookup[inverse]
+
+    def _apply(self, kind, chunk):
+        """Fold one history chunk into the rollups"""
+        metric, date_columns = HISTORY_KINDS[kind]
+        days = np.full(len(chunk), np.datetime64('NaT'), dtype='datetime64[D]')
+        for column in date_columns:
+            missing = np.isnat(days)
+            days[missing] = _parse_days(chunk[column])[missing]
+        valid = ~np.isnat(days)
+        chunk = chunk[valid]
+        if chunk.empty:
+            return
+        periods = days[valid].astype(np.int64).astype(np.int32)
+        groups = self._codes(chunk)
+        known = groups >= 0
+        totals = _totals(periods[known], groups[known], chunk[metric].to_numpy(dtype=np.float64)[known])
+
+        daily = self.daily[metric]
+        if kind == 'attendance':
+            # A day's snapshot replaces any earlier one for that day
+            daily = daily[~daily['period'].isin(np.unique(periods))]
+            self.snapshot_day = max(self.snapshot_day or 0, int(periods.max()))
+        daily = pd.concat([daily, totals], ignore_index=True)
+        daily = daily.groupby(['period', 'group'], sort=True)[['total', 'count']].sum().reset_index()
+        if kind == 'quiz_results':
+            self._remember_quizzes(chunk)
+        self.daily[metric] = daily.astype({'period': np.int32, 'group': np.int32, 'count': np.int64})
+
+        weekly = self.daily[metric].assign(period=week_start(self.daily[metric]['period']))
+        weekly = weekly.groupby(['period', 'group'], sort=True)[['total', 'count']].sum().reset_index()
+        self.weekly[metric] = weekly.astype({'period': np.int32, 'group': np.int32, 'count': np.int64})
+        self.rows[kind] += len(chunk)
+        self.version += 1
+
+    def _remember_quizzes(self, results):
+        """Track each student's latest recorded quiz, replayed chunks included"""
+        ids = np.concatenate([self.quiz_students.to_numpy(), results['student_id'].to_numpy()])
+        hashes = np.concatenate([self.quiz_hashes, _quiz_hashes(results)])
+        keep = ~pd.Index(ids).duplicated(keep='last')
+        self.quiz_students = pd.Index(ids[keep])
+        self.quiz_hashes = hashes[keep]
+
+    def _append(self, kind, chunk):
+        if chunk.empty:
+            return
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            _write_chunk(chunk, os.path.join(self.directory, f'{kind}-{time.time_ns()}'))
+        self._apply(kind, chunk)
+
+    def record(self, students, today=None):
+        """Append new quiz results, and today's attendance snapshot if there is none yet, from a students frame.
+
+        Returns the number of quiz results appended.
+        """
+        today = today or date.today()
+        quiz_keys = _quiz_hashes(students)
+        with self.lock:
+            positions = self.quiz_students.get_indexer(students['student_id'].to_numpy())
+            known = positions >= 0
+            changed = ~known
+            changed[known] = self.quiz_hashes[positions[known]] != quiz_keys[known]
+            results = students.loc[changed, ['student_id', *TREND_KEYS, 'quiz_name', 'quiz_score']].reset_index(drop=True)
+            dates = students.loc[changed, 'quiz_date'].to_numpy() if 'quiz_date' in students.columns else None
+            results = results.assign(quiz_date=dates, recorded_on=today.isoformat())
+            self._append('quiz_results', results)
+
+            if self.snapshot_day is None or self.snapshot_day < day_number(today):
+                attendance = students[['student_id', *TREND_KEYS, 'attendance_rate']].reset_index(drop=True)
+                attendance.insert(len(TREND_KEYS) + 1, 'recorded_on', today.isoformat())
+                self._append('attendance', attendance)
+            self.recorded = today
+        return int(changed.sum())
+
+    def refresh(self, frame, today=None):
+        """Record frame if its data version or the day changed since the last record.
+
+        Cheap enough to call on every sync.
+        """
+        today = today or date.today()
+        marker = (data_version(frame), today)
+        with self.refresh_lock:
+            if marker == self.marker:
+                return False
+            self.record(frame, today)
+            self.marker = marker
+        return True
+
+    def group_mask(self, constraints):
+        """Boolean per group for a list of (column, value or values) constraints"""
+        mask = np.ones(len(self.groups), dtype=bool)
+        for column, value in constraints:
+            if column in self.groups.columns:
+                mask &= self.groups[column].isin(scope_values(value)).to_numpy()
+        return mask
+
+    def trend(self, metric, constraints=(), start=None, end=None, bucket='day'):
+        """Average of metric per period between start and end (inclusive dates).
+
+        Returns a frame of period (the day, or the Monday of the week),
+        average, records and change from the previous period.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {BUCKETS}, not {bucket!r}")
+        with self.lock:
+            rollup = (self.daily if bucket == 'day' else self.weekly)[metric]
+            mask = self.group_mask(constraints)
+        periods = rollup['period'].to_numpy()
+        first = day_number(start) if start is not None else periods[0] if len(periods) else 0
+        last = day_number(end) if end is not None else periods[-1] if len(periods) else 0
+        if bucket == 'week':
+            first = week_start(first)
+        window = slice(np.searchsorted(periods, first, 'left'), np.searchsorted(periods, last, 'right'))
+        in_scope = mask[rollup['group'].to_numpy()[window]]
+        periods = periods[window][in_scope]
+        totals = rollup['total'].to_numpy()[window][in_scope]
+        counts = rollup['count'].to_numpy()[window][in_scope]
+        # Rows are sorted by period, so each period's rows are one run
+        days, starts = np.unique(periods, return_index=True)
+        if len(days):
+            totals, counts = np.add.reduceat(totals, starts), np.add.reduceat(counts, starts)
+        average = np.round(totals / counts, 1) if len(days) else totals
+        return pd.DataFrame({
+            'period': pd.to_datetime(days.astype('datetime64[D]')),
+            'average': average,
+            'records': counts,
+            'change': np.round(np.diff(average, prepend=np.nan), 1)
+        })
+
+    def stats(self):
+        with self.lock:
+            return {
+                'quiz_results': self.rows['quiz_results'],
+                'attendance_snapshots': self.rows['attendance'],
+                'groups': len(self.groups),
+                'rollup_rows': sum(len(r) for r in (*self.daily.values(), *self.weekly.values())),
+                'last_recorded': self.recorded
+            }